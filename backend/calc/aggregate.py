@@ -0,0 +1,147 @@
+"""
+Vectorized GROUP BY over columnar records.
+
+Records are loaded once into a :class:`ColumnTable`: dimension columns are factorized into
+integer codes (memoized per column) and measure columns into float arrays with NaN for
+missing values. A group-by combines the key codes into one integer per row with
+``np.ravel_multi_index``, and every aggregate is a ``np.bincount`` or ``ufunc.at`` pass
+over the group ids. Results follow SQL semantics: NULL measures are skipped, and a group
+with no values has a NULL sum/avg/min/max.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection, Hashable, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+from .timing import timed
+
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+
+def measure_name(func: str, field: str | None = None) -> str:
+    """Result key of an aggregate: ``count`` for row counts, else ``<func>_<field>``."""
+    return func if field is None else f"{func}_{field}"
+
+
+class ColumnTable:
+    """Dimension and measure columns of one record set, for repeated group-bys."""
+
+    def __init__(
+        self,
+        dimensions: Mapping[str, Sequence[Hashable]],
+        measures: Mapping[str, Sequence[float | None]],
+    ) -> None:
+        sizes = {len(col) for col in (*dimensions.values(), *measures.values())}
+        if len(sizes) > 1:
+            raise ValueError("All columns must have the same length")
+        self.size = sizes.pop() if sizes else 0
+        self._dimensions = {name: list(col) for name, col in dimensions.items()}
+        self._measures = {
+            name: np.fromiter(
+                (np.nan if v is None else float(v) for v in col), dtype=float, count=len(col)
+            )
+            for name, col in measures.items()
+        }
+        self._codes: dict[str, tuple[np.ndarray, list[Hashable]]] = {}
+
+    def codes(self, name: str) -> tuple[np.ndarray, list[Hashable]]:
+        """Return integer codes and their labels for a dimension, factorized once."""
+        cached = self._codes.get(name)
+        if cached is None:
+            seen: dict[Hashable, int] = {}
+            values = self._dimensions[name]
+            codes = np.fromiter(
+                (seen.setdefault(v, len(seen)) for v in values), dtype=np.int64, count=len(values)
+            )
+            cached = self._codes[name] = (codes, list(seen))
+        return cached
+
+    def mask(self, filters: Mapping[str, Collection[Hashable]] | None = None) -> np.ndarray:
+        """Rows whose dimension values are in the given sets (AND across dimensions)."""
+        keep = np.ones(self.size, dtype=bool)
+        for name, allowed in (filters or {}).items():
+            codes, labels = self.codes(name)
+            wanted = [code for code, label in enumerate(labels) if label in allowed]
+            keep &= np.isin(codes, wanted)
+        return keep
+
+    def _group_ids(self, by: Sequence[str], keep: np.ndarray) -> tuple[np.ndarray, list[tuple]]:
+        if not by:
+            return np.zeros(int(keep.sum()), dtype=np.int64), [()]
+        columns = [self.codes(name) for name in by]
+        combined = np.ravel_multi_index(
+            [codes[keep] for codes, _ in columns], [max(1, len(labels)) for _, labels in columns]
+        )
+        unique, inverse = np.unique(combined, return_inverse=True)
+        parts = np.unravel_index(unique, [max(1, len(labels)) for _, labels in columns])
+        keys = list(
+            zip(
+                *(
+                    [labels[i] for i in part.tolist()]
+                    for part, (_, labels) in zip(parts, columns, strict=True)
+                ),
+                strict=True,
+            )
+        )
+        return inverse.reshape(-1), keys
+
+    @timed
+    def aggregate(
+        self,
+        by: Sequence[str],
+        measures: Sequence[tuple[str, str | None]] = (("count", None),),
+        filters: Mapping[str, Collection[Hashable]] | None = None,
+    ) -> list[tuple[tuple, dict[str, Any]]]:
+        """Return ``[(key, {measure_name: value})]`` per group of ``by``.
+
+        Groups are ordered by the first appearance of each key part, first column first.
+
+        ``measures`` are ``(func, field)`` pairs; ``("count", None)`` counts rows and
+        ``("count", field)`` counts non-null values. With no ``by`` there is exactly one
+        group, even when no rows match.
+        """
+        keep = self.mask(filters)
+        group_ids, keys = self._group_ids(by, keep)
+        size = len(keys)
+        rows = np.bincount(group_ids, minlength=size)
+        results: dict[str, np.ndarray] = {}
+        for func, field in measures:
+            if func not in AGGREGATES:
+                raise ValueError(f"func must be one of {AGGREGATES}")
+            name = measure_name(func, field)
+            if field is None:
+                if func != "count":
+                    raise ValueError(f"{func} needs a field")
+                results[name] = rows
+                continue
+            column = self._measures[field][keep]
+            present = ~np.isnan(column)
+            counts = np.bincount(group_ids, weights=present, minlength=size)
+            if func == "count":
+                results[name] = counts.astype(np.int64)
+            elif func in ("sum", "avg"):
+                sums = np.bincount(
+                    group_ids, weights=np.where(present, column, 0.0), minlength=size
+                )
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    value = sums if func == "sum" else sums / counts
+                results[name] = np.where(counts > 0, value, np.nan)
+            else:
+                ufunc = np.minimum if func == "min" else np.maximum
+                out = np.full(size, np.inf if func == "min" else -np.inf)
+                ufunc.at(out, group_ids[present], column[present])
+                results[name] = np.where(counts > 0, out, np.nan)
+        columns = {name: values.tolist() for name, values in results.items()}
+        return [
+            (
+                key,
+                {
+                    name: None if values[g] != values[g] else values[g]
+                    for name, values in columns.items()
+                },
+            )
+            for g, key in enumerate(keys)
+        ]
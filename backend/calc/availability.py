@@ -0,0 +1,157 @@
+"""
+Day-level calendars of blocked days per platform and rig.
+
+Each resource's blocked days (maintenance windows, plus rig events or bookings added with
+:meth:`BlockedCalendar.block`) are kept as a :class:`DayBitset`: 64-day words keyed by
+``day // 64``, with empty words not stored (the same layout as a roaring bitmap's bitmap
+containers). Checking a candidate interval ANDs the one to three words it spans instead
+of looping over windows, and the next free slot of ``N`` days is found by jumping past
+the last blocked day in each candidate span.
+
+Days are ``date.toordinal()`` values and intervals are half-open ``[start, end)``;
+maintenance windows block ``start_date`` through ``end_date`` inclusive, as in
+:func:`engine.detect_conflicts`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from typing import Any
+
+WORD = 64
+
+ResourceKey = tuple[str, Hashable]
+
+
+def window_key(window: Mapping[str, Any]) -> ResourceKey:
+    """Return the resource a maintenance window blocks: its platform, else its rig."""
+    if window.get("platform_id"):
+        return ("platform", window["platform_id"])
+    return ("rig", window.get("rig_id"))
+
+
+class DayBitset:
+    """A set of days stored as 64-bit words."""
+
+    __slots__ = ("words",)
+
+    def __init__(self) -> None:
+        self.words: dict[int, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+    def add(self, start: int, end: int) -> None:
+        """Add the days ``[start, end)``."""
+        words = self.words
+        while start < end:
+            w = start // WORD
+            base = w * WORD
+            stop = min(end, base + WORD)
+            words[w] = words.get(w, 0) | (((1 << (stop - start)) - 1) << (start - base))
+            start = stop
+
+    def last_in(self, start: int, end: int) -> int | None:
+        """The last day of ``[start, end)`` in the set, or None if there is none."""
+        words = self.words
+        if not words or end <= start:
+            return None
+        first = start // WORD
+        w = (end - 1) // WORD
+        while w >= first:
+            bits = words.get(w)
+            if bits:
+                base = w * WORD
+                low = max(start - base, 0)
+                bits &= ((1 << (min(end - base, WORD) - low)) - 1) << low
+                if bits:
+                    return base + bits.bit_length() - 1
+            w -= 1
+        return None
+
+    def intersects(self, start: int, end: int) -> bool:
+        return self.last_in(start, end) is not None
+
+
+_EMPTY = DayBitset()
+
+
+def next_free(start: int, length: int, bitsets: Iterable[DayBitset]) -> int:
+    """Earliest day ``t >= start`` with ``length`` consecutive days in none of ``bitsets``.
+
+    Scans forward a word at a time, ORing the bitsets' words and skipping blocked runs
+    with bit tricks. A ``length`` below one is treated as one day: a zero-length project
+    still needs its start day.
+    """
+    maps = [b.words for b in bitsets if b.words]
+    if not maps:
+        return start
+    span = max(length, 1)
+    run = start  # first day of the current free run
+    w = start // WORD
+    pos = start - w * WORD
+    while True:
+        bits = 0
+        for words in maps:
+            bits |= words.get(w, 0)
+        base = w * WORD
+        while pos < WORD:
+            rest = bits >> pos
+            if not rest:
+                break
+            blocked = pos + (rest & -rest).bit_length() - 1
+            if base + blocked - run >= span:
+                return run
+            # The free run restarts after this blocked stretch.
+            tail = bits >> blocked
+            pos = blocked + (~tail & (tail + 1)).bit_length() - 1
+            run = base + pos
+        if base + WORD - run >= span:
+            return run
+        w += 1
+        pos = 0
+
+
+class BlockedCalendar:
+    """Blocked-day bitsets keyed by ``("platform", id)`` or ``("rig", id)``."""
+
+    def __init__(
+        self,
+        maintenance_windows: Iterable[Mapping[str, Any]] = (),
+        key: Callable[[Mapping[str, Any]], ResourceKey] = window_key,
+    ) -> None:
+        self._bitsets: dict[ResourceKey, DayBitset] = {}
+        for w in maintenance_windows:
+            self.block(key(w), w["start_date"].toordinal(), w["end_date"].toordinal() + 1)
+
+    def block(self, key: ResourceKey, start: int, end: int) -> None:
+        """Mark days ``[start, end)`` of ``key`` blocked."""
+        bitset = self._bitsets.get(key)
+        if bitset is None:
+            bitset = self._bitsets[key] = DayBitset()
+        bitset.add(start, end)
+
+    def bitset(self, key: ResourceKey) -> DayBitset:
+        """Blocked days of ``key`` (empty if it has none); do not modify."""
+        return self._bitsets.get(key, _EMPTY)
+
+    def is_free(self, key: ResourceKey, start: int, end: int) -> bool:
+        """True if no day of ``[start, end)`` is blocked for ``key``."""
+        return not self.bitset(key).intersects(start, end)
+
+    def touching(self, key: ResourceKey, intervals: Iterable[tuple[int, int]]) -> list[int]:
+        """Indexes of the ``[start, end)`` intervals that include a blocked day of ``key``."""
+        bitset = self._bitsets.get(key)
+        if not bitset:
+            return []
+        last_in = bitset.last_in
+        return [i for i, (start, end) in enumerate(intervals) if last_in(start, end) is not None]
+
+    def next_free(
+        self, start: int, length: int, *keys: ResourceKey, extra: Iterable[DayBitset] = ()
+    ) -> int:
+        """Earliest day ``t >= start`` with ``length`` free days for all ``keys``.
+
+        ``extra`` adds other blocked days, e.g. a rig's bookings so far.
+        """
+        return next_free(start, length, [*map(self.bitset, keys), *extra])
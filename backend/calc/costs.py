@@ -0,0 +1,159 @@
+"""
+Columnar cost roll-up for campaigns, fields, rigs and months.
+
+Projects are loaded once into arrays (day rate, duration, an extras matrix with one column
+per extras key), and group totals are computed with ``np.bincount`` over integer group
+codes. Campaign membership is stored CSR-style (one entry per project/campaign link), so a
+project tagged into several campaigns is counted once per campaign in a single pass.
+
+Per-project totals match :func:`engine.compute_costs`: ``day_rate * duration + sum(extras)``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from .engine import compute_duration
+from .timing import timed
+
+GROUPINGS = ("campaign", "field", "rig", "month")
+
+
+def _month_ordinal(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+class CostRollup:
+    """Cost columns for a set of projects with memoized group keys."""
+
+    def __init__(
+        self,
+        projects: Iterable[Mapping[str, Any]],
+        rig_day_rates: Mapping[Any, float] | None = None,
+    ) -> None:
+        projects = list(projects)
+        rates = rig_day_rates or {}
+        self.ids = [p["id"] for p in projects]
+        self.extra_keys = sorted({k for p in projects for k in (p.get("extras") or {})})
+        column = {k: j for j, k in enumerate(self.extra_keys)}
+
+        n = len(projects)
+        self.day_rate = np.zeros(n)
+        self.duration = np.zeros(n, dtype=np.int64)
+        self.start = np.zeros(n, dtype=np.int64)
+        self.extras = np.zeros((n, len(self.extra_keys)))
+        self._keys: dict[str, list[Any]] = {"field": [], "rig": []}
+        counts = np.zeros(n, dtype=np.int64)
+        campaigns: list[Any] = []
+        for i, p in enumerate(projects):
+            rate = p.get("day_rate")
+            if rate is None:
+                rate = rates.get(p.get("rig_id"), 0.0)
+            self.day_rate[i] = max(0.0, float(rate or 0))
+            self.duration[i] = compute_duration(p["planned_start"], p["planned_end"])
+            self.start[i] = p["planned_start"].toordinal()
+            for key, value in (p.get("extras") or {}).items():
+                self.extras[i, column[key]] = float(value or 0)
+            self._keys["field"].append(p.get("field_id"))
+            self._keys["rig"].append(p.get("rig_id"))
+            linked = p.get("campaign_ids") or ([p["campaign_id"]] if p.get("campaign_id") else [])
+            counts[i] = len(linked)
+            campaigns.extend(linked)
+
+        # Campaign links as (project row, campaign key) pairs; rows index into the columns.
+        self._campaign_rows = np.repeat(np.arange(n), counts)
+        self._keys["campaign"] = campaigns
+        self._group_cache: dict[str, tuple[Any, ...]] = {}
+        self.rig_cost = self.day_rate * self.duration
+
+    def _codes(self, by: str) -> tuple[np.ndarray, list[Any]]:
+        """Return integer group codes and their labels, factorized once per grouping."""
+        cached = self._group_cache.get(by)
+        if cached is None:
+            seen: dict[Any, int] = {}
+            codes = np.fromiter(
+                (seen.setdefault(k, len(seen)) for k in self._keys[by]),
+                dtype=np.int64,
+                count=len(self._keys[by]),
+            )
+            labels = list(seen)
+            cached = self._group_cache[by] = (codes, labels)
+        return cached
+
+    def _month_matrix(self) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        """Return rig days per (project, month), each project's start month and month labels.
+
+        Rig days are prorated across the months a project spans.
+        """
+        cached = self._group_cache.get("month")
+        if cached is None:
+            if not len(self.start):
+                cached = (np.zeros((0, 0)), np.zeros(0, dtype=np.int64), [])
+            else:
+                end = self.start + self.duration
+                first = _month_ordinal(date.fromordinal(int(self.start.min())))
+                last = _month_ordinal(date.fromordinal(int(np.maximum(end - 1, self.start).max())))
+                bounds = np.array(
+                    [date(m // 12, m % 12 + 1, 1).toordinal() for m in range(first, last + 2)]
+                )
+                days = np.minimum(end[:, None], bounds[None, 1:]) - np.maximum(
+                    self.start[:, None], bounds[None, :-1]
+                )
+                start_month = np.searchsorted(bounds, self.start, side="right") - 1
+                labels = [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in range(first, last + 1)]
+                cached = (np.clip(days, 0, None), start_month, labels)
+            self._group_cache["month"] = cached
+        return cached
+
+    def _summaries(
+        self, labels: Sequence[Any], counts: np.ndarray, rig: np.ndarray, extras: np.ndarray
+    ) -> dict[Any, dict[str, Any]]:
+        totals = rig + extras.sum(axis=1)
+        return {
+            label: {
+                "projects": int(counts[g]),
+                "rig_cost": float(rig[g]),
+                "extras": dict(zip(self.extra_keys, extras[g].tolist(), strict=True)),
+                "total": float(totals[g]),
+            }
+            for g, label in enumerate(labels)
+        }
+
+    @timed
+    def rollup(self, by: str) -> dict[Any, dict[str, Any]]:
+        """Return cost totals keyed by campaign, field, rig or month (``YYYY-MM``)."""
+        if by not in GROUPINGS:
+            raise ValueError(f"by must be one of {GROUPINGS}")
+        if by == "month":
+            # Rig days are prorated by month; extras are booked in the start month.
+            days, codes, labels = self._month_matrix()
+            rows = slice(None)
+            rig = self.day_rate @ days
+        else:
+            codes, labels = self._codes(by)
+            rows = self._campaign_rows if by == "campaign" else slice(None)
+            rig = np.bincount(codes, weights=self.rig_cost[rows], minlength=len(labels))
+        size = len(labels)
+        counts = np.bincount(codes, minlength=size)
+        extras = np.column_stack(
+            [np.bincount(codes, weights=col[rows], minlength=size) for col in self.extras.T]
+            or [np.zeros((size, 0))]
+        )
+        return self._summaries(labels, counts, rig, extras)
+
+    def rollup_all(self, groupings: Iterable[str] = GROUPINGS) -> dict[str, dict[Any, Any]]:
+        return {by: self.rollup(by) for by in groupings}
+
+
+@timed
+def rollup_costs(
+    projects: Iterable[Mapping[str, Any]],
+    by: str = "campaign",
+    rig_day_rates: Mapping[Any, float] | None = None,
+) -> dict[Any, dict[str, Any]]:
+    """Convenience wrapper: group cost totals for ``projects`` in one call."""
+    return CostRollup(projects, rig_day_rates).rollup(by)
@@ -0,0 +1,262 @@
+"""
+Project dependency graph: topological order, critical path and total float.
+
+Links are finish-to-start with an optional lag (see :func:`engine.iter_dependencies`);
+``planned_start`` acts as a start-no-earlier-than constraint. Late dates are kept as a
+"tail" per project (its duration plus the longest lagged chain after it), which depends
+only on durations and links. A date change therefore only re-runs the forward pass over
+its descendants, and a duration or link change only re-walks the affected ancestors.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Mapping
+from datetime import date
+from typing import Any
+
+from .engine import compute_duration, iter_dependencies
+from .timing import timed
+
+
+class DependencyCycleError(ValueError):
+    """Raised when links would make the dependency graph cyclic."""
+
+    def __init__(self, cycle: list[Any]) -> None:
+        super().__init__(f"dependency cycle: {' -> '.join(map(str, cycle))}")
+        self.cycle = cycle
+
+
+def topological_order(succs: Mapping[Hashable, Iterable[Hashable]]) -> list[Hashable]:
+    """Return nodes in dependency order; every node must be a key of ``succs``."""
+    indegree = dict.fromkeys(succs, 0)
+    for targets in succs.values():
+        for s in targets:
+            indegree[s] += 1
+    ready = [n for n, d in indegree.items() if d == 0]
+    order = []
+    while ready:
+        n = ready.pop()
+        order.append(n)
+        for s in succs[n]:
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                ready.append(s)
+    if len(order) != len(indegree):
+        raise DependencyCycleError(_find_cycle(succs, {n for n, d in indegree.items() if d}))
+    return order
+
+
+def _find_cycle(succs: Mapping[Hashable, Iterable[Hashable]], remaining: set) -> list[Hashable]:
+    # Every remaining node has a remaining predecessor, so walking backwards must repeat.
+    preds: dict[Hashable, Hashable] = {}
+    for n in remaining:
+        for s in succs[n]:
+            if s in remaining:
+                preds.setdefault(s, n)
+    node = next(iter(remaining))
+    seen: list[Hashable] = []
+    while node not in seen:
+        seen.append(node)
+        node = preds[node]
+    cycle = seen[seen.index(node) :]
+    cycle.reverse()
+    return [*cycle, cycle[0]]
+
+
+class DependencyGraph:
+    """Critical-path schedule over project links with incremental updates."""
+
+    def __init__(self) -> None:
+        self._start: dict[str, int] = {}
+        self._duration: dict[str, int] = {}
+        self._preds: dict[str, dict[str, int]] = {}
+        self._succs: dict[str, dict[str, int]] = {}
+        self._es: dict[str, int] = {}
+        self._ef: dict[str, int] = {}
+        self._tail: dict[str, int] = {}
+
+    @classmethod
+    def from_projects(cls, projects: Iterable[Mapping[str, Any]]) -> DependencyGraph:
+        """Build the graph and run a full forward/backward pass.
+
+        Links to projects outside ``projects`` are ignored.
+        """
+        graph = cls()
+        projects = list(projects)
+        for p in projects:
+            pid = str(p["id"])
+            graph._add_node(pid, p["planned_start"], p["planned_end"])
+        for p in projects:
+            for pred, lag in iter_dependencies(p):
+                if pred in graph._start:
+                    graph._preds[str(p["id"])][pred] = lag
+                    graph._succs[pred][str(p["id"])] = lag
+        graph.recompute()
+        return graph
+
+    def _add_node(self, pid: str, planned_start: date, planned_end: date) -> None:
+        self._start[pid] = planned_start.toordinal()
+        self._duration[pid] = compute_duration(planned_start, planned_end)
+        self._preds.setdefault(pid, {})
+        self._succs.setdefault(pid, {})
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self._start
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def topological_order(self) -> list[str]:
+        return topological_order(self._succs)
+
+    @timed
+    def recompute(self) -> None:
+        """Full CPM pass; incremental updates make this unnecessary after construction."""
+        order = self.topological_order()
+        for pid in order:
+            self._forward(pid)
+        for pid in reversed(order):
+            self._backward(pid)
+
+    # -- passes ---------------------------------------------------------------
+
+    def _forward(self, pid: str) -> bool:
+        es = max([self._start[pid]] + [self._ef[p] + lag for p, lag in self._preds[pid].items()])
+        ef = es + self._duration[pid]
+        changed = self._es.get(pid) != es or self._ef.get(pid) != ef
+        self._es[pid], self._ef[pid] = es, ef
+        return changed
+
+    def _backward(self, pid: str) -> bool:
+        tail = self._duration[pid] + max(
+            [0] + [lag + self._tail[s] for s, lag in self._succs[pid].items()]
+        )
+        changed = self._tail.get(pid) != tail
+        self._tail[pid] = tail
+        return changed
+
+    def _region(self, seeds: Iterable[str], edges: Mapping[str, Mapping[str, int]]) -> list[str]:
+        """Nodes reachable from ``seeds`` along ``edges``, in topological order of ``edges``."""
+        region: set[str] = set()
+        stack = [s for s in seeds if s in self._start]
+        while stack:
+            n = stack.pop()
+            if n not in region:
+                region.add(n)
+                stack.extend(edges[n])
+        return topological_order({n: [s for s in edges[n] if s in region] for n in region})
+
+    def _propagate(self, forward: Iterable[str] = (), backward: Iterable[str] = ()) -> set[str]:
+        """Re-run the passes over affected nodes only; returns projects whose dates moved."""
+        forward, backward = set(forward), set(backward)
+        moved: set[str] = set()
+        for pid in self._region(forward, self._succs):
+            if (pid in forward or any(p in moved for p in self._preds[pid])) and self._forward(pid):
+                moved.add(pid)
+        changed: set[str] = set()
+        for pid in self._region(backward, self._preds):
+            if (pid in backward or any(s in changed for s in self._succs[pid])) and self._backward(
+                pid
+            ):
+                changed.add(pid)
+        return moved
+
+    def _dates(self, pids: Iterable[str]) -> dict[str, tuple[date, date]]:
+        return {
+            pid: (date.fromordinal(self._es[pid]), date.fromordinal(self._ef[pid])) for pid in pids
+        }
+
+    # -- edits ----------------------------------------------------------------
+
+    def add_project(
+        self, pid: str, planned_start: date, planned_end: date
+    ) -> dict[str, tuple[date, date]]:
+        if pid in self._start:
+            raise ValueError(f"project {pid} already in graph")
+        self._add_node(pid, planned_start, planned_end)
+        return self._dates(self._propagate(forward=[pid], backward=[pid]))
+
+    def remove_project(self, pid: str) -> dict[str, tuple[date, date]]:
+        preds, succs = self._preds.pop(pid), self._succs.pop(pid)
+        for p in preds:
+            del self._succs[p][pid]
+        for s in succs:
+            del self._preds[s][pid]
+        for table in (self._start, self._duration, self._es, self._ef, self._tail):
+            del table[pid]
+        return self._dates(self._propagate(forward=succs, backward=preds))
+
+    def set_dates(
+        self, pid: str, planned_start: date, planned_end: date
+    ) -> dict[str, tuple[date, date]]:
+        """Move or resize a project; returns new early dates of every project that moved."""
+        duration = compute_duration(planned_start, planned_end)
+        backward = [pid] if duration != self._duration[pid] else []
+        self._start[pid] = planned_start.toordinal()
+        self._duration[pid] = duration
+        return self._dates(self._propagate(forward=[pid], backward=backward))
+
+    def add_dependency(self, pred: str, succ: str, lag: int = 0) -> dict[str, tuple[date, date]]:
+        """Add or update a finish-to-start link; raises DependencyCycleError if cyclic."""
+        path = self._path(succ, pred)
+        if path is not None:
+            raise DependencyCycleError([pred, *path])
+        self._preds[succ][pred] = lag
+        self._succs[pred][succ] = lag
+        return self._dates(self._propagate(forward=[succ], backward=[pred]))
+
+    def remove_dependency(self, pred: str, succ: str) -> dict[str, tuple[date, date]]:
+        del self._preds[succ][pred]
+        del self._succs[pred][succ]
+        return self._dates(self._propagate(forward=[succ], backward=[pred]))
+
+    def _path(self, source: str, target: str) -> list[str] | None:
+        """Return a successor path from ``source`` to ``target`` if one exists."""
+        parent: dict[str, str | None] = {source: None}
+        stack = [source]
+        while stack:
+            n = stack.pop()
+            if n == target:
+                path = [n]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                return path[::-1]
+            for s in self._succs[n]:
+                if s not in parent:
+                    parent[s] = n
+                    stack.append(s)
+        return None
+
+    # -- queries --------------------------------------------------------------
+
+    @property
+    def project_finish(self) -> date | None:
+        return date.fromordinal(max(self._ef.values())) if self._ef else None
+
+    def total_float(self, pid: str) -> int:
+        """Days ``pid`` can slip without delaying the overall finish."""
+        return max(self._ef.values()) - self._tail[pid] - self._es[pid]
+
+    def schedule(self) -> dict[str, dict[str, Any]]:
+        """Early/late dates and total float for every project."""
+        finish = max(self._ef.values(), default=0)
+        result = {}
+        for pid, es in self._es.items():
+            ls = finish - self._tail[pid]
+            result[pid] = {
+                "early_start": date.fromordinal(es),
+                "early_finish": date.fromordinal(self._ef[pid]),
+                "late_start": date.fromordinal(ls),
+                "late_finish": date.fromordinal(ls + self._duration[pid]),
+                "total_float": ls - es,
+            }
+        return result
+
+    def critical_path(self) -> list[str]:
+        """Zero-float projects in dependency order."""
+        if not self._ef:
+            return []
+        finish = max(self._ef.values())
+        return [
+            pid for pid in self.topological_order() if finish - self._tail[pid] == self._es[pid]
+        ]
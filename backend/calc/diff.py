@@ -0,0 +1,173 @@
+"""
+Field-level diff between two versions of a schedule.
+
+Both sides are streams of ``(key, record)`` pairs sorted by key. They are merge-joined in
+one pass, which yields field changes and accumulates the per-side inputs for the calc
+metrics (cost, ETA, conflicts), so no pairwise comparison of whole object graphs is needed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import date
+from typing import Any
+
+from .engine import compute_costs, compute_duration, detect_conflicts, estimate_eta
+from .timing import timed
+
+DATE_FIELDS = ("planned_start", "planned_end", "actual_start", "actual_end")
+_END = object()
+
+
+def field_changes(old: Mapping[str, Any], new: Mapping[str, Any]) -> dict[str, list[Any]]:
+    """Return ``{field: [old, new]}`` for every field whose value differs."""
+    return {
+        f: [old.get(f), new.get(f)] for f in old.keys() | new.keys() if old.get(f) != new.get(f)
+    }
+
+
+def iter_changes(
+    a: Iterable[tuple[str, Mapping[str, Any]]], b: Iterable[tuple[str, Mapping[str, Any]]]
+) -> Iterator[tuple[str, Mapping[str, Any] | None, Mapping[str, Any] | None]]:
+    """Merge-join two key-sorted streams, yielding ``(key, old, new)`` for every key.
+
+    ``old`` is None for added keys and ``new`` is None for removed keys.
+    """
+    ia, ib = iter(a), iter(b)
+    ra, rb = next(ia, _END), next(ib, _END)
+    while ra is not _END or rb is not _END:
+        if rb is _END or (ra is not _END and ra[0] < rb[0]):
+            yield ra[0], ra[1], None
+            ra = next(ia, _END)
+        elif ra is _END or rb[0] < ra[0]:
+            yield rb[0], None, rb[1]
+            rb = next(ib, _END)
+        else:
+            yield ra[0], ra[1], rb[1]
+            ra, rb = next(ia, _END), next(ib, _END)
+
+
+def _as_project(key: str, record: Mapping[str, Any]) -> dict[str, Any]:
+    # Scenario rows are JSON, so dates may arrive as ISO strings.
+    project = {"id": key, **record}
+    for f in DATE_FIELDS:
+        if isinstance(project.get(f), str):
+            project[f] = date.fromisoformat(project[f])
+    return project
+
+
+def _cost(project: Mapping[str, Any]) -> float:
+    if not project.get("planned_start") or not project.get("planned_end"):
+        return 0.0
+    duration = compute_duration(project["planned_start"], project["planned_end"])
+    return compute_costs(float(project.get("day_rate") or 0), duration, project.get("extras"))
+
+
+def _conflicts_by_project(
+    projects: list[dict[str, Any]], windows: list[Mapping[str, Any]]
+) -> tuple[dict[str, set[str]], int]:
+    scheduled = [p for p in projects if p.get("planned_start") and p.get("planned_end")]
+    conflicts = detect_conflicts(scheduled, windows)
+    found: dict[str, set[str]] = {}
+    for c in conflicts:
+        if c["type"] == "rig_double_booking":
+            first, second = c["project_ids"]
+            found.setdefault(first, set()).add(f"rig_double_booking:{second}")
+            found.setdefault(second, set()).add(f"rig_double_booking:{first}")
+        else:
+            found.setdefault(c["project_id"], set()).add(f"maintenance_clash:{c['window_id']}")
+    return found, len(conflicts)
+
+
+def _metrics(projects: list[dict[str, Any]], cost: float, conflicts: int) -> dict[str, Any]:
+    return {
+        "projects": len(projects),
+        "total_cost": cost,
+        "eta": estimate_eta(p["planned_end"] for p in projects if p.get("planned_end")),
+        "conflicts": conflicts,
+    }
+
+
+@timed
+def diff_projects(
+    a: Iterable[tuple[str, Mapping[str, Any]]],
+    b: Iterable[tuple[str, Mapping[str, Any]]],
+    maintenance_windows: Iterable[Mapping[str, Any]] = (),
+) -> dict[str, Any]:
+    """Diff two key-sorted project streams; returns per-project changes and metric deltas.
+
+    Each change reports field changes, ``shift_days`` of the planned start, ``cost_delta``
+    and the conflicts gained or lost. Projects whose fields are identical but whose
+    conflicts changed (because a neighbour moved) are reported with change ``conflicts``.
+    ``maintenance_windows`` apply to both sides; without them only rig double bookings
+    are counted as conflicts.
+    """
+    windows = list(maintenance_windows)
+    side_a: list[dict[str, Any]] = []
+    side_b: list[dict[str, Any]] = []
+    cost_a = cost_b = 0.0
+    changes: dict[str, dict[str, Any]] = {}
+
+    for key, old, new in iter_changes(a, b):
+        pa = _as_project(key, old) if old is not None else None
+        pb = _as_project(key, new) if new is not None else None
+        ca = _cost(pa) if pa else 0.0
+        cb = _cost(pb) if pb else 0.0
+        if pa:
+            side_a.append(pa)
+            cost_a += ca
+        if pb:
+            side_b.append(pb)
+            cost_b += cb
+        if pa and pb:
+            fields = field_changes(old, new)
+            if not fields:
+                continue
+            kind = "modified"
+        else:
+            fields = {}
+            kind = "added" if pb else "removed"
+        shift = None
+        if pa and pb and pa.get("planned_start") and pb.get("planned_start"):
+            shift = (pb["planned_start"] - pa["planned_start"]).days
+        changes[key] = {
+            "key": key,
+            "change": kind,
+            "fields": fields,
+            "shift_days": shift,
+            "cost_delta": cb - ca,
+        }
+
+    conflicts_a, count_a = _conflicts_by_project(side_a, windows)
+    conflicts_b, count_b = _conflicts_by_project(side_b, windows)
+    for key in conflicts_a.keys() | conflicts_b.keys():
+        gained = conflicts_b.get(key, set()) - conflicts_a.get(key, set())
+        lost = conflicts_a.get(key, set()) - conflicts_b.get(key, set())
+        if not gained and not lost and key not in changes:
+            continue
+        entry = changes.setdefault(
+            key,
+            {"key": key, "change": "conflicts", "fields": {}, "shift_days": 0, "cost_delta": 0.0},
+        )
+        entry["conflicts_gained"] = sorted(gained)
+        entry["conflicts_lost"] = sorted(lost)
+    for entry in changes.values():
+        entry.setdefault("conflicts_gained", [])
+        entry.setdefault("conflicts_lost", [])
+
+    before = _metrics(side_a, cost_a, count_a)
+    after = _metrics(side_b, cost_b, count_b)
+    eta_shift = (after["eta"] - before["eta"]).days if before["eta"] and after["eta"] else None
+    return {
+        "changes": [changes[k] for k in sorted(changes)],
+        "metrics": {
+            "a": before,
+            "b": after,
+            "delta": {
+                "projects": after["projects"] - before["projects"],
+                "total_cost": after["total_cost"] - before["total_cost"],
+                "eta_days": eta_shift,
+                "conflicts": after["conflicts"] - before["conflicts"],
+            },
+        },
+    }
@@ -0,0 +1,118 @@
+"""
+Great-circle distances and rig-move transit matrices.
+
+Locations are dicts with ``id``, ``lat`` and ``lon`` (degrees; missing coordinates become
+NaN and so never match a finite distance). :func:`haversine_km` computes every pair of a
+set of origins and targets in one broadcast NumPy expression, and :class:`TransitMatrix`
+keeps the result with transit times at a move speed and, given day rates, move costs.
+Sequencing code then reads single pairs from the arrays instead of recomputing them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+# Mean Earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_NAUTICAL_MILE = 1.852
+# Typical towed or self-propelled rig move
+DEFAULT_MOVE_SPEED_KNOTS = 4.0
+
+
+def haversine_km(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> np.ndarray:
+    """Great-circle distance in km between points given in degrees; arrays broadcast."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def coordinates(locations: Sequence[Mapping[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(lat, lon)`` arrays for ``locations``, NaN where a coordinate is missing."""
+
+    def column(name: str) -> np.ndarray:
+        return np.array(
+            [np.nan if loc.get(name) is None else float(loc[name]) for loc in locations],
+            dtype=float,
+        )
+
+    return column("lat"), column("lon")
+
+
+def transit_days(distance_km: Any, speed_knots: float = DEFAULT_MOVE_SPEED_KNOTS) -> np.ndarray:
+    """Days to cover ``distance_km`` at ``speed_knots``."""
+    if speed_knots <= 0:
+        raise ValueError("speed_knots must be positive")
+    return np.asarray(distance_km, dtype=float) / (speed_knots * KM_PER_NAUTICAL_MILE * 24)
+
+
+class TransitMatrix:
+    """Distances and transit times from every origin to every target."""
+
+    def __init__(
+        self,
+        origins: Iterable[Mapping[str, Any]],
+        targets: Iterable[Mapping[str, Any]] | None = None,
+        speed_knots: float = DEFAULT_MOVE_SPEED_KNOTS,
+    ) -> None:
+        origins = list(origins)
+        targets = origins if targets is None else list(targets)
+        self.origin_ids = [loc["id"] for loc in origins]
+        self.target_ids = [loc["id"] for loc in targets]
+        self._origin_index = {key: i for i, key in enumerate(self.origin_ids)}
+        self._target_index = {key: j for j, key in enumerate(self.target_ids)}
+        self.speed_knots = speed_knots
+        lat1, lon1 = coordinates(origins)
+        lat2, lon2 = coordinates(targets)
+        self.distance_km = haversine_km(lat1[:, None], lon1[:, None], lat2[None, :], lon2[None, :])
+        self.transit_days = transit_days(self.distance_km, speed_knots)
+
+    def transit_cost(self, day_rates: Mapping[Any, float]) -> np.ndarray:
+        """Move cost per pair: transit days times the origin's day rate (0 if unknown)."""
+        rates = np.array([float(day_rates.get(key) or 0) for key in self.origin_ids])
+        return self.transit_days * rates[:, None]
+
+    def distance(self, origin_id: Any, target_id: Any) -> float:
+        return float(self.distance_km[self._origin_index[origin_id], self._target_index[target_id]])
+
+    def days(self, origin_id: Any, target_id: Any) -> float:
+        return float(
+            self.transit_days[self._origin_index[origin_id], self._target_index[target_id]]
+        )
+
+    def nearest(
+        self, target_id: Any, limit: int = 5, candidates: Iterable[Any] | None = None
+    ) -> list[tuple[Any, float]]:
+        """Return up to ``limit`` ``(origin_id, km)`` pairs closest to ``target_id``.
+
+        ``candidates`` restricts the origins (e.g. to available rigs); origins without
+        coordinates are never returned.
+        """
+        column = self.distance_km[:, self._target_index[target_id]]
+        if candidates is None:
+            rows = np.arange(len(self.origin_ids))
+        else:
+            rows = np.array(
+                [self._origin_index[c] for c in candidates if c in self._origin_index],
+                dtype=np.int64,
+            )
+        return nearest_rows(column, rows, limit, self.origin_ids)
+
+
+def nearest_rows(
+    distances: np.ndarray, rows: np.ndarray, limit: int, ids: Sequence[Any]
+) -> list[tuple[Any, float]]:
+    """The ``limit`` smallest finite ``distances[rows]`` as ``(ids[row], km)``, nearest first."""
+    rows = rows[np.isfinite(distances[rows])]
+    if limit < len(rows):
+        # Partial selection, then sort just the winners
+        rows = rows[np.argpartition(distances[rows], limit)[:limit]]
+    rows = rows[np.argsort(distances[rows], kind="stable")]
+    return [(ids[r], float(distances[r])) for r in rows]
@@ -4,10 +4,21 @@ Pure calculation functions (placeholders). M4 will implement real logic and test
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Iterable, Mapping
 from datetime import date
 from typing import Any
 
+from .availability import BlockedCalendar, window_key
+from .timing import timed
+
+# Project types that occupy a rig (spec: Validation & Scheduling Rules).
+RIG_REQUIRED_TYPES = frozenset({"Drilling", "Workover", "PlugAndAbandon", "UWILD", "RigOverhaul"})
+# Rig-specific events are pinned to their rig.
+RIG_EVENT_TYPES = frozenset({"UWILD", "RigOverhaul"})
+# detect_conflicts indexes a platform's or rig's windows in a calendar from this many on.
+CALENDAR_MIN_WINDOWS = 8
+
 
 def compute_duration(planned_start: date, planned_end: date) -> int:
     """Return duration in days."""
@@ -16,6 +27,7 @@ def compute_duration(planned_start: date, planned_end: date) -> int:
     return (planned_end - planned_start).days
 
 
+@timed
 def compute_rig_utilization(items: Iterable[dict[str, Any]], start: date, end: date) -> float:
     """Placeholder utilization computation; to be implemented in M4."""
     return 0.0
@@ -45,6 +57,100 @@ def estimate_eta(planned_end_dates: Iterable[date]) -> date | None:
         return None
 
 
+def iter_dependencies(project: Mapping[str, Any]) -> list[tuple[str, int]]:
+    """Return ``(predecessor_id, lag_days)`` pairs from a project's ``dependencies`` jsonb.
+
+    Accepts a list of predecessor ids or ``{"project_id", "lag_days"}`` objects, or a
+    mapping of predecessor id to lag days. All links are finish-to-start.
+    """
+    deps = project.get("dependencies") or []
+    if isinstance(deps, Mapping):
+        return [(str(pred), int(lag or 0)) for pred, lag in deps.items()]
+    pairs = []
+    for dep in deps:
+        if isinstance(dep, Mapping):
+            pairs.append((str(dep["project_id"]), int(dep.get("lag_days") or 0)))
+        else:
+            pairs.append((str(dep), 0))
+    return pairs
+
+
+@timed
+def detect_conflicts(
+    projects: Iterable[dict[str, Any]],
+    maintenance_windows: Iterable[dict[str, Any]] = (),
+) -> list[dict[str, Any]]:
+    """Return rig double-bookings and platform maintenance clashes.
+
+    Projects occupy ``[planned_start, planned_end)``; maintenance windows block their
+    ``platform_id`` (or ``rig_id``) from ``start_date`` through ``end_date`` inclusive.
+    """
+    conflicts: list[dict[str, Any]] = []
+    by_rig: dict[Any, list[dict[str, Any]]] = {}
+    by_platform: dict[Any, list[dict[str, Any]]] = {}
+    for p in projects:
+        if p.get("rig_id"):
+            by_rig.setdefault(p["rig_id"], []).append(p)
+        if p.get("platform_id"):
+            by_platform.setdefault(p["platform_id"], []).append(p)
+
+    for rig_id, items in by_rig.items():
+        items.sort(key=lambda p: p["planned_start"])
+        active: list[dict[str, Any]] = []
+        for p in items:
+            active = [a for a in active if a["planned_end"] > p["planned_start"]]
+            for a in active:
+                conflicts.append(
+                    {
+                        "type": "rig_double_booking",
+                        "rig_id": rig_id,
+                        "project_ids": [a["id"], p["id"]],
+                    }
+                )
+            active.append(p)
+
+    windows = list(maintenance_windows)
+    per_resource = Counter(map(window_key, windows))
+    busy = [key for key, count in per_resource.items() if count >= CALENDAR_MIN_WINDOWS]
+    # Comparing every project with every window of its resource is cheapest for a few
+    # windows. Past that, a calendar rules out most projects with one AND each, and only
+    # those touching a blocked day are compared window by window.
+    touching: dict[tuple[str, Any], list[dict[str, Any]]] = {}
+    if busy:
+        calendar = BlockedCalendar(
+            w for w in windows if per_resource[window_key(w)] >= CALENDAR_MIN_WINDOWS
+        )
+        groups = {"platform": by_platform, "rig": by_rig}
+        spans: dict[int, tuple[int, int]] = {}
+        for kind, key in busy:
+            items = groups[kind].get(key, [])
+            for p in items:
+                if id(p) not in spans:
+                    start, end = p["planned_start"].toordinal(), p["planned_end"].toordinal()
+                    spans[id(p)] = (start, end if end > start else start + 1)
+            hits = calendar.touching((kind, key), [spans[id(p)] for p in items])
+            touching[(kind, key)] = [items[i] for i in hits]
+
+    for w in windows:
+        scope = "platform_id" if w.get("platform_id") else "rig_id"
+        key = window_key(w)
+        targets = touching.get(key)
+        if targets is None:
+            targets = (by_platform if key[0] == "platform" else by_rig).get(key[1], ())
+        for p in targets:
+            if p["planned_start"] <= w["end_date"] and w["start_date"] < p["planned_end"]:
+                conflicts.append(
+                    {
+                        "type": "maintenance_clash",
+                        scope: w[scope],
+                        "project_id": p["id"],
+                        "window_id": w.get("id"),
+                    }
+                )
+    return conflicts
+
+
+@timed
 def run_all_metrics(payload: dict[str, Any]) -> dict[str, Any]:
     """Placeholder aggregator. M4 will implement real logic."""
     return {"ok": True, "metrics": {}}
@@ -0,0 +1,336 @@
+"""
+Rig resource leveling across overlapping campaigns.
+
+A serial schedule generator places projects in priority order at the earliest slot that
+respects dependencies, rig availability and platform/rig maintenance windows, picking the
+best eligible rig. A seeded local search then perturbs the priority list until the time
+budget runs out, keeping the best schedule found so far.
+
+Projects are plain dicts as elsewhere in calc:
+    id, planned_start, planned_end, and optionally project_type, rig_id, platform_id,
+    eligible_rig_ids, rig_locked, dependencies, extras, lat, lon.
+Rigs are dicts with id and day_rate, and optionally lat and lon.
+
+With ``move_speed_knots`` set, placing a project on a rig also costs the rig's move from
+its previously placed project (or its own position) at its day rate, read from a
+:class:`distance.TransitMatrix` built once per run.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from .availability import BlockedCalendar, DayBitset, next_free
+from .distance import TransitMatrix
+from .engine import (
+    RIG_EVENT_TYPES,
+    RIG_REQUIRED_TYPES,
+    compute_costs,
+    compute_duration,
+    detect_conflicts,
+    iter_dependencies,
+)
+from .timing import timed
+
+OBJECTIVES = ("delay", "cost")
+
+_NO_DAYS = DayBitset()
+
+
+def _prepare(
+    projects: list[Mapping[str, Any]],
+    rigs: list[Mapping[str, Any]],
+    maintenance_windows: Iterable[Mapping[str, Any]],
+    move_speed_knots: float | None = None,
+) -> dict[str, Any]:
+    index = {str(p["id"]): i for i, p in enumerate(projects)}
+    rig_ids = [str(r["id"]) for r in rigs]
+    blocked = BlockedCalendar(
+        maintenance_windows,
+        key=lambda w: (
+            ("platform", str(w["platform_id"]))
+            if w.get("platform_id")
+            else ("rig", str(w["rig_id"]))
+        ),
+    )
+
+    n = len(projects)
+    preds: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    succs: list[list[int]] = [[] for _ in range(n)]
+    eligible: list[list[str]] = []
+    for i, p in enumerate(projects):
+        for pred_id, lag in iter_dependencies(p):
+            if pred_id in index:
+                preds[i].append((index[pred_id], lag))
+                succs[index[pred_id]].append(i)
+        if p.get("project_type") in RIG_EVENT_TYPES or p.get("rig_locked"):
+            eligible.append([str(p["rig_id"])])
+        elif p.get("eligible_rig_ids"):
+            eligible.append([str(r) for r in p["eligible_rig_ids"]])
+        elif p.get("rig_id") or p.get("project_type") in RIG_REQUIRED_TYPES:
+            eligible.append(rig_ids)
+        else:
+            eligible.append([])
+
+    return {
+        "release": [p["planned_start"].toordinal() for p in projects],
+        "due": [p["planned_end"].toordinal() for p in projects],
+        "duration": [compute_duration(p["planned_start"], p["planned_end"]) for p in projects],
+        "extras": [p.get("extras") or {} for p in projects],
+        "platform": [str(p["platform_id"]) if p.get("platform_id") else None for p in projects],
+        "preds": preds,
+        "succs": succs,
+        "eligible": eligible,
+        "day_rate": {str(r["id"]): float(r.get("day_rate") or 0) for r in rigs},
+        "blocked": blocked,
+        "moves": _move_days(projects, rigs, move_speed_knots),
+        "rig_row": {rig_id: r for r, rig_id in enumerate(rig_ids)},
+    }
+
+
+def _move_days(
+    projects: list[Mapping[str, Any]], rigs: list[Mapping[str, Any]], speed_knots: float | None
+) -> Any:
+    """Return transit days to each project, or None when moves are not costed.
+
+    Row ``r`` starts at rig ``r``'s position and row ``len(rigs) + i`` at project ``i``;
+    unknown locations cost nothing. Kept as float32: the matrix is quadratic in projects.
+    """
+    if speed_knots is None or not any(p.get("lat") is not None for p in projects):
+        return None
+    origins = [{**r, "id": ("rig", r["id"])} for r in rigs]
+    origins += [{**p, "id": ("project", p["id"])} for p in projects]
+    targets = [{**p, "id": ("project", p["id"])} for p in projects]
+    days = TransitMatrix(origins, targets, speed_knots).transit_days
+    return np.nan_to_num(days, nan=0.0).astype(np.float32)
+
+
+def _decode(
+    plan: Mapping[str, Any], priority: list[int], objective: str, delay_cost_per_day: float
+) -> dict[str, Any]:
+    n = len(priority)
+    rank = {i: r for r, i in enumerate(priority)}
+    waiting = [len(links) for links in plan["preds"]]
+    ready = [(rank[i], i) for i in range(n) if waiting[i] == 0]
+    heapq.heapify(ready)
+    calendar: BlockedCalendar = plan["blocked"]
+    # Days each rig is booked so far
+    rig_busy: dict[str, DayBitset] = {}
+    moves = plan["moves"]
+    # Transit-matrix row of each rig's current position, once it has a project
+    rig_at: dict[str, int] = {}
+    start = [0] * n
+    end = [0] * n
+    rig: list[str | None] = [None] * n
+    unscheduled: list[int] = []
+    delay = cost = 0.0
+
+    while ready:
+        _, i = heapq.heappop(ready)
+        duration = plan["duration"][i]
+        earliest = max([plan["release"][i]] + [end[p] + lag for p, lag in plan["preds"][i]])
+        platform = calendar.bitset(("platform", plan["platform"][i]))
+        options = plan["eligible"][i] or [None]
+        best = None
+        for rig_id in options:
+            if rig_id is None:
+                busy = [platform]
+            elif rig_id not in plan["day_rate"]:
+                continue
+            else:
+                busy = [platform, rig_busy.get(rig_id, _NO_DAYS), calendar.bitset(("rig", rig_id))]
+            t = next_free(earliest, duration, busy)
+            late = max(0, t + duration - plan["due"][i])
+            price = compute_costs(plan["day_rate"].get(rig_id, 0.0), duration, plan["extras"][i])
+            if moves is not None and rig_id is not None:
+                row = rig_at.get(rig_id, plan["rig_row"][rig_id])
+                price += moves.item(row, i) * plan["day_rate"][rig_id]
+            key = (price + late * delay_cost_per_day, t) if objective == "cost" else (t, price)
+            if best is None or key < best[0]:
+                best = (key, rig_id, t, late, price)
+
+        if best is None:
+            unscheduled.append(i)
+            # Successors can still be placed after the release date of a missing predecessor.
+            end[i] = plan["release"][i] + duration
+        else:
+            _, rig[i], start[i], late, price = best
+            end[i] = start[i] + duration
+            if rig[i] is not None:
+                # Zero-length bookings hold their day, as the slot search sizes them
+                rig_busy.setdefault(rig[i], DayBitset()).add(start[i], max(end[i], start[i] + 1))
+                rig_at[rig[i]] = len(plan["rig_row"]) + i
+            delay += late
+            cost += price
+        for s in plan["succs"][i]:
+            waiting[s] -= 1
+            if waiting[s] == 0:
+                heapq.heappush(ready, (rank[s], s))
+
+    if any(waiting):
+        raise ValueError("dependency cycle between projects")
+    cost += delay * delay_cost_per_day
+    score = (cost, delay) if objective == "cost" else (delay, cost)
+    return {
+        "score": score,
+        "start": start,
+        "end": end,
+        "rig": rig,
+        "unscheduled": unscheduled,
+        "total_delay_days": delay,
+        "total_cost": cost,
+    }
+
+
+def _result(
+    projects: list[Mapping[str, Any]], decoded: Mapping[str, Any], iterations: int, elapsed: float
+) -> dict[str, Any]:
+    skipped = set(decoded["unscheduled"])
+    assignments = {
+        str(p["id"]): {
+            "rig_id": decoded["rig"][i],
+            "start": date.fromordinal(decoded["start"][i]),
+            "end": date.fromordinal(decoded["end"][i]),
+        }
+        for i, p in enumerate(projects)
+        if i not in skipped
+    }
+    return {
+        "assignments": assignments,
+        "unscheduled": [str(projects[i]["id"]) for i in decoded["unscheduled"]],
+        "total_delay_days": decoded["total_delay_days"],
+        "total_cost": decoded["total_cost"],
+        "iterations": iterations,
+        "elapsed_s": elapsed,
+    }
+
+
+@timed
+def level_rigs(
+    projects: Iterable[Mapping[str, Any]],
+    rigs: Iterable[Mapping[str, Any]],
+    maintenance_windows: Iterable[Mapping[str, Any]] = (),
+    objective: str = "delay",
+    delay_cost_per_day: float = 0.0,
+    time_budget_s: float = 2.0,
+    max_iterations: int | None = None,
+    seed: int | None = None,
+    move_speed_knots: float | None = None,
+    on_improvement: Callable[[dict[str, Any]], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> dict[str, Any]:
+    """Return a conflict-free rig assignment minimizing total delay or total cost.
+
+    Starts from an earliest-planned-start priority list and improves it by random swaps
+    and moves until ``time_budget_s`` or ``max_iterations`` is spent. ``on_improvement``
+    receives each new best result; ``should_stop`` lets a caller cancel early.
+    ``move_speed_knots`` adds rig-move costs between located rigs and projects.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    projects = list(projects)
+    windows = list(maintenance_windows)
+    plan = _prepare(projects, list(rigs), windows, move_speed_knots)
+    rng = random.Random(seed)
+    started = time.monotonic()
+
+    priority = sorted(range(len(projects)), key=lambda i: (plan["release"][i], plan["due"][i], i))
+    best = _decode(plan, priority, objective, delay_cost_per_day)
+    iterations = 1
+    if on_improvement:
+        on_improvement(_result(projects, best, iterations, time.monotonic() - started))
+
+    while len(priority) > 1:
+        if time.monotonic() - started >= time_budget_s:
+            break
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        if should_stop and should_stop():
+            break
+        candidate = priority[:]
+        a, b = rng.sample(range(len(candidate)), 2)
+        if rng.random() < 0.5:
+            candidate[a], candidate[b] = candidate[b], candidate[a]
+        else:
+            candidate.insert(b, candidate.pop(a))
+        decoded = _decode(plan, candidate, objective, delay_cost_per_day)
+        iterations += 1
+        # Accept sideways moves so the search can cross plateaus.
+        if decoded["score"] <= best["score"]:
+            improved = decoded["score"] < best["score"]
+            priority, best = candidate, decoded
+            if improved and on_improvement:
+                on_improvement(_result(projects, best, iterations, time.monotonic() - started))
+
+    result = _result(projects, best, iterations, time.monotonic() - started)
+    scheduled = [
+        {**p, "rig_id": a["rig_id"], "planned_start": a["start"], "planned_end": a["end"]}
+        for p in projects
+        if (a := result["assignments"].get(str(p["id"])))
+    ]
+    result["conflicts"] = detect_conflicts(scheduled, windows)
+    return result
+
+
+class LevelingJob:
+    """Run :func:`level_rigs` on a background thread with an anytime best-so-far result."""
+
+    def __init__(self, projects, rigs, maintenance_windows=(), **options: Any) -> None:
+        self._args = (list(projects), list(rigs), list(maintenance_windows))
+        self._options = options
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._best: dict[str, Any] | None = None
+        self._result: dict[str, Any] | None = None
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="rig-leveling", daemon=True)
+
+    def _improved(self, result: dict[str, Any]) -> None:
+        with self._lock:
+            self._best = result
+
+    def _run(self) -> None:
+        try:
+            result = level_rigs(
+                *self._args,
+                on_improvement=self._improved,
+                should_stop=self._cancel.is_set,
+                **self._options,
+            )
+        except BaseException as exc:  # surfaced through result()
+            self._error = exc
+            return
+        with self._lock:
+            self._best = self._result = result
+
+    def start(self) -> LevelingJob:
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Stop the search; :meth:`result` then returns the best schedule so far."""
+        self._cancel.set()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive() and (self._result is not None or self._error is not None)
+
+    @property
+    def best(self) -> dict[str, Any] | None:
+        """Best schedule found so far, or None before the first decode finishes."""
+        with self._lock:
+            return self._best
+
+    def result(self, timeout: float | None = None) -> dict[str, Any] | None:
+        self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._result
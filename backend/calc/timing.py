@@ -0,0 +1,63 @@
+"""
+Wall-clock timers for calc entry points.
+
+``@timed`` records call count, total and max duration per function in a process-wide
+table that callers (e.g. a metrics endpoint) read with :func:`timings`. It is meant for
+coarse entry points; per-item helpers such as ``compute_costs`` stay untimed so hot loops
+do not pay for it.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_lock = threading.Lock()
+# name -> [count, total_s, max_s]
+_stats: dict[str, list[float]] = {}
+
+
+def _record(name: str, elapsed: float) -> None:
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            _stats[name] = [1, elapsed, elapsed]
+        else:
+            stat[0] += 1
+            stat[1] += elapsed
+            if elapsed > stat[2]:
+                stat[2] = elapsed
+
+
+def timed(fn: F) -> F:
+    """Record the duration of every call to ``fn``, including calls that raise."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - started)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def timings() -> dict[str, dict[str, float]]:
+    """Snapshot of ``{function: {"count", "total_s", "max_s"}}``."""
+    with _lock:
+        return {
+            name: {"count": int(count), "total_s": total, "max_s": peak}
+            for name, (count, total, peak) in _stats.items()
+        }
+
+
+def reset_timings() -> None:
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,5 @@
+"""
+Reproducible benchmarks for the calc engine and the API hot paths.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
@@ -0,0 +1,96 @@
+"""
+Compare a benchmark result file against a saved baseline.
+
+A case regresses when its fastest sample exceeds the baseline's by more than the threshold
+(a fraction; 0.2 allows 20% slower) and by at least ``MIN_DELTA_S``. The minimum is the
+least noisy statistic on a shared machine; the median and p95 are kept in the results
+for reading. Cases missing from either side are reported but never fail the comparison.
+
+    python -m benchmarks.compare results.json benchmarks/baseline.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+DEFAULT_THRESHOLD = 0.20
+# Differences below timer/scheduler noise are never reported as regressions
+MIN_DELTA_S = 5e-6
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    thresholds: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Return ``{"regressions", "cases"}`` with one row per case in either file.
+
+    ``thresholds`` overrides ``threshold`` per case name, for noisier cases.
+    """
+    current = results.get("cases", {})
+    saved = baseline.get("cases", {})
+    rows = []
+    for name in sorted(set(current) | set(saved)):
+        limit = (thresholds or {}).get(name, threshold)
+        row: dict[str, Any] = {"name": name, "threshold": limit}
+        if name not in saved:
+            row["status"] = "new"
+        elif name not in current:
+            row["status"] = "missing"
+        else:
+            before, after = saved[name]["min_s"], current[name]["min_s"]
+            ratio = after / before if before > 0 else float("inf")
+            row.update(baseline_s=before, current_s=after, ratio=ratio)
+            if ratio > 1 + limit and after - before >= MIN_DELTA_S:
+                row["status"] = "regression"
+            elif ratio < 1 - limit:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return {
+        "regressions": [row["name"] for row in rows if row["status"] == "regression"],
+        "cases": rows,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [f"{'case':<32} {'baseline':>12} {'current':>12} {'ratio':>8}  status"]
+    for row in report["cases"]:
+        if "ratio" in row:
+            lines.append(
+                f"{row['name']:<32} {row['baseline_s'] * 1e3:>10.3f}ms "
+                f"{row['current_s'] * 1e3:>10.3f}ms {row['ratio']:>7.2f}x  {row['status']}"
+            )
+        else:
+            lines.append(f"{row['name']:<32} {'':>12} {'':>12} {'':>8}  {row['status']}")
+    return "\n".join(lines)
+
+
+def load(path: str | Path) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("results")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results, baseline = load(args.results), load(args.baseline)
+    if results.get("scale") != baseline.get("scale"):
+        print("warning: results and baseline were run at different scales", file=sys.stderr)
+    report = compare(results, baseline, args.threshold)
+    print(format_report(report))
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Seeded synthetic data for benchmarks.
+
+:func:`generate_portfolio` builds calc-style project dicts (as consumed by
+``backend.calc``) on top of the API portfolio from :mod:`src.services.seed`. The same
+``seed`` and :class:`Scale` always produce the same data, ids included.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from src.services.mock_services import load_portfolio
+from src.services.seed import SeedScale
+from src.services.seed import generate_portfolio as generate_seed
+
+ORIGIN = date(2025, 1, 1)
+PROJECT_TYPES = ("exploration", "appraisal", "development", "workover")
+# Share of projects pulled forward onto their predecessor, so conflict detection has work
+OVERLAP_RATE = 0.05
+
+
+@dataclass(frozen=True)
+class Scale:
+    rigs: int
+    wells: int
+    projects: int
+    tasks: int
+    campaigns: int
+    maintenance_windows: int
+
+
+SCALES = {
+    "small": Scale(
+        rigs=10, wells=200, projects=500, tasks=5_000, campaigns=20, maintenance_windows=20
+    ),
+    "medium": Scale(
+        rigs=50, wells=1_000, projects=5_000, tasks=50_000, campaigns=100, maintenance_windows=100
+    ),
+    "large": Scale(
+        rigs=200,
+        wells=5_000,
+        projects=20_000,
+        tasks=200_000,
+        campaigns=400,
+        maintenance_windows=400,
+    ),
+}
+
+
+def generate_portfolio(scale: Scale, seed: int = 0) -> dict[str, Any]:
+    """Return the portfolio as a dict of row lists plus the ``scale`` it was built at.
+
+    Campaigns, rigs, wells, users and tasks come from :mod:`src.services.seed`; on top of
+    those rigs this adds calc ``projects`` laid end to end per rig with occasional
+    overlaps, and ``maintenance_windows``.
+    """
+    rows = generate_seed(
+        SeedScale(
+            users=max(1, scale.tasks // 1_000),
+            campaigns=scale.campaigns,
+            rigs=scale.rigs,
+            wells=scale.wells,
+            tasks=scale.tasks,
+        ),
+        seed,
+    )
+    rng = random.Random(seed)
+    rigs = rows["rigs"]
+    campaigns = rows["campaigns"]
+
+    projects: list[dict[str, Any]] = []
+    cursor = {rig["id"]: ORIGIN for rig in rigs}
+    previous: dict[str, dict[str, Any]] = {}
+    for i in range(scale.projects):
+        rig = rigs[i % len(rigs)]
+        start = cursor[rig["id"]] + timedelta(days=rng.randrange(0, 10))
+        if rig["id"] in previous and rng.random() < OVERLAP_RATE:
+            start = previous[rig["id"]]["planned_start"] + timedelta(days=rng.randrange(1, 10))
+        end = start + timedelta(days=rng.randrange(10, 90))
+        project = {
+            "id": f"p{i:06d}",
+            "rig_id": rig["id"],
+            "platform_id": f"pf{rng.randrange(max(1, scale.rigs // 2)):03d}",
+            "campaign_id": campaigns[i % len(campaigns)]["id"],
+            "project_type": rng.choice(PROJECT_TYPES),
+            "planned_start": start,
+            "planned_end": end,
+            "day_rate": float(rng.randrange(50_000, 400_000, 1_000)),
+            "npt_pct": round(rng.uniform(0, 0.2), 3),
+            "dependencies": [],
+        }
+        projects.append(project)
+        previous[rig["id"]] = project
+        cursor[rig["id"]] = max(cursor[rig["id"]], end)
+
+    horizon = max((p["planned_end"] for p in projects), default=ORIGIN)
+    span = max(1, (horizon - ORIGIN).days)
+    maintenance_windows = []
+    for i in range(scale.maintenance_windows):
+        start = ORIGIN + timedelta(days=rng.randrange(span))
+        window = {
+            "id": f"mw{i:05d}",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randrange(1, 14)),
+        }
+        if rng.random() < 0.5:
+            window["platform_id"] = f"pf{rng.randrange(max(1, scale.rigs // 2)):03d}"
+        else:
+            window["rig_id"] = rigs[rng.randrange(len(rigs))]["id"]
+        maintenance_windows.append(window)
+
+    return {
+        "scale": asdict(scale),
+        "projects": projects,
+        "maintenance_windows": maintenance_windows,
+        **rows,
+    }
+
+
+def load_memory_store(portfolio: dict[str, Any]) -> None:
+    """Replace the contents of the in-memory API store with ``portfolio``."""
+    load_portfolio(portfolio)
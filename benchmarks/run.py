@@ -0,0 +1,263 @@
+"""
+Run the benchmark suite and write machine-readable results.
+
+Calc cases call ``backend.calc`` directly; API cases go through the full ASGI stack
+(middleware included) with an in-process httpx client against the memory backend, which
+is loaded with the same synthetic portfolio.
+
+    python -m benchmarks.run --scale small --output results.json
+    python -m benchmarks.run --scale medium --baseline benchmarks/baseline.json
+    python -m benchmarks.run --scale medium --save-baseline benchmarks/baseline.json
+
+With ``--baseline`` the exit status is 1 when any case regresses past
+``--threshold``, so the suite can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import UTC, datetime
+from typing import Any
+
+from backend.calc.availability import BlockedCalendar
+from backend.calc.engine import (
+    compute_costs,
+    compute_duration,
+    compute_rig_utilization,
+    detect_conflicts,
+    estimate_eta,
+)
+from backend.calc.montecarlo import simulate_eta
+
+from .compare import DEFAULT_THRESHOLD, compare, format_report, load
+from .generators import SCALES, generate_portfolio
+
+# Monte Carlo runs are far slower per project than the other cases
+ETA_ITERATIONS = 2_000
+API_PAGE_SIZE = 100
+# Fast cases are looped until one sample takes this long, so timer noise stays small
+MIN_SAMPLE_S = 0.05
+
+
+def _sample(fn: Callable[[], Any], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Per-call seconds over ``repeat`` samples of ``fn``.
+
+    The first (untimed) call warms caches; the loop count per sample then doubles until a
+    sample lasts ``MIN_SAMPLE_S``, as ``timeit`` does.
+    """
+    fn()
+    number = 1
+    while _sample(fn, number) * number < MIN_SAMPLE_S:
+        number *= 2
+    ordered = sorted(_sample(fn, number) for _ in range(repeat))
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min_s": ordered[0],
+        "median_s": statistics.median(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "p95_s": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "stdev_s": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def calc_cases(portfolio: dict[str, Any]) -> dict[str, Callable[[], Any]]:
+    projects = portfolio["projects"]
+    windows = portfolio["maintenance_windows"]
+    start = min(p["planned_start"] for p in projects)
+    end = max(p["planned_end"] for p in projects)
+    by_rig: dict[str, list[dict[str, Any]]] = {}
+    for p in projects:
+        by_rig.setdefault(p["rig_id"], []).append(p)
+
+    def utilization() -> None:
+        for items in by_rig.values():
+            compute_rig_utilization(items, start, end)
+
+    def costs() -> None:
+        for p in projects:
+            compute_costs(
+                p["day_rate"], compute_duration(p["planned_start"], p["planned_end"]), None
+            )
+
+    def eta() -> None:
+        for items in by_rig.values():
+            estimate_eta(p["planned_end"] for p in items)
+
+    calendar = BlockedCalendar(windows)
+    spans = [
+        (
+            p["platform_id"],
+            p["rig_id"],
+            p["planned_start"].toordinal(),
+            p["planned_end"].toordinal(),
+        )
+        for p in projects
+    ]
+
+    def maintenance_check() -> None:
+        # The per-drag check: is the new interval clear of its platform's and rig's windows
+        for platform_id, rig_id, start, end in spans:
+            calendar.is_free(("platform", platform_id), start, end) and calendar.is_free(
+                ("rig", rig_id), start, end
+            )
+
+    return {
+        "calc.compute_rig_utilization": utilization,
+        "calc.detect_conflicts": lambda: detect_conflicts(projects, windows),
+        "calc.maintenance_check": maintenance_check,
+        "calc.compute_costs": costs,
+        "calc.estimate_eta": eta,
+        "calc.simulate_eta": lambda: simulate_eta(projects, iterations=ETA_ITERATIONS, seed=0),
+    }
+
+
+def api_cases(portfolio: dict[str, Any]) -> tuple[dict[str, Callable[[], Any]], Callable]:
+    """Load the memory store and return ``(cases, close)`` driving the app over ASGI."""
+    if os.environ.setdefault("STORAGE_BACKEND", "memory") != "memory":
+        raise SystemExit("API benchmarks run against the memory backend; unset STORAGE_BACKEND")
+
+    import httpx
+
+    from src.main import app
+
+    from .generators import load_memory_store
+
+    load_memory_store(portfolio)
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    campaign_id = portfolio["campaigns"][0]["id"]
+
+    def get(path: str, **params: Any) -> Callable[[], Any]:
+        def call() -> None:
+            response = loop.run_until_complete(client.get(path, params=params))
+            response.raise_for_status()
+
+        return call
+
+    def post(path: str, body: dict[str, Any]) -> Callable[[], Any]:
+        def call() -> None:
+            response = loop.run_until_complete(client.post(path, json=body))
+            response.raise_for_status()
+
+        return call
+
+    def close() -> None:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+    cases = {
+        "api.tasks": get("/tasks/", limit=API_PAGE_SIZE),
+        "api.tasks_by_campaign": get("/tasks/", campaign_id=campaign_id, limit=API_PAGE_SIZE),
+        "api.tasks_by_status": get("/tasks/", status="blocked", limit=API_PAGE_SIZE),
+        "api.dashboard_overview": get("/dashboard/overview"),
+        # Repeated blocks of one query shape are served from the grid result cache
+        "api.grid_tasks_block": post(
+            "/grid/tasks",
+            {
+                "startRow": API_PAGE_SIZE,
+                "endRow": 2 * API_PAGE_SIZE,
+                "sortModel": [{"colId": "due_date", "sort": "desc"}],
+                "filterModel": {"status": {"filterType": "set", "values": ["backlog", "blocked"]}},
+            },
+        ),
+        "api.aggregate_tasks_pivot": post(
+            "/aggregate/tasks",
+            {"group_by": ["priority"], "pivot": "status", "measures": [{"func": "count"}]},
+        ),
+    }
+    return cases, close
+
+
+def run(
+    scale_name: str,
+    repeat: int,
+    seed: int = 0,
+    only: str | None = None,
+    **overrides: int,
+) -> dict[str, Any]:
+    scale = replace(SCALES[scale_name], **overrides)
+    portfolio = generate_portfolio(scale, seed)
+    cases = calc_cases(portfolio)
+    api, close = api_cases(portfolio)
+    cases.update(api)
+    try:
+        results = {
+            name: measure(fn, repeat)
+            for name, fn in cases.items()
+            if only is None or name.startswith(only)
+        }
+    finally:
+        close()
+    return {
+        "scale": {"name": scale_name, "seed": seed, **portfolio["scale"]},
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "started_at": datetime.now(UTC).isoformat(),
+        "cases": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="run cases whose name starts with this prefix")
+    for field in ("rigs", "wells", "projects", "tasks", "campaigns"):
+        parser.add_argument(f"--{field}", type=int, help=f"override the scale's {field}")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", help="also write the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        field: getattr(args, field)
+        for field in ("rigs", "wells", "projects", "tasks", "campaigns")
+        if getattr(args, field) is not None
+    }
+    results = run(args.scale, args.repeat, args.seed, args.only, **overrides)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    elif not args.baseline:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+    if args.baseline:
+        baseline = load(args.baseline)
+        if baseline.get("scale") != results["scale"]:
+            print("warning: baseline was run at a different scale", file=sys.stderr)
+        report = compare(results, baseline, args.threshold)
+        print(format_report(report))
+        return 1 if report["regressions"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,4 +3,9 @@ from .campaigns import router as campaigns_router
 from .tasks import router as tasks_router
 from .rigs import router as rigs_router
 from .wells import router as wells_router
-from .dashboard import router as dashboard_router
\ No newline at end of file
+from .dashboard import router as dashboard_router
+from .scenarios import router as scenarios_router
+from .metrics import router as metrics_router
+from .grid import router as grid_router
+from .aggregates import router as aggregates_router
+from .attachments import router as attachments_router
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.models.aggregate import AggregateEntity, AggregateRequest, AggregateResult
+from src.repositories import Repository, get_repository
+from src.api.serialization import model_response
+from src.services.aggregation import AggregateQueryError
+
+router = APIRouter(prefix="/aggregate", tags=["aggregate"])
+
+
+@router.post("/{entity}", response_model=AggregateResult)
+def aggregate(entity: AggregateEntity, request: AggregateRequest, repo: Repository = Depends(get_repository)):
+    """
+    Grouped counts and aggregates of an entity, optionally pivoted on one more field,
+    with row and overall totals. Results are cached until the next write.
+    """
+    try:
+        result = repo.aggregate(entity.value, request)
+    except AggregateQueryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return model_response(AggregateResult, result)
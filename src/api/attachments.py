@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from src.models.attachment import AttachmentCreate, AttachmentOut, AttachmentOwnerType
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response, model_response
+from src.services.blob_store import CHUNK_SIZE, MAX_ATTACHMENT_SIZE, BlobTooLarge, blob_store
+from typing import List
+
+router = APIRouter(prefix="/attachments", tags=["attachments"])
+
+
+def _owner_exists(repo: Repository, owner_type: AttachmentOwnerType, owner_id: str) -> bool:
+    lookup = {
+        AttachmentOwnerType.campaign: repo.get_campaign,
+        AttachmentOwnerType.task: repo.get_task,
+        AttachmentOwnerType.well: repo.get_well,
+    }[owner_type]
+    return lookup(owner_id) is not None
+
+
+async def _chunks(request: Request):
+    # Request bodies arrive in small messages; batch them so each disk write is a chunk
+    buffer = bytearray()
+    async for message in request.stream():
+        buffer += message
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _record_upload(repo: Repository, writer, attachment: dict):
+    # Serialized, across workers, against releasing unused blobs (see blob_store.release),
+    # so a deduplicated upload never ends up pointing at a blob that was just deleted
+    with blob_store.locked():
+        blob = writer.commit()
+        return repo.create_attachment(
+            AttachmentCreate(**attachment, size=blob.size, sha256=blob.sha256, s3_key=blob.key)
+        )
+
+
+@router.post("/", response_model=AttachmentOut, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    request: Request,
+    owner_type: AttachmentOwnerType,
+    owner_id: str,
+    filename: str = Query(..., min_length=1, max_length=255),
+    uploaded_by: str = Query(..., min_length=1),
+    repo: Repository = Depends(get_repository),
+):
+    """
+    Store the raw request body as a file attached to a campaign, task or well.
+
+    The body is streamed to disk and hashed as it arrives, so files of any size are never
+    held in memory. A file with the same content as one already stored shares its blob.
+    """
+    if not await run_in_threadpool(_owner_exists, repo, owner_type, owner_id):
+        raise HTTPException(status_code=404, detail=f"{owner_type.value.capitalize()} not found")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_ATTACHMENT_SIZE:
+        raise HTTPException(status_code=413, detail=f"Attachments are limited to {MAX_ATTACHMENT_SIZE} bytes")
+
+    writer = await run_in_threadpool(blob_store.writer, MAX_ATTACHMENT_SIZE)
+    try:
+        async for chunk in _chunks(request):
+            await run_in_threadpool(writer.write, chunk)
+    except BlobTooLarge as exc:
+        await run_in_threadpool(writer.abort)
+        raise HTTPException(status_code=413, detail=str(exc))
+    except BaseException:
+        # Client disconnects and cancellation included: never leave a partial upload
+        await run_in_threadpool(writer.abort)
+        raise
+    attachment = {
+        "owner_type": owner_type,
+        "owner_id": owner_id,
+        "filename": filename,
+        "content_type": request.headers.get("content-type") or "application/octet-stream",
+        "uploaded_by": uploaded_by,
+    }
+    return await run_in_threadpool(_record_upload, repo, writer, attachment)
+
+
+@router.get("/", response_model=List[AttachmentOut])
+def read_attachments(
+    owner_type: AttachmentOwnerType,
+    owner_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    repo: Repository = Depends(get_repository),
+):
+    return list_response(AttachmentOut, repo.get_attachments(owner_type.value, owner_id, skip=skip, limit=limit))
+
+
+@router.get("/{attachment_id}", response_model=AttachmentOut)
+def read_attachment(attachment_id: str, repo: Repository = Depends(get_repository)):
+    attachment = repo.get_attachment(attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return model_response(AttachmentOut, attachment)
+
+
+@router.get("/{attachment_id}/content", response_class=FileResponse)
+# HEAD is served by the same handler, but documenting it would repeat the GET operation
+@router.head("/{attachment_id}/content", response_class=FileResponse, include_in_schema=False)
+def download_attachment(attachment_id: str, repo: Repository = Depends(get_repository)):
+    """
+    Serve the file from disk in chunks, with Range requests for partial and resumed
+    downloads. Servers that support the ASGI pathsend extension send it with sendfile.
+    """
+    attachment = repo.get_attachment(attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    key = blob_store.key_for(attachment.sha256)
+    if not blob_store.exists(key):
+        raise HTTPException(status_code=404, detail="Attachment content not found")
+    # An attachment's content never changes, so its hash is a strong validator
+    return FileResponse(
+        blob_store.path(key),
+        media_type=attachment.content_type,
+        filename=attachment.filename,
+        headers={"ETag": f'"{attachment.sha256}"', "Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+@router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_existing_attachment(attachment_id: str, repo: Repository = Depends(get_repository)):
+    attachment = repo.delete_attachment(attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    blob_store.release([attachment.sha256], repo.blob_in_use)
+    return
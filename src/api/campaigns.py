@@ -1,49 +1,61 @@
-from fastapi import APIRouter, HTTPException, status
-from src.models.campaign import CampaignCreate, CampaignOut, CampaignUpdate
-from src.services.mock_services import create_campaign, get_campaign, get_campaigns, update_campaign, delete_campaign
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from src.models.campaign import CampaignCreate, CampaignKpi, CampaignOut, CampaignUpdate
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response, model_response
+from src.middleware import conditional_response
+from datetime import date
 from typing import List
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
 
 @router.post("/", response_model=CampaignOut, status_code=status.HTTP_201_CREATED)
-def create_new_campaign(campaign: CampaignCreate):
-    # For mock implementation, we don't actually use a database session
-    db_campaign = create_campaign(None, campaign)
+def create_new_campaign(campaign: CampaignCreate, repo: Repository = Depends(get_repository)):
+    db_campaign = repo.create_campaign(campaign)
     if not db_campaign:
         raise HTTPException(status_code=400, detail="Campaign could not be created")
     return db_campaign
 
 
 @router.get("/", response_model=List[CampaignOut])
-def read_campaigns(skip: int = 0, limit: int = 100):
-    # For mock implementation, we don't actually use a database session
-    campaigns = get_campaigns(None, skip=skip, limit=limit)
-    return campaigns
+def read_campaigns(request: Request, skip: int = 0, limit: int = 100, repo: Repository = Depends(get_repository)):
+    campaigns = repo.get_campaigns(skip=skip, limit=limit)
+    return conditional_response(request, campaigns, lambda: list_response(CampaignOut, campaigns), date.today())
+
+
+@router.get("/kpis", response_model=List[CampaignKpi])
+def read_campaign_kpis(request: Request, skip: int = 0, limit: int = 100, repo: Repository = Depends(get_repository)):
+    kpis = repo.get_campaign_kpis(skip=skip, limit=limit)
+    return conditional_response(request, kpis, lambda: list_response(CampaignKpi, kpis), date.today())
 
 
 @router.get("/{campaign_id}", response_model=CampaignOut)
-def read_campaign(campaign_id: int):
-    # For mock implementation, we don't actually use a database session
-    db_campaign = get_campaign(None, campaign_id)
+def read_campaign(campaign_id: str, request: Request, repo: Repository = Depends(get_repository)):
+    db_campaign = repo.get_campaign(campaign_id)
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return db_campaign
+    return conditional_response(request, [db_campaign], lambda: model_response(CampaignOut, db_campaign), date.today())
+
+
+@router.get("/{campaign_id}/kpis", response_model=CampaignKpi)
+def read_campaign_kpi(campaign_id: str, request: Request, repo: Repository = Depends(get_repository)):
+    kpi = repo.get_campaign_kpi(campaign_id)
+    if not kpi:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return conditional_response(request, [kpi], lambda: model_response(CampaignKpi, kpi), date.today())
 
 
 @router.put("/{campaign_id}", response_model=CampaignOut)
-def update_existing_campaign(campaign_id: int, campaign_update: CampaignUpdate):
-    # For mock implementation, we don't actually use a database session
-    db_campaign = update_campaign(None, campaign_id, campaign_update)
+def update_existing_campaign(campaign_id: str, campaign_update: CampaignUpdate, repo: Repository = Depends(get_repository)):
+    db_campaign = repo.update_campaign(campaign_id, campaign_update)
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     return db_campaign
 
 
 @router.delete("/{campaign_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_campaign(campaign_id: int):
-    # For mock implementation, we don't actually use a database session
-    db_campaign = delete_campaign(None, campaign_id)
+def delete_existing_campaign(campaign_id: str, repo: Repository = Depends(get_repository)):
+    db_campaign = repo.delete_campaign(campaign_id)
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     return
\ No newline at end of file
@@ -1,70 +1,54 @@
-from fastapi import APIRouter
-from src.services.mock_services import get_campaigns, get_campaign_progress, get_campaign_days_elapsed, get_campaign_status, get_rigs
+from datetime import date
+from fastapi import APIRouter, Depends, Request
+from src.repositories import Repository, get_repository
+from src.api.serialization import FastJSONResponse, list_response
+from src.middleware import conditional_response
+from src.models.campaign import CampaignKpi
 from typing import List, Dict, Any
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/overview")
-def get_dashboard_overview():
-    # For mock implementation, we don't actually use a database session
-    # Get all campaigns
-    campaigns = get_campaigns(None)
-    
-    # Calculate overview metrics
-    total_campaigns = len(campaigns)
-    active_campaigns = [c for c in campaigns if get_campaign_status(c) != "Completed"]
-    
-    # Get rig information
-    rigs = get_rigs(None)
+def get_dashboard_overview(request: Request, repo: Repository = Depends(get_repository)):
+    kpis = repo.get_campaign_kpis()
+    rigs = repo.get_rigs()
+    # Days elapsed change daily, so the date is part of the ETag
+    return conditional_response(
+        request, [*kpis, *rigs], lambda: FastJSONResponse(_overview(kpis, rigs)), date.today()
+    )
+
+
+def _overview(kpis, rigs):
+    # Campaign figures come precomputed from the KPI store
+    campaign_names = {kpi.campaign_id: kpi.campaign_name for kpi in kpis}
+    active_campaigns = [kpi for kpi in kpis if kpi.status != "Completed"]
     
     # Prepare rig status data
     rig_status_data = []
     for rig in rigs:
-        campaign = next((c for c in campaigns if str(c.id) == str(rig.campaign_id)), None)
+        campaign_name = campaign_names.get(str(rig.campaign_id))
         rig_status_data.append({
             "rig_id": str(rig.id),
             "rig_name": rig.name,
-            "campaign_id": str(rig.campaign_id) if campaign else None,
-            "campaign_name": campaign.name if campaign else None,
+            "campaign_id": str(rig.campaign_id) if campaign_name else None,
+            "campaign_name": campaign_name,
             "status": rig.status or "Unknown"
         })
     
-    # Prepare KPI data
-    kpi_data = []
-    for campaign in campaigns:
-        kpi_data.append({
-            "campaign_id": str(campaign.id),
-            "campaign_name": campaign.name,
-            "progress_pct": get_campaign_progress(campaign),
-            "days_elapsed": get_campaign_days_elapsed(campaign),
-            "status": get_campaign_status(campaign)
-        })
-    
     return {
-        "total_campaigns": total_campaigns,
+        "total_campaigns": len(kpis),
         "active_campaigns": len(active_campaigns),
+        "open_tasks": sum(kpi.open_tasks for kpi in kpis),
         "rigs": rig_status_data,
-        "kpis": kpi_data
+        "kpis": kpis
     }
 
 
-@router.get("/kpis")
-def get_kpi_data():
-    # For mock implementation, we don't actually use a database session
-    campaigns = get_campaigns(None)
-    
-    kpi_data = []
-    for campaign in campaigns:
-        kpi_data.append({
-            "campaign_id": str(campaign.id),
-            "campaign_name": campaign.name,
-            "progress_pct": get_campaign_progress(campaign),
-            "days_elapsed": get_campaign_days_elapsed(campaign),
-            "status": get_campaign_status(campaign)
-        })
-    
-    return kpi_data
+@router.get("/kpis", response_model=List[CampaignKpi])
+def get_kpi_data(request: Request, skip: int = 0, limit: int = 100, repo: Repository = Depends(get_repository)):
+    kpis = repo.get_campaign_kpis(skip=skip, limit=limit)
+    return conditional_response(request, kpis, lambda: list_response(CampaignKpi, kpis), date.today())
 
 
 @router.get("/alerts")
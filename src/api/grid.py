@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.models.grid import GridEntity, GridRequest, GridResponse
+from src.repositories import Repository, get_repository
+from src.api.serialization import model_response
+from src.services.grid_query import GridQueryError
+
+router = APIRouter(prefix="/grid", tags=["grid"])
+
+
+@router.post("/{entity}", response_model=GridResponse)
+def read_grid_rows(entity: GridEntity, request: GridRequest, repo: Repository = Depends(get_repository)):
+    """
+    Server-side row model datasource: post AG Grid's ``params.request`` and pass the
+    result to ``params.success``. Rows are filtered, sorted, grouped and paged server-side.
+    """
+    try:
+        result = repo.get_grid_rows(entity.value, request)
+    except GridQueryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return model_response(GridResponse, result)
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from src.auth.dependencies import admin_required
+from src.instrumentation import get_profile, render_metrics
+import src.instrumentation.collectors  # noqa: F401  registers calc and cache collectors
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Prometheus text exposition: route latency, DB usage, calc timers and cache stats.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(admin_required)])
+def read_profile(profile_id: str):
+    """
+    Collapsed stacks of a request sent with ``X-Profile: 1`` (see its X-Profile-Id header).
+    Profiles expose code paths, so only admins can read them.
+    """
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile)
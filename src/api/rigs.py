@@ -1,49 +1,65 @@
-from fastapi import APIRouter, HTTPException, status
-from src.models.rig import RigCreate, RigOut, RigUpdate
-from src.services.mock_services import create_rig, get_rig, get_rigs, update_rig, delete_rig
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from src.models.rig import RigCreate, RigDistance, RigOut, RigUpdate
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response, model_response
+from src.middleware import conditional_response
+from src.services.rig_locations import nearest_rigs
 from typing import List, Optional
 
 router = APIRouter(prefix="/rigs", tags=["rigs"])
 
 
 @router.post("/", response_model=RigOut, status_code=status.HTTP_201_CREATED)
-def create_new_rig(rig: RigCreate):
-    # For mock implementation, we don't actually use a database session
-    db_rig = create_rig(None, rig)
+def create_new_rig(rig: RigCreate, repo: Repository = Depends(get_repository)):
+    db_rig = repo.create_rig(rig)
     if not db_rig:
         raise HTTPException(status_code=400, detail="Rig could not be created")
     return db_rig
 
 
 @router.get("/", response_model=List[RigOut])
-def read_rigs(skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
-    # For mock implementation, we don't actually use a database session
-    rigs = get_rigs(None, skip=skip, limit=limit, campaign_id=campaign_id)
-    return rigs
+def read_rigs(request: Request, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None, repo: Repository = Depends(get_repository)):
+    rigs = repo.get_rigs(skip=skip, limit=limit, campaign_id=campaign_id)
+    return conditional_response(request, rigs, lambda: list_response(RigOut, rigs))
+
+
+@router.get("/nearest", response_model=List[RigDistance])
+def read_nearest_rigs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(5, ge=1, le=100),
+    available_only: bool = True,
+    speed_knots: Optional[float] = Query(None, gt=0),
+    repo: Repository = Depends(get_repository),
+):
+    """
+    Rigs closest to a location by great-circle distance, with the move time at
+    ``speed_knots`` (4 knots if not given). By default only idle rigs are returned.
+    """
+    return nearest_rigs(
+        repo.get_rigs, lat, lon, limit=limit, available_only=available_only, speed_knots=speed_knots
+    )
 
 
 @router.get("/{rig_id}", response_model=RigOut)
-def read_rig(rig_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_rig = get_rig(None, rig_id)
+def read_rig(rig_id: str, request: Request, repo: Repository = Depends(get_repository)):
+    db_rig = repo.get_rig(rig_id)
     if not db_rig:
         raise HTTPException(status_code=404, detail="Rig not found")
-    return db_rig
+    return conditional_response(request, [db_rig], lambda: model_response(RigOut, db_rig))
 
 
 @router.put("/{rig_id}", response_model=RigOut)
-def update_existing_rig(rig_id: str, rig_update: RigUpdate):
-    # For mock implementation, we don't actually use a database session
-    db_rig = update_rig(None, rig_id, rig_update)
+def update_existing_rig(rig_id: str, rig_update: RigUpdate, repo: Repository = Depends(get_repository)):
+    db_rig = repo.update_rig(rig_id, rig_update)
     if not db_rig:
         raise HTTPException(status_code=404, detail="Rig not found")
     return db_rig
 
 
 @router.delete("/{rig_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_rig(rig_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_rig = delete_rig(None, rig_id)
+def delete_existing_rig(rig_id: str, repo: Repository = Depends(get_repository)):
+    db_rig = repo.delete_rig(rig_id)
     if not db_rig:
         raise HTTPException(status_code=404, detail="Rig not found")
     return
\ No newline at end of file
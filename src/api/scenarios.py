@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from src.models.scenario import ScenarioCreate, ScenarioClone, ScenarioOut, ScenarioRecord, ScenarioRecordKind
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response
+from typing import Any, Dict, List
+
+router = APIRouter(prefix="/scenarios", tags=["scenarios"])
+
+
+@router.post("/", response_model=ScenarioOut, status_code=status.HTTP_201_CREATED)
+def create_new_scenario(scenario: ScenarioCreate, repo: Repository = Depends(get_repository)):
+    return repo.create_scenario(scenario)
+
+
+@router.get("/", response_model=List[ScenarioOut])
+def read_scenarios(skip: int = 0, limit: int = 100, repo: Repository = Depends(get_repository)):
+    return list_response(ScenarioOut, repo.get_scenarios(skip=skip, limit=limit))
+
+
+@router.get("/{scenario_id}", response_model=ScenarioOut)
+def read_scenario(scenario_id: str, repo: Repository = Depends(get_repository)):
+    db_scenario = repo.get_scenario(scenario_id)
+    if not db_scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return db_scenario
+
+
+@router.post("/{scenario_id}/clone", response_model=ScenarioOut, status_code=status.HTTP_201_CREATED)
+def clone_existing_scenario(scenario_id: str, clone: ScenarioClone, repo: Repository = Depends(get_repository)):
+    db_scenario = repo.clone_scenario(scenario_id, clone)
+    if not db_scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return db_scenario
+
+
+@router.post("/{scenario_id}/materialize", response_model=ScenarioOut)
+def materialize_existing_scenario(scenario_id: str, repo: Repository = Depends(get_repository)):
+    db_scenario = repo.materialize_scenario(scenario_id)
+    if not db_scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return db_scenario
+
+
+@router.get("/{scenario_id}/diff/{other_id}")
+def read_scenario_diff(scenario_id: str, other_id: str, repo: Repository = Depends(get_repository)):
+    diff = repo.diff_scenarios(scenario_id, other_id)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return diff
+
+
+@router.get("/{scenario_id}/{kind}", response_model=List[ScenarioRecord])
+def read_scenario_records(scenario_id: str, kind: ScenarioRecordKind, repo: Repository = Depends(get_repository)):
+    if not repo.get_scenario(scenario_id):
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return list_response(ScenarioRecord, repo.get_scenario_records(scenario_id, kind.value))
+
+
+@router.get("/{scenario_id}/{kind}/{key}", response_model=ScenarioRecord)
+def read_scenario_record(scenario_id: str, kind: ScenarioRecordKind, key: str, repo: Repository = Depends(get_repository)):
+    record = repo.get_scenario_record(scenario_id, kind.value, key)
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return record
+
+
+@router.put("/{scenario_id}/{kind}/{key}", response_model=ScenarioRecord)
+def write_scenario_record(scenario_id: str, kind: ScenarioRecordKind, key: str, data: Dict[str, Any], repo: Repository = Depends(get_repository)):
+    record = repo.put_scenario_record(scenario_id, kind.value, key, data)
+    if not record:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return record
+
+
+@router.delete("/{scenario_id}/{kind}/{key}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_existing_scenario_record(scenario_id: str, kind: ScenarioRecordKind, key: str, repo: Repository = Depends(get_repository)):
+    record = repo.delete_scenario_record(scenario_id, kind.value, key)
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return
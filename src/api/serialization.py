@@ -0,0 +1,111 @@
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Type, Union, get_args, get_origin, get_type_hints
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Naive datetimes keep pydantic's ISO format; aware UTC ones get the same "Z" suffix
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+
+def _default(value: Any):
+    # pydantic emits Decimal as a string in JSON mode; keep the wire format unchanged
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return serializer_for(type(value))(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson; the app-wide default response class.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+_serializers: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+
+
+def _model_fields(model: Type[BaseModel]) -> List[str]:
+    fields = getattr(model, "model_fields", None)
+    if fields is None:  # pydantic 1.x
+        fields = model.__fields__
+    return list(fields)
+
+
+def _nested_model(annotation) -> Union[Type[BaseModel], None]:
+    """
+    Return the model class inside ``Model``, ``Optional[Model]`` or ``List[Model]``.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (list, List, Union):
+        for arg in get_args(annotation):
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                return arg
+    return None
+
+
+def serializer_for(model: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build (once per model) a function turning an object into a dict of the model's fields.
+
+    Values are taken as-is: the object is trusted to already satisfy ``model``, as the
+    repository's ``*Out`` models do, so there is no validation pass. Only the fields of
+    ``model`` are emitted, matching what ``response_model`` filtering would return.
+    """
+    serializer = _serializers.get(model)
+    if serializer is not None:
+        return serializer
+
+    hints = get_type_hints(model)
+    fields = []
+    for name in _model_fields(model):
+        inner = _nested_model(hints.get(name))
+        many = inner is not None and get_origin(hints[name]) in (list, List)
+        fields.append((name, inner, many))
+    names = [name for name, _, _ in fields]
+
+    if all(inner is None for _, inner, _ in fields):
+        def serialize(obj) -> Dict[str, Any]:
+            return {name: getattr(obj, name) for name in names}
+    else:
+        def serialize(obj) -> Dict[str, Any]:
+            data = {}
+            for name, inner, many in fields:
+                value = getattr(obj, name)
+                if inner is not None and value is not None:
+                    convert = serializer_for(inner)
+                    value = [convert(item) for item in value] if many else convert(value)
+                data[name] = value
+            return data
+
+    _serializers[model] = serialize
+    return serialize
+
+
+def list_response(model: Type[BaseModel], items: Iterable[Any]) -> FastJSONResponse:
+    """
+    Serialize trusted service results directly, skipping ``response_model`` re-validation.
+
+    Endpoints keep ``response_model`` for the OpenAPI schema; returning a Response makes
+    FastAPI pass it through untouched.
+    """
+    convert = serializer_for(model)
+    return FastJSONResponse([convert(item) for item in items])
+
+
+def model_response(model: Type[BaseModel], item: Any) -> FastJSONResponse:
+    """
+    Single-object counterpart of :func:`list_response`.
+    """
+    return FastJSONResponse(serializer_for(model)(item))
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
-from src.models.task import TaskCreate, TaskOut, TaskUpdate, TaskCommentCreate
-from src.services.mock_services import create_task, get_task, get_tasks, update_task, delete_task, add_task_comment, get_task_comments
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from src.models.task import TaskCreate, TaskOut, TaskUpdate, TaskCommentCreate, TaskCommentPage, TaskSearchResult, TaskStatus
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response, model_response
+from src.middleware import conditional_response
+from src.services.task_comments import DEFAULT_COMMENT_PAGE_SIZE, MAX_COMMENT_PAGE_SIZE, CommentCursorError, decode_cursor
 from typing import List, Optional
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
 @router.post("/", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
-def create_new_task(task: TaskCreate):
-    # For mock implementation, we don't actually use a database session
-    db_task = create_task(None, task)
+def create_new_task(task: TaskCreate, repo: Repository = Depends(get_repository)):
+    db_task = repo.create_task(task)
     if not db_task:
         raise HTTPException(status_code=400, detail="Task could not be created")
     return db_task
@@ -17,54 +19,83 @@ def create_new_task(task: TaskCreate):
 
 @router.get("/", response_model=List[TaskOut])
 def read_tasks(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
-    campaign_id: Optional[int] = None, 
-    status: Optional[str] = None
+    campaign_id: Optional[str] = None, 
+    status: Optional[str] = None,
+    repo: Repository = Depends(get_repository)
 ):
-    # For mock implementation, we don't actually use a database session
-    tasks = get_tasks(None, skip=skip, limit=limit, campaign_id=campaign_id, status=status)
-    return tasks
+    tasks = repo.get_tasks(skip=skip, limit=limit, campaign_id=campaign_id, status=status)
+    return conditional_response(request, tasks, lambda: list_response(TaskOut, tasks))
+
+
+@router.get("/search", response_model=TaskSearchResult)
+def search_tasks(
+    q: Optional[str] = Query(None, description="Terms to match in title, labels, description and comments; append * for a prefix"),
+    prefix: bool = Query(True, description="Treat the last term as a prefix (search as you type)"),
+    status: Optional[TaskStatus] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    campaign_id: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    repo: Repository = Depends(get_repository)
+):
+    result = repo.search_tasks(
+        q, skip=skip, limit=limit, prefix=prefix, status=status.value if status else None,
+        priority=priority, assigned_to=assigned_to, campaign_id=campaign_id
+    )
+    return model_response(TaskSearchResult, result)
 
 
 @router.get("/{task_id}", response_model=TaskOut)
-def read_task(task_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_task = get_task(None, task_id)
+def read_task(task_id: str, request: Request, repo: Repository = Depends(get_repository)):
+    db_task = repo.get_task(task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    return conditional_response(request, [db_task], lambda: model_response(TaskOut, db_task))
 
 
 @router.put("/{task_id}", response_model=TaskOut)
-def update_existing_task(task_id: str, task_update: TaskUpdate):
-    # For mock implementation, we don't actually use a database session
-    db_task = update_task(None, task_id, task_update)
+def update_existing_task(task_id: str, task_update: TaskUpdate, repo: Repository = Depends(get_repository)):
+    db_task = repo.update_task(task_id, task_update)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_task(task_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_task = delete_task(None, task_id)
+def delete_existing_task(task_id: str, repo: Repository = Depends(get_repository)):
+    db_task = repo.delete_task(task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     return
 
 
 @router.post("/{task_id}/comments", response_model=TaskOut)
-def add_comment_to_task(task_id: str, comment: TaskCommentCreate):
-    # For mock implementation, we don't actually use a database session
-    db_comment = add_task_comment(None, task_id, comment)
+def add_comment_to_task(task_id: str, comment: TaskCommentCreate, repo: Repository = Depends(get_repository)):
+    db_comment = repo.add_task_comment(task_id, comment)
     if not db_comment:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_comment
 
 
-@router.get("/{task_id}/comments", response_model=List[TaskCommentCreate])
-def get_task_comments_list(task_id: str):
-    # For mock implementation, we don't actually use a database session
-    comments = get_task_comments(None, task_id)
-    return comments
\ No newline at end of file
+@router.get("/{task_id}/comments", response_model=TaskCommentPage)
+def get_task_comments_list(
+    task_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_COMMENT_PAGE_SIZE, ge=1, le=MAX_COMMENT_PAGE_SIZE),
+    repo: Repository = Depends(get_repository),
+):
+    """
+    A task's comments oldest first, one page at a time; follow ``next_cursor`` for more.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except CommentCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    page = repo.get_task_comments(task_id, after=after, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return model_response(TaskCommentPage, page)
\ No newline at end of file
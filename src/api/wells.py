@@ -1,49 +1,46 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from src.models.well import WellCreate, WellOut, WellUpdate
-from src.services.mock_services import create_well, get_well, get_wells, update_well, delete_well
+from src.repositories import Repository, get_repository
+from src.api.serialization import list_response, model_response
+from src.middleware import conditional_response
 from typing import List, Optional
 
 router = APIRouter(prefix="/wells", tags=["wells"])
 
 
 @router.post("/", response_model=WellOut, status_code=status.HTTP_201_CREATED)
-def create_new_well(well: WellCreate):
-    # For mock implementation, we don't actually use a database session
-    db_well = create_well(None, well)
+def create_new_well(well: WellCreate, repo: Repository = Depends(get_repository)):
+    db_well = repo.create_well(well)
     if not db_well:
         raise HTTPException(status_code=400, detail="Well could not be created")
     return db_well
 
 
 @router.get("/", response_model=List[WellOut])
-def read_wells(skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
-    # For mock implementation, we don't actually use a database session
-    wells = get_wells(None, skip=skip, limit=limit, campaign_id=campaign_id)
-    return wells
+def read_wells(request: Request, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None, repo: Repository = Depends(get_repository)):
+    wells = repo.get_wells(skip=skip, limit=limit, campaign_id=campaign_id)
+    return conditional_response(request, wells, lambda: list_response(WellOut, wells))
 
 
 @router.get("/{well_id}", response_model=WellOut)
-def read_well(well_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_well = get_well(None, well_id)
+def read_well(well_id: str, request: Request, repo: Repository = Depends(get_repository)):
+    db_well = repo.get_well(well_id)
     if not db_well:
         raise HTTPException(status_code=404, detail="Well not found")
-    return db_well
+    return conditional_response(request, [db_well], lambda: model_response(WellOut, db_well))
 
 
 @router.put("/{well_id}", response_model=WellOut)
-def update_existing_well(well_id: str, well_update: WellUpdate):
-    # For mock implementation, we don't actually use a database session
-    db_well = update_well(None, well_id, well_update)
+def update_existing_well(well_id: str, well_update: WellUpdate, repo: Repository = Depends(get_repository)):
+    db_well = repo.update_well(well_id, well_update)
     if not db_well:
         raise HTTPException(status_code=404, detail="Well not found")
     return db_well
 
 
 @router.delete("/{well_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_well(well_id: str):
-    # For mock implementation, we don't actually use a database session
-    db_well = delete_well(None, well_id)
+def delete_existing_well(well_id: str, repo: Repository = Depends(get_repository)):
+    db_well = repo.delete_well(well_id)
     if not db_well:
         raise HTTPException(status_code=404, detail="Well not found")
     return
\ No newline at end of file
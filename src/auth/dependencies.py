@@ -1,19 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from src.database import get_db
-from src.database.models import User
 from src.auth.jwt_handler import decode_access_token
-from src.services.user_service import get_user
+from src.models.user import UserOut
+from src.repositories import Repository, get_repository
 from typing import Optional
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
 
 def get_current_user(
-    db: Session = Depends(get_db), 
+    repo: Repository = Depends(get_repository), 
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> UserOut:
     """
     Get the current authenticated user from the JWT token.
     """
@@ -28,7 +26,7 @@ def get_current_user(
     except Exception:
         raise credentials_exception
     
-    user = get_user(db, token_data.user_id)
+    user = repo.get_user(token_data.user_id)
     if user is None:
         raise credentials_exception
     
@@ -36,8 +34,8 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserOut = Depends(get_current_user)
+) -> UserOut:
     """
     Get the current active user.
     """
@@ -53,9 +51,8 @@ class RoleChecker:
     def __init__(self, allowed_roles: list):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, user: User = Depends(get_current_active_user)):
-        user_roles = [role.role for role in user.user_roles]
-        if not any(role in self.allowed_roles for role in user_roles):
+    def __call__(self, user: UserOut = Depends(get_current_active_user)):
+        if not any(role in self.allowed_roles for role in user.roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Operation not permitted"
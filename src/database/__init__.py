@@ -1,2 +1,2 @@
-from .connection import Base, engine, get_db, SessionLocal
-from .models import User, UserRoleModel, Campaign, Rig, Well, Task, TaskComment, Attachment, AuditLog
\ No newline at end of file
+from .connection import Base, engine, get_db, SessionLocal, STORAGE_BACKEND
+from .models import User, UserRoleModel, Campaign, Rig, Well, Task, TaskComment, Attachment, Scenario, ScenarioRecord, AuditLog
\ No newline at end of file
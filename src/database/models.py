@@ -1,16 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date, Numeric, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date, Numeric, Enum, JSON, Uuid, Index, DDL, column, event, table
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from datetime import datetime
 import uuid
 from .connection import Base
-from src.models import TaskStatus, RigType, RecordStatus, UserRole
+from src.models import TaskStatus, RigType, RecordStatus, UserRole, ScenarioStatus
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=True)
     timezone = Column(String, default="UTC")
@@ -28,7 +28,7 @@ class User(Base):
 class UserRoleModel(Base):
     __tablename__ = "user_roles"
 
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    user_id = Column(Uuid(as_uuid=False), ForeignKey("users.id"), primary_key=True)
     role = Column(Enum(UserRole), primary_key=True)
 
     # Relationships
@@ -38,12 +38,16 @@ class UserRoleModel(Base):
 class Campaign(Base):
     __tablename__ = "campaigns"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     block = Column(String, nullable=True)
     field = Column(String, nullable=True)
+    rig = Column(String, nullable=True)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
+    target_depth = Column(Numeric(precision=12, scale=2), nullable=True)
+    current_depth = Column(Numeric(precision=12, scale=2), nullable=True)
+    day_rate = Column(Numeric(precision=12, scale=2), nullable=True)
     status = Column(Enum(RecordStatus), default=RecordStatus.active)
     created_by = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -55,17 +59,39 @@ class Campaign(Base):
     tasks = relationship("Task", back_populates="campaign", cascade="all, delete-orphan")
 
 
+# Materialized per-campaign KPIs, refreshed by the campaign, well and task writes
+class CampaignKpi(Base):
+    __tablename__ = "campaign_kpis"
+
+    campaign_id = Column(Uuid(as_uuid=False), ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    campaign_name = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    progress_pct = Column(Numeric(precision=7, scale=2), nullable=False, default=0)
+    spud_date = Column(Date, nullable=True)
+    well_count = Column(Integer, nullable=False, default=0)
+    wells_completed = Column(Integer, nullable=False, default=0)
+    planned_well_days = Column(Integer, nullable=False, default=0)
+    estimated_cost = Column(Numeric(precision=16, scale=2), nullable=True)
+    eta = Column(Date, nullable=True)
+    task_count = Column(Integer, nullable=False, default=0)
+    open_tasks = Column(Integer, nullable=False, default=0)
+    blocked_tasks = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Rig(Base):
     __tablename__ = "rigs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    campaign_id = Column(Uuid(as_uuid=False), ForeignKey("campaigns.id"), nullable=False)
     name = Column(String, nullable=False)
     type = Column(Enum(RigType), nullable=False)
     lat = Column(Numeric(precision=9, scale=6), nullable=True)
     lon = Column(Numeric(precision=9, scale=6), nullable=True)
     status = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     campaign = relationship("Campaign", back_populates="rigs")
@@ -74,14 +100,20 @@ class Rig(Base):
 class Well(Base):
     __tablename__ = "wells"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    campaign_id = Column(Uuid(as_uuid=False), ForeignKey("campaigns.id"), nullable=False)
     name = Column(String, nullable=False)
     status = Column(String, nullable=True)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     planned_td_m = Column(Numeric(precision=12, scale=2), nullable=True)
     actual_td_m = Column(Numeric(precision=12, scale=2), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_wells_campaign_id", campaign_id),
+    )
 
     # Relationships
     campaign = relationship("Campaign", back_populates="wells")
@@ -91,21 +123,36 @@ class Well(Base):
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
-    well_id = Column(UUID(as_uuid=True), ForeignKey("wells.id"), nullable=True)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    campaign_id = Column(Uuid(as_uuid=False), ForeignKey("campaigns.id"), nullable=True)
+    well_id = Column(Uuid(as_uuid=False), ForeignKey("wells.id"), nullable=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.backlog)
     priority = Column(String, nullable=True)
-    labels = Column(ARRAY(String), nullable=True)
+    # Native array on PostgreSQL, JSON list on SQLite
+    labels = Column(ARRAY(String).with_variant(JSON(), "sqlite"), nullable=True)
     due_date = Column(Date, nullable=True)
-    assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    assignee_id = Column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=True)
     version = Column(Integer, default=1)
     deleted_at = Column(DateTime, nullable=True)
+    # Weighted title/labels/description/comments document, maintained by task_service (PostgreSQL)
+    search_vector = Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_tasks_search_vector", search_vector, postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Campaign task lists, KPI refreshes and the server-side grid filter and sort on these
+        Index("ix_tasks_campaign_id_status", campaign_id, status),
+        Index("ix_tasks_due_date", due_date),
+        # Partial: only rows awaiting the purge job, which scans them oldest first
+        Index(
+            "ix_tasks_deleted_at", deleted_at,
+            postgresql_where=deleted_at.isnot(None), sqlite_where=deleted_at.isnot(None),
+        ),
+    )
+
     # Relationships
     campaign = relationship("Campaign", back_populates="tasks")
     well = relationship("Well", back_populates="tasks")
@@ -113,15 +160,33 @@ class Task(Base):
     comments = relationship("TaskComment", back_populates="task", cascade="all, delete-orphan")
 
 
+# SQLite's counterpart of Task.search_vector: an FTS5 table with one row per task (keyed
+# by the stored task id), maintained by task_service. Not a mapped table, since
+# create_all cannot emit CREATE VIRTUAL TABLE
+task_search = table(
+    "task_search", column("task_id"), column("title"), column("labels"), column("description"), column("comments")
+)
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_search "
+    "USING fts5(task_id UNINDEXED, title, labels, description, comments)"
+).execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "before_drop", DDL("DROP TABLE IF EXISTS task_search").execute_if(dialect="sqlite"))
+
+
 class TaskComment(Base):
     __tablename__ = "task_comments"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
-    author_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    task_id = Column(Uuid(as_uuid=False), ForeignKey("tasks.id"), nullable=False)
+    author_id = Column(Uuid(as_uuid=False), ForeignKey("users.id"), nullable=False)
     body = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Per-task comment pages, counts and the latest comment
+        Index("ix_task_comments_task_id_created_at", task_id, created_at, id),
+    )
+
     # Relationships
     task = relationship("Task", back_populates="comments")
     author = relationship("User", back_populates="comments")
@@ -130,9 +195,9 @@ class TaskComment(Base):
 class Attachment(Base):
     __tablename__ = "attachments"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     owner_type = Column(String, nullable=False)
-    owner_id = Column(UUID(as_uuid=True), nullable=False)
+    owner_id = Column(Uuid(as_uuid=False), nullable=False)
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
@@ -141,6 +206,44 @@ class Attachment(Base):
     uploaded_by = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Owner listings, and the reference check before a deduplicated blob is deleted
+        Index("ix_attachments_owner", owner_type, owner_id),
+        Index("ix_attachments_sha256", sha256),
+    )
+
+
+class Scenario(Base):
+    __tablename__ = "scenarios"
+
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    status = Column(Enum(ScenarioStatus), default=ScenarioStatus.draft)
+    # Clones read through to their parent and only store overridden rows
+    parent_id = Column(Uuid(as_uuid=False), ForeignKey("scenarios.id"), nullable=True)
+    version = Column(Integer, default=1)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    parent = relationship("Scenario", remote_side=[id])
+    records = relationship("ScenarioRecord", back_populates="scenario", cascade="all, delete-orphan")
+
+
+class ScenarioRecord(Base):
+    __tablename__ = "scenario_records"
+
+    scenario_id = Column(Uuid(as_uuid=False), ForeignKey("scenarios.id"), primary_key=True)
+    kind = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # NULL marks a tombstone that hides the parent's row
+    data = Column(JSON, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    scenario = relationship("Scenario", back_populates="records")
+
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
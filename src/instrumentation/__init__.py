@@ -0,0 +1,4 @@
+from .metrics import Counter, Histogram, register, register_collector, render_metrics
+from .db import RequestStats, current_request_stats, instrument_engine
+from .profiler import SamplingProfiler, get_profile
+from .middleware import InstrumentationMiddleware
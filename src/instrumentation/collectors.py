@@ -0,0 +1,79 @@
+from typing import Iterable
+from backend.calc.timing import timings
+from src.services.entity_cache import cache_stats
+from .metrics import register_collector
+
+
+@register_collector
+def calc_timings() -> Iterable[str]:
+    yield "# HELP calc_function_seconds Wall-clock time of calc engine entry points"
+    yield "# TYPE calc_function_seconds summary"
+    stats = timings()
+    for name, stat in stats.items():
+        yield f'calc_function_seconds_count{{function="{name}"}} {stat["count"]}'
+        yield f'calc_function_seconds_sum{{function="{name}"}} {stat["total_s"]!r}'
+    yield "# HELP calc_function_max_seconds Slowest single call of each calc entry point"
+    yield "# TYPE calc_function_max_seconds gauge"
+    for name, stat in stats.items():
+        yield f'calc_function_max_seconds{{function="{name}"}} {stat["max_s"]!r}'
+
+
+@register_collector
+def entity_cache_metrics() -> Iterable[str]:
+    stats = cache_stats()
+    for field, kind, help_text in (
+        ("hits", "counter", "Entity cache hits"),
+        ("negative_hits", "counter", "Entity cache hits on ids known to be missing"),
+        ("misses", "counter", "Entity cache misses"),
+        ("evictions", "counter", "Entity cache LRU evictions"),
+        ("size", "gauge", "Entries currently cached"),
+    ):
+        name = f"entity_cache_{field}" + ("_total" if kind == "counter" else "")
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} {kind}"
+        for cache, values in stats.items():
+            yield f'{name}{{cache="{cache}"}} {values[field]}'
+
+
+@register_collector
+def shared_state_metrics() -> Iterable[str]:
+    from src.repositories import state_generation
+
+    if not state_generation.enabled:
+        return
+    yield "# HELP state_generation Committed writes across all workers sharing the database"
+    yield "# TYPE state_generation gauge"
+    yield f"state_generation {state_generation.current()}"
+    yield "# HELP state_generation_cache_clears_total Cache clears after another worker wrote"
+    yield "# TYPE state_generation_cache_clears_total counter"
+    yield f"state_generation_cache_clears_total {state_generation.changes}"
+
+
+@register_collector
+def store_log_metrics() -> Iterable[str]:
+    from src.services.mock_services import store_log
+
+    if store_log is None:
+        return
+    stats = store_log.stats()
+    yield "# HELP store_log_lsn Sequence number of the last write logged by the in-memory store"
+    yield "# TYPE store_log_lsn gauge"
+    yield f"store_log_lsn {stats['lsn']}"
+    yield "# HELP store_log_snapshot_lsn Last write covered by the latest store snapshot"
+    yield "# TYPE store_log_snapshot_lsn gauge"
+    yield f"store_log_snapshot_lsn {stats['snapshot_lsn']}"
+
+
+@register_collector
+def task_purge_metrics() -> Iterable[str]:
+    from src.repositories import task_purger
+
+    if task_purger is None:
+        return
+    stats = task_purger.stats()
+    yield "# HELP task_purge_removed_total Soft-deleted tasks permanently removed by the purge job"
+    yield "# TYPE task_purge_removed_total counter"
+    yield f"task_purge_removed_total {stats['purged']}"
+    yield "# HELP task_purge_passes_total Completed purge passes"
+    yield "# TYPE task_purge_passes_total counter"
+    yield f"task_purge_passes_total {stats['passes']}"
@@ -0,0 +1,65 @@
+import time
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .db import RequestStats, current_request_stats
+from .metrics import REQUEST_DB_QUERIES, REQUEST_DB_TIME, REQUEST_LATENCY
+from .profiler import SamplingProfiler, profiling_requested, store_profile
+
+
+def _finish_profile(profiler: SamplingProfiler) -> str:
+    return store_profile(profiler.stop())
+
+
+def _route_label(scope: Scope) -> str:
+    # Route templates keep label cardinality bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class InstrumentationMiddleware:
+    """
+    Record latency and DB usage per route, and profile requests that ask for it.
+
+    Responses carry a ``Server-Timing`` header (``app`` and ``db`` durations) and
+    ``X-DB-Queries``; profiled ones also carry ``X-Profile-Id`` for ``/debug/profiles``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        profiler = SamplingProfiler().start() if profiling_requested(Headers(scope=scope)) else None
+        status = 500
+        started = time.perf_counter()
+
+        async def send_instrumented(message: Message):
+            nonlocal status, profiler
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f"app;dur={elapsed_ms:.2f}, db;dur={stats.db_seconds * 1000:.2f}")
+                headers["X-DB-Queries"] = str(stats.db_queries)
+                if profiler is not None:
+                    # Stopping joins the sampler thread; keep that off the event loop
+                    headers["X-Profile-Id"] = await run_in_threadpool(_finish_profile, profiler)
+                    profiler = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_instrumented)
+        finally:
+            current_request_stats.reset(token)
+            if profiler is not None:
+                await run_in_threadpool(profiler.stop)
+            route = _route_label(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, method=scope["method"], route=route, status=status)
+            REQUEST_DB_QUERIES.observe(stats.db_queries, route=route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, route=route)
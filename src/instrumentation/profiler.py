@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+# Profiling is requested per call with this header, and only honoured with PROFILING_ENABLED=1
+PROFILE_HEADER = "x-profile"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+SAMPLE_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.002"))
+MAX_STORED_PROFILES = 32
+
+# Only stacks that pass through application code are kept; idle workers are dropped
+_APP_PATHS = tuple(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), part) + os.sep
+    for part in ("src", "backend")
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread snapshots every other thread's stack at a
+    fixed interval and counts identical stacks (collapsed "flame graph" format).
+
+    Concurrent requests running application code are sampled too; profile one request at
+    a time for clean results.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.elapsed = 0.0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    in_app = in_app or frame.f_code.co_filename.startswith(_APP_PATHS)
+                    frame = frame.f_back
+                if in_app:
+                    self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def collapsed(self) -> str:
+        """
+        ``frame;frame;frame count`` lines, the input format of flamegraph.pl / speedscope.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def store_profile(profiler: SamplingProfiler) -> str:
+    profile_id = uuid.uuid4().hex
+    header = f"# samples={profiler.sample_count} interval={profiler.interval}s elapsed={profiler.elapsed:.6f}s\n"
+    with _profiles_lock:
+        _profiles[profile_id] = header + profiler.collapsed()
+        while len(_profiles) > MAX_STORED_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def profiling_requested(headers: Dict[str, str]) -> bool:
+    return PROFILING_ENABLED and headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
@@ -10,22 +10,37 @@ from src.api import (
     rigs_router,
     wells_router,
     dashboard_router,
+    scenarios_router,
+    metrics_router,
+    grid_router,
+    aggregates_router,
+    attachments_router,
 )
+from src.api.serialization import FastJSONResponse
+from src.middleware import CompressionMiddleware, ConditionalGetMiddleware
+from src.instrumentation import InstrumentationMiddleware
+from src.repositories import init_storage
 from src.ui.routes import router as ui_router
 
-# For mock implementation, we don't need to create database tables
-# from src.database import engine, Base
-# Base.metadata.create_all(bind=engine)
+# Storage backend is chosen with STORAGE_BACKEND (memory, sqlite or postgresql)
+init_storage()
 
 app = FastAPI(
     title="Drilling Campaign Management System",
     description="A modern system for managing drilling campaigns, tasks, rigs, and wells",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 TEMPLATE_DIR = Path(__file__).resolve().parent / "ui" / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
 
+# Compression wraps the conditional layer; the 304s it produces have no body to compress
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+# Outermost, so recorded latency covers the whole middleware stack
+app.add_middleware(InstrumentationMiddleware)
+
 # Include API routers
 app.include_router(users_router)
 app.include_router(campaigns_router)
@@ -33,6 +48,11 @@ app.include_router(tasks_router)
 app.include_router(rigs_router)
 app.include_router(wells_router)
 app.include_router(dashboard_router)
+app.include_router(scenarios_router)
+app.include_router(metrics_router)
+app.include_router(grid_router)
+app.include_router(aggregates_router)
+app.include_router(attachments_router)
 app.include_router(ui_router, prefix="/ui")
 
 
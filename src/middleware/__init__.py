@@ -0,0 +1,2 @@
+from .compression import CompressionMiddleware, choose_encoding
+from .conditional import ConditionalGetMiddleware, conditional_response, entity_validators, is_not_modified, set_validators
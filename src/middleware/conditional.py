@@ -0,0 +1,143 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Headers a 304 must repeat from the 200 it stands in for
+_NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "vary", "expires")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def entity_validators(items: Iterable[Any], *extra: Any) -> Tuple[str, Optional[datetime]]:
+    """
+    Weak ETag and Last-Modified for a set of entities, computed from their versions.
+
+    Each entity contributes its id and its ``version`` (tasks) or ``updated_at`` /
+    ``last_updated`` timestamp, so the tag changes when any entity is written, added or
+    removed. ``extra`` mixes in other inputs of the response (e.g. today's date for
+    values derived from it).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    last_modified = None
+    for item in items:
+        updated = getattr(item, "updated_at", None) or getattr(item, "last_updated", None)
+        version = getattr(item, "version", None)
+        digest.update(f"{getattr(item, 'id', '')}:{version}:{updated}|".encode())
+        if updated is not None:
+            updated = _as_utc(updated)
+            if last_modified is None or updated > last_modified:
+                last_modified = updated
+    for value in extra:
+        digest.update(f"{value}|".encode())
+    return f'W/"{digest.hexdigest()}"', last_modified
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == target:
+            return True
+    return False
+
+
+def is_not_modified(headers: Headers, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no If-None-Match is sent (RFC 9110).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return response
+
+
+def conditional_response(
+    request: Request, items: Iterable[Any], render: Callable[[], Response], *extra: Any
+) -> Response:
+    """
+    Answer 304 before rendering when the client's copy of ``items`` is current.
+
+    Last-Modified is only sent for a single entity with no extra inputs: a collection
+    can change without any member's timestamp moving (a delete), so it relies on the ETag.
+    """
+    items = list(items)
+    etag, last_modified = entity_validators(items, *extra)
+    if len(items) != 1 or extra:
+        last_modified = None
+    if is_not_modified(request.headers, etag, last_modified):
+        return set_validators(Response(status_code=304), etag, last_modified)
+    return set_validators(render(), etag, last_modified)
+
+
+class ConditionalGetMiddleware:
+    """
+    Turn GET/HEAD 200 responses that carry ETag or Last-Modified into 304 Not Modified
+    when the request's If-None-Match / If-Modified-Since match.
+
+    Endpoints using :func:`conditional_response` already answer 304 without rendering;
+    this catches any other response that sets validators.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        if "if-none-match" not in request_headers and "if-modified-since" not in request_headers:
+            await self.app(scope, receive, send)
+            return
+
+        not_modified = False
+
+        async def send_conditional(message: Message):
+            nonlocal not_modified
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                last_modified = headers.get("last-modified")
+                if message["status"] == 200 and ("etag" in headers or last_modified):
+                    try:
+                        modified = parsedate_to_datetime(last_modified) if last_modified else None
+                    except (TypeError, ValueError):
+                        modified = None
+                    not_modified = is_not_modified(request_headers, headers.get("etag"), modified)
+                if not_modified:
+                    kept = [(k, v) for k, v in message["headers"] if k.decode().lower() in _NOT_MODIFIED_HEADERS]
+                    await send({"type": "http.response.start", "status": 304, "headers": kept})
+                    return
+                await send(message)
+            elif not_modified:
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b""})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_conditional)
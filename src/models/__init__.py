@@ -1,5 +1,6 @@
-from .task import TaskStatus, TaskBase, TaskCreate, TaskUpdate, TaskCommentCreate, TaskComment, TaskOut
-from .campaign import CampaignBase, CampaignCreate, CampaignUpdate, CampaignOut
+from .task import TaskStatus, TaskBase, TaskCreate, TaskUpdate, TaskCommentCreate, TaskComment, TaskCommentPage, TaskOut, TaskSearchHit, TaskSearchResult
+from .campaign import CampaignBase, CampaignCreate, CampaignUpdate, CampaignOut, CampaignKpi
 from .rig import RigType, RecordStatus, RigBase, RigCreate, RigUpdate, RigOut
 from .well import WellBase, WellCreate, WellUpdate, WellOut
-from .user import UserRole, UserBase, UserCreate, UserUpdate, UserOut, UserLogin, Token, TokenData
\ No newline at end of file
+from .user import UserRole, UserBase, UserCreate, UserUpdate, UserOut, UserLogin, Token, TokenData
+from .scenario import ScenarioStatus, ScenarioRecordKind, ScenarioBase, ScenarioCreate, ScenarioClone, ScenarioOut, ScenarioRecord
\ No newline at end of file
@@ -0,0 +1,51 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel
+
+
+class AggregateEntity(str, Enum):
+    tasks = "tasks"
+    wells = "wells"
+    campaigns = "campaigns"
+    rigs = "rigs"
+
+
+class AggregateFunc(str, Enum):
+    count = "count"
+    sum = "sum"
+    avg = "avg"
+    min = "min"
+    max = "max"
+
+
+class AggregateMeasure(BaseModel):
+    func: AggregateFunc = AggregateFunc.count
+    # None with count counts rows; otherwise a numeric field
+    field: Optional[str] = None
+
+
+class AggregateRequest(BaseModel):
+    group_by: List[str] = []
+    pivot: Optional[str] = None
+    measures: List[AggregateMeasure] = [AggregateMeasure()]
+    # Field -> accepted values (null matches missing values)
+    filters: Dict[str, List[Optional[str]]] = {}
+
+
+# Counts stay integers; other aggregates are floats, or null over no values
+MeasureValues = Dict[str, Optional[Union[int, float]]]
+
+
+class AggregateRow(BaseModel):
+    key: Dict[str, Any]
+    values: MeasureValues
+    # Pivot value -> measures, when the request has a pivot
+    pivot: Optional[Dict[str, MeasureValues]] = None
+
+
+class AggregateResult(BaseModel):
+    group_by: List[str]
+    pivot: Optional[str] = None
+    pivot_values: List[Any] = []
+    rows: List[AggregateRow]
+    totals: MeasureValues
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class AttachmentOwnerType(str, Enum):
+    campaign = "campaign"
+    task = "task"
+    well = "well"
+
+
+class AttachmentCreate(BaseModel):
+    """
+    Metadata of an uploaded file; the blob fields come from the stored upload.
+    """
+    owner_type: AttachmentOwnerType
+    owner_id: str
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    uploaded_by: str
+    size: int
+    sha256: str
+    s3_key: str
+
+
+class AttachmentOut(BaseModel):
+    id: str
+    owner_type: AttachmentOwnerType
+    owner_id: str
+    filename: str
+    content_type: str
+    size: int
+    sha256: Optional[str] = Field(None, description="Content hash; identical files share one stored blob")
+    uploaded_by: str
+    created_at: datetime
@@ -9,6 +9,7 @@ class CampaignBase(BaseModel):
     spud_date: date
     target_depth: float = Field(..., gt=0)
     current_depth: float = Field(..., ge=0)
+    day_rate: Optional[float] = Field(None, ge=0)
 
 
 class CampaignCreate(CampaignBase):
@@ -21,10 +22,29 @@ class CampaignUpdate(BaseModel):
     spud_date: Optional[date] = None
     target_depth: Optional[float] = None
     current_depth: Optional[float] = None
+    day_rate: Optional[float] = None
 
 
 class CampaignOut(CampaignBase):
-    id: int
+    id: str
     progress_pct: float
     days_elapsed: int
-    last_updated: datetime
\ No newline at end of file
+    last_updated: datetime
+
+
+class CampaignKpi(BaseModel):
+    campaign_id: str
+    campaign_name: str
+    status: str
+    progress_pct: float
+    spud_date: Optional[date] = None
+    days_elapsed: int
+    well_count: int
+    wells_completed: int
+    planned_well_days: int
+    estimated_cost: Optional[float] = None
+    eta: Optional[date] = None
+    task_count: int
+    open_tasks: int
+    blocked_tasks: int
+    updated_at: datetime
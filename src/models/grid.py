@@ -0,0 +1,44 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+# Field names follow AG Grid's IServerSideGetRowsRequest, so the grid's request can be
+# posted as is.
+
+
+class GridEntity(str, Enum):
+    tasks = "tasks"
+    wells = "wells"
+
+
+class GridSortDirection(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class GridColumn(BaseModel):
+    id: str
+    displayName: Optional[str] = None
+    field: Optional[str] = None
+    aggFunc: Optional[str] = None
+
+
+class GridSort(BaseModel):
+    colId: str
+    sort: GridSortDirection = GridSortDirection.asc
+
+
+class GridRequest(BaseModel):
+    startRow: int = Field(0, ge=0)
+    endRow: int = Field(100, ge=0)
+    sortModel: List[GridSort] = []
+    filterModel: Optional[Dict[str, Any]] = None
+    rowGroupCols: List[GridColumn] = []
+    valueCols: List[GridColumn] = []
+    groupKeys: List[Any] = []
+    pivotMode: bool = False
+
+
+class GridResponse(BaseModel):
+    rowData: List[Dict[str, Any]]
+    rowCount: int
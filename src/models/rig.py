@@ -42,4 +42,10 @@ class RigUpdate(BaseModel):
 class RigOut(RigBase):
     id: str
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+
+class RigDistance(BaseModel):
+    rig: RigOut
+    distance_km: float
+    transit_days: float = Field(..., description="Move time at the requested speed")
\ No newline at end of file
@@ -0,0 +1,44 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class ScenarioStatus(str, Enum):
+    draft = "draft"
+    approved = "approved"
+    archived = "archived"
+
+
+class ScenarioRecordKind(str, Enum):
+    campaign = "campaign"
+    project = "project"
+    campaign_project = "campaign_project"
+
+
+class ScenarioBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    status: ScenarioStatus = ScenarioStatus.draft
+
+
+class ScenarioCreate(ScenarioBase):
+    pass
+
+
+class ScenarioClone(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class ScenarioOut(ScenarioBase):
+    id: str
+    parent_id: Optional[str] = Field(None, description="Scenario this clone reads through to")
+    version: int = Field(1, description="Bumped on every write to the scenario's rows")
+    created_at: datetime
+    updated_at: datetime
+
+
+class ScenarioRecord(BaseModel):
+    kind: ScenarioRecordKind
+    key: str
+    data: Dict[str, Any]
+    source_scenario_id: str = Field(..., description="Scenario in the chain that stores the row")
@@ -1,6 +1,6 @@
 from datetime import date, datetime, timezone
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -18,7 +18,8 @@ class TaskBase(BaseModel):
     priority: Optional[str] = None
     due_date: Optional[date] = None
     assigned_to: Optional[str] = None
-    campaign_id: Optional[int] = Field(None, description="Link task to a campaign")
+    labels: Optional[List[str]] = None
+    campaign_id: Optional[str] = Field(None, description="Link task to a campaign")
     well_id: Optional[str] = Field(None, description="Link task to a well")
 
 
@@ -33,6 +34,7 @@ class TaskUpdate(BaseModel):
     priority: Optional[str] = None
     due_date: Optional[date] = None
     assigned_to: Optional[str] = None
+    labels: Optional[List[str]] = None
 
 
 class TaskCommentCreate(BaseModel):
@@ -41,13 +43,35 @@ class TaskCommentCreate(BaseModel):
 
 
 class TaskComment(BaseModel):
+    id: str
     author: str
     message: str
     timestamp_utc: datetime
 
 
+class TaskCommentPage(BaseModel):
+    items: List[TaskComment]
+    total: int = Field(..., description="Number of comments on the task")
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= for the next page; null on the last page")
+
+
 class TaskOut(TaskBase):
     id: str
-    comments: List[TaskComment]
+    comment_count: int = Field(0, description="Comments are paged from /tasks/{id}/comments")
+    latest_comment: Optional[TaskComment] = None
+    version: int = Field(1, description="Incremented on every update")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class TaskSearchHit(BaseModel):
+    task: TaskOut
+    score: float = Field(..., description="Relevance; higher is better, 0 when browsing without a query")
+
+
+class TaskSearchResult(BaseModel):
+    total: int
+    items: List[TaskSearchHit]
+    facets: Dict[str, Dict[str, int]] = Field(
+        ..., description="Match counts per value of status, priority, assigned_to and campaign_id"
+    )
@@ -0,0 +1,95 @@
+import os
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from src.database.connection import DATABASE_URL, STORAGE_BACKEND, SessionLocal, engine, Base
+from src.database.models import Campaign
+from .base import Repository, MemoryRepository
+from .sql import SqlRepository
+from src.services.entity_cache import clear_entity_caches
+from src.services.kpi_service import ensure_campaign_kpis
+from src.services.purge_service import TaskPurger
+from src.services.shared_state import StateGeneration
+from src.services.task_service import ensure_search_index
+
+STORAGE_BACKENDS = ("memory", "sqlite", "postgresql")
+
+if STORAGE_BACKEND not in STORAGE_BACKENDS:
+    raise ValueError(f"STORAGE_BACKEND must be one of {STORAGE_BACKENDS}, got {STORAGE_BACKEND!r}")
+
+_memory_repository = MemoryRepository() if STORAGE_BACKEND == "memory" else None
+
+
+def _state_generation_path():
+    # Shared by the workers of one host: next to a SQLite file (like its -wal and -shm
+    # files), or wherever STATE_GENERATION_FILE points for PostgreSQL
+    path = os.getenv("STATE_GENERATION_FILE")
+    if path or STORAGE_BACKEND != "sqlite":
+        return path
+    database = make_url(DATABASE_URL).database
+    return f"{database}-generation" if database and database != ":memory:" else None
+
+
+# Cross-worker invalidation of the SQL repository's entity caches
+state_generation = StateGeneration(
+    _state_generation_path() if STORAGE_BACKEND != "memory" else None, clear_entity_caches
+)
+event.listen(SessionLocal, "after_commit", lambda session: state_generation.bump())
+
+# Removes soft-deleted tasks. Its sessions are not SessionLocal's: purging rows no read
+# can see changes nothing cached, so it must not invalidate other workers' caches
+task_purger = TaskPurger(lambda: Session(bind=engine)) if STORAGE_BACKEND != "memory" else None
+
+
+def _worker_count() -> int:
+    # uvicorn and gunicorn both take their default worker count from WEB_CONCURRENCY
+    return int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+def init_storage():
+    """
+    Prepare the configured backend at startup.
+
+    The memory store is private to its process, so it refuses to run under several
+    workers; use the SQLite backend for that. SQLite tables are created on first run, the
+    database is seeded from SEED_SCALE when it has no campaigns, and the campaign KPI and
+    task search tables are backfilled if they are missing rows. Workers starting together
+    do this one at a time. The SQL backends then start the background purge of deleted
+    tasks.
+    """
+    if STORAGE_BACKEND == "memory":
+        if _worker_count() > 1:
+            raise RuntimeError(
+                "The memory store is per process; run one worker or set STORAGE_BACKEND=sqlite "
+                "to share state between workers"
+            )
+        return
+    if STORAGE_BACKEND == "sqlite":
+        with state_generation.locked():
+            Base.metadata.create_all(bind=engine)
+            seed_scale = os.getenv("SEED_SCALE")
+            with SessionLocal() as db:
+                empty = not db.execute(select(func.count()).select_from(Campaign)).scalar()
+            if seed_scale and empty:
+                from src.services.seed import generate_portfolio, load_database, parse_scale
+                load_database(generate_portfolio(parse_scale(seed_scale), int(os.getenv("SEED", "0"))), engine)
+            with SessionLocal() as db:
+                ensure_campaign_kpis(db)
+                ensure_search_index(db)
+    task_purger.start()
+
+
+def get_repository():
+    """
+    FastAPI dependency yielding the repository for the configured backend.
+    """
+    if _memory_repository is not None:
+        yield _memory_repository
+        return
+    # Another worker may have written since this one last served a request
+    state_generation.sync()
+    db = SessionLocal()
+    try:
+        yield SqlRepository(db)
+    finally:
+        db.close()
@@ -0,0 +1,232 @@
+from typing import Optional
+from src.models.user import UserCreate, UserUpdate, UserRole
+from src.models.campaign import CampaignCreate, CampaignUpdate
+from src.models.task import TaskCreate, TaskUpdate, TaskCommentCreate
+from src.models.rig import RigCreate, RigUpdate
+from src.models.well import WellCreate, WellUpdate
+from src.models.scenario import ScenarioCreate, ScenarioClone
+from src.models.grid import GridRequest
+from src.models.aggregate import AggregateRequest
+from src.models.attachment import AttachmentCreate
+from src.services.task_comments import DEFAULT_COMMENT_PAGE_SIZE
+
+
+class Repository:
+    """
+    Storage-agnostic access to the service layer.
+
+    Wraps a services module (``mock_services`` or the SQLAlchemy services) together with
+    its session, so routers never pass ``db`` around themselves. Every method returns the
+    pydantic ``*Out`` models, whichever backend is in use.
+    """
+
+    def __init__(self, services, db=None):
+        self.services = services
+        self.db = db
+
+    # Users
+    def get_user(self, user_id: str):
+        return self.services.get_user(self.db, user_id)
+
+    def get_user_by_email(self, email: str):
+        return self.services.get_user_by_email(self.db, email)
+
+    def get_users(self, skip: int = 0, limit: int = 100):
+        return self.services.get_users(self.db, skip=skip, limit=limit)
+
+    def create_user(self, user: UserCreate):
+        return self.services.create_user(self.db, user)
+
+    def update_user(self, user_id: str, user_update: UserUpdate):
+        return self.services.update_user(self.db, user_id, user_update)
+
+    def delete_user(self, user_id: str):
+        return self.services.delete_user(self.db, user_id)
+
+    def authenticate_user(self, email: str, password: str):
+        return self.services.authenticate_user(self.db, email, password)
+
+    def add_user_role(self, user_id: str, role: UserRole):
+        return self.services.add_user_role(self.db, user_id, role)
+
+    def remove_user_role(self, user_id: str, role: UserRole):
+        return self.services.remove_user_role(self.db, user_id, role)
+
+    # Campaigns
+    def get_campaign(self, campaign_id: str):
+        return self.services.get_campaign(self.db, campaign_id)
+
+    def get_campaigns(self, skip: int = 0, limit: int = 100):
+        return self.services.get_campaigns(self.db, skip=skip, limit=limit)
+
+    def create_campaign(self, campaign: CampaignCreate):
+        return self.services.create_campaign(self.db, campaign)
+
+    def update_campaign(self, campaign_id: str, campaign_update: CampaignUpdate):
+        return self.services.update_campaign(self.db, campaign_id, campaign_update)
+
+    def delete_campaign(self, campaign_id: str):
+        return self.services.delete_campaign(self.db, campaign_id)
+
+    def get_campaign_kpi(self, campaign_id: str):
+        return self.services.get_campaign_kpi(self.db, campaign_id)
+
+    def get_campaign_kpis(self, skip: int = 0, limit: int = 100):
+        """
+        Precomputed per-campaign KPI rows (``CampaignKpi``), kept current by the writes.
+        """
+        return self.services.get_campaign_kpis(self.db, skip=skip, limit=limit)
+
+    # Tasks
+    def get_task(self, task_id: str):
+        return self.services.get_task(self.db, task_id)
+
+    def get_tasks(self, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None, status: Optional[str] = None):
+        return self.services.get_tasks(self.db, skip=skip, limit=limit, campaign_id=campaign_id, status=status)
+
+    def create_task(self, task: TaskCreate):
+        return self.services.create_task(self.db, task)
+
+    def update_task(self, task_id: str, task_update: TaskUpdate):
+        return self.services.update_task(self.db, task_id, task_update)
+
+    def delete_task(self, task_id: str):
+        return self.services.delete_task(self.db, task_id)
+
+    def add_task_comment(self, task_id: str, comment: TaskCommentCreate):
+        """
+        Add a comment and return the updated task, or None if the task does not exist.
+        """
+        return self.services.add_task_comment(self.db, task_id, comment)
+
+    def get_task_comments(self, task_id: str, after=None, limit: int = DEFAULT_COMMENT_PAGE_SIZE):
+        """
+        One page of a task's comments, oldest first, after the ``(timestamp, id)`` key
+        ``after``, as a ``TaskCommentPage``; None if the task does not exist.
+        """
+        return self.services.get_task_comments(self.db, task_id, after=after, limit=limit)
+
+    def search_tasks(
+        self,
+        query: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20,
+        prefix: bool = True,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assigned_to: Optional[str] = None,
+        campaign_id: Optional[str] = None,
+    ):
+        """
+        Ranked full-text search over tasks with facet counts, as a ``TaskSearchResult``.
+        """
+        return self.services.search_tasks(
+            self.db, query, skip=skip, limit=limit, prefix=prefix, status=status,
+            priority=priority, assigned_to=assigned_to, campaign_id=campaign_id
+        )
+
+    # Server-side grid
+    def get_grid_rows(self, entity: str, request: GridRequest):
+        """
+        One block of an AG Grid server-side row model request, as a ``GridResponse``.
+        """
+        return self.services.get_grid_rows(self.db, entity, request)
+
+    # Grouped aggregation
+    def aggregate(self, entity: str, request: AggregateRequest):
+        """
+        GROUP BY / pivot over an entity, as an ``AggregateResult``.
+        """
+        return self.services.aggregate(self.db, entity, request)
+
+    # Rigs
+    def get_rig(self, rig_id: str):
+        return self.services.get_rig(self.db, rig_id)
+
+    def get_rigs(self, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
+        return self.services.get_rigs(self.db, skip=skip, limit=limit, campaign_id=campaign_id)
+
+    def create_rig(self, rig: RigCreate):
+        return self.services.create_rig(self.db, rig)
+
+    def update_rig(self, rig_id: str, rig_update: RigUpdate):
+        return self.services.update_rig(self.db, rig_id, rig_update)
+
+    def delete_rig(self, rig_id: str):
+        return self.services.delete_rig(self.db, rig_id)
+
+    # Wells
+    def get_well(self, well_id: str):
+        return self.services.get_well(self.db, well_id)
+
+    def get_wells(self, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
+        return self.services.get_wells(self.db, skip=skip, limit=limit, campaign_id=campaign_id)
+
+    def create_well(self, well: WellCreate):
+        return self.services.create_well(self.db, well)
+
+    def update_well(self, well_id: str, well_update: WellUpdate):
+        return self.services.update_well(self.db, well_id, well_update)
+
+    def delete_well(self, well_id: str):
+        return self.services.delete_well(self.db, well_id)
+
+    # Scenarios
+    def get_scenario(self, scenario_id: str):
+        return self.services.get_scenario(self.db, scenario_id)
+
+    def get_scenarios(self, skip: int = 0, limit: int = 100):
+        return self.services.get_scenarios(self.db, skip=skip, limit=limit)
+
+    def create_scenario(self, scenario: ScenarioCreate):
+        return self.services.create_scenario(self.db, scenario)
+
+    def clone_scenario(self, scenario_id: str, clone: ScenarioClone):
+        return self.services.clone_scenario(self.db, scenario_id, clone)
+
+    def materialize_scenario(self, scenario_id: str):
+        return self.services.materialize_scenario(self.db, scenario_id)
+
+    def get_scenario_record(self, scenario_id: str, kind: str, key: str):
+        return self.services.get_scenario_record(self.db, scenario_id, kind, key)
+
+    def get_scenario_records(self, scenario_id: str, kind: str):
+        return self.services.get_scenario_records(self.db, scenario_id, kind)
+
+    def put_scenario_record(self, scenario_id: str, kind: str, key: str, data: dict):
+        return self.services.put_scenario_record(self.db, scenario_id, kind, key, data)
+
+    def delete_scenario_record(self, scenario_id: str, kind: str, key: str):
+        return self.services.delete_scenario_record(self.db, scenario_id, kind, key)
+
+    def diff_scenarios(self, scenario_a: str, scenario_b: str):
+        return self.services.diff_scenarios(self.db, scenario_a, scenario_b)
+
+    # Attachments
+    def get_attachment(self, attachment_id: str):
+        return self.services.get_attachment(self.db, attachment_id)
+
+    def get_attachments(self, owner_type: str, owner_id: str, skip: int = 0, limit: int = 100):
+        return self.services.get_attachments(self.db, owner_type, owner_id, skip=skip, limit=limit)
+
+    def create_attachment(self, attachment: AttachmentCreate):
+        return self.services.create_attachment(self.db, attachment)
+
+    def delete_attachment(self, attachment_id: str):
+        return self.services.delete_attachment(self.db, attachment_id)
+
+    def blob_in_use(self, sha256: str) -> bool:
+        """
+        Whether any attachment still refers to the stored blob with this content hash.
+        """
+        return self.services.blob_in_use(self.db, sha256)
+
+
+class MemoryRepository(Repository):
+    """
+    In-memory backend over the dict-indexed stores in ``mock_services``.
+    """
+
+    def __init__(self):
+        from src.services import mock_services
+        super().__init__(mock_services)
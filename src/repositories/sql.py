@@ -0,0 +1,422 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+import src.services as sql_services
+from src.services.campaign_kpis import campaign_progress, days_elapsed
+from src.services.entity_cache import (
+    user_cache, campaign_cache, rig_cache, well_cache, grid_block_cache, aggregate_cache, rig_location_cache,
+)
+from src.services.aggregation import aggregate_shape
+from src.services.grid_query import query_shape
+from src.services.task_comments import DEFAULT_COMMENT_PAGE_SIZE, comment_page
+from src.models.user import UserOut
+from src.models.campaign import CampaignOut, CampaignKpi
+from src.models.task import TaskOut, TaskComment, TaskSearchHit, TaskSearchResult
+from src.models.rig import RigOut
+from src.models.well import WellOut
+from src.models.scenario import ScenarioOut
+from src.models.attachment import AttachmentOut
+from src.models.grid import GridResponse
+from .base import Repository
+
+
+def _user_out(user) -> UserOut:
+    return UserOut(
+        id=str(user.id),
+        email=user.email,
+        name=user.name,
+        timezone=user.timezone,
+        active=user.active,
+        roles=[user_role.role for user_role in user.user_roles],
+        created_at=user.created_at,
+        updated_at=user.updated_at
+    )
+
+
+def _campaign_out(campaign, progress_pct: Optional[float] = None) -> CampaignOut:
+    # Progress from the materialized KPI row when there is one
+    if progress_pct is None:
+        progress_pct = campaign_progress(campaign.target_depth, campaign.current_depth)
+    return CampaignOut(
+        id=str(campaign.id),
+        name=campaign.name,
+        rig=campaign.rig,
+        spud_date=campaign.start_date,
+        target_depth=float(campaign.target_depth),
+        current_depth=float(campaign.current_depth),
+        day_rate=float(campaign.day_rate) if campaign.day_rate is not None else None,
+        progress_pct=progress_pct,
+        days_elapsed=days_elapsed(campaign.start_date),
+        last_updated=campaign.updated_at
+    )
+
+
+def _campaign_kpi_out(kpi) -> CampaignKpi:
+    return CampaignKpi(
+        campaign_id=str(kpi.campaign_id),
+        campaign_name=kpi.campaign_name,
+        status=kpi.status,
+        progress_pct=float(kpi.progress_pct),
+        spud_date=kpi.spud_date,
+        days_elapsed=days_elapsed(kpi.spud_date),
+        well_count=kpi.well_count,
+        wells_completed=kpi.wells_completed,
+        planned_well_days=kpi.planned_well_days,
+        estimated_cost=float(kpi.estimated_cost) if kpi.estimated_cost is not None else None,
+        eta=kpi.eta,
+        task_count=kpi.task_count,
+        open_tasks=kpi.open_tasks,
+        blocked_tasks=kpi.blocked_tasks,
+        updated_at=kpi.updated_at
+    )
+
+
+def _comment_out(comment) -> TaskComment:
+    return TaskComment(
+        id=str(comment.id),
+        author=str(comment.author_id),
+        message=comment.body,
+        timestamp_utc=comment.created_at
+    )
+
+
+def _task_out(task, comment_count: int = 0, latest_comment=None) -> TaskOut:
+    return TaskOut(
+        id=str(task.id),
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        due_date=task.due_date,
+        assigned_to=str(task.assignee_id) if task.assignee_id else None,
+        labels=task.labels,
+        campaign_id=str(task.campaign_id) if task.campaign_id else None,
+        well_id=str(task.well_id) if task.well_id else None,
+        comment_count=comment_count,
+        latest_comment=_comment_out(latest_comment) if latest_comment is not None else None,
+        version=task.version or 1,
+        created_at=task.created_at,
+        updated_at=task.updated_at
+    )
+
+
+def _rig_out(rig) -> RigOut:
+    return RigOut(
+        id=str(rig.id),
+        campaign_id=str(rig.campaign_id),
+        name=rig.name,
+        type=rig.type,
+        lat=rig.lat,
+        lon=rig.lon,
+        status=rig.status,
+        notes=rig.notes,
+        created_at=rig.created_at,
+        updated_at=rig.updated_at
+    )
+
+
+def _well_out(well) -> WellOut:
+    return WellOut(
+        id=str(well.id),
+        campaign_id=str(well.campaign_id),
+        name=well.name,
+        status=well.status,
+        start_date=well.start_date,
+        end_date=well.end_date,
+        planned_td_m=well.planned_td_m,
+        actual_td_m=well.actual_td_m,
+        created_at=well.created_at,
+        updated_at=well.updated_at
+    )
+
+
+def _scenario_out(scenario) -> ScenarioOut:
+    return ScenarioOut(
+        id=str(scenario.id),
+        name=scenario.name,
+        status=scenario.status,
+        parent_id=str(scenario.parent_id) if scenario.parent_id else None,
+        version=scenario.version,
+        created_at=scenario.created_at,
+        updated_at=scenario.updated_at
+    )
+
+
+def _attachment_out(attachment) -> AttachmentOut:
+    return AttachmentOut(
+        id=str(attachment.id),
+        owner_type=attachment.owner_type,
+        owner_id=str(attachment.owner_id),
+        filename=attachment.filename,
+        content_type=attachment.content_type,
+        size=attachment.size,
+        sha256=attachment.sha256,
+        uploaded_by=attachment.uploaded_by,
+        created_at=attachment.created_at
+    )
+
+
+def _one(convert, row):
+    return convert(row) if row else row
+
+
+def _many(convert, rows):
+    return [convert(row) for row in rows]
+
+
+def _queries_changed():
+    grid_block_cache.invalidate()
+    aggregate_cache.invalidate()
+
+
+class SqlRepository(Repository):
+    """
+    SQLAlchemy backend (SQLite or PostgreSQL); converts ORM rows to the API models.
+
+    Users, campaigns, rigs and wells are served from the entity caches; every write
+    below updates or invalidates the cached entry in the same call. Grid blocks and
+    aggregations are cached by query shape and dropped on any write they could read.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(sql_services, db)
+
+    def get_user(self, user_id: str):
+        return user_cache.get(str(user_id), self._load_user)
+
+    def _load_user(self, user_id: str):
+        return _one(_user_out, super().get_user(user_id))
+
+    def get_user_by_email(self, email: str):
+        return _one(_user_out, super().get_user_by_email(email))
+
+    def get_users(self, skip: int = 0, limit: int = 100):
+        return _many(_user_out, super().get_users(skip, limit))
+
+    def create_user(self, user):
+        created = _one(_user_out, super().create_user(user))
+        user_cache.put(created.id, created)
+        return created
+
+    def update_user(self, user_id: str, user_update):
+        updated = _one(_user_out, super().update_user(user_id, user_update))
+        user_cache.put(str(user_id), updated)
+        return updated
+
+    def delete_user(self, user_id: str):
+        # Convert before deleting; the row is expired once the delete is committed
+        deleted = self.get_user(user_id)
+        if deleted:
+            super().delete_user(user_id)
+            user_cache.put(str(user_id), None)
+        return deleted
+
+    def authenticate_user(self, email: str, password: str):
+        return _one(_user_out, super().authenticate_user(email, password))
+
+    def add_user_role(self, user_id: str, role):
+        super().add_user_role(user_id, role)
+        user_cache.invalidate(str(user_id))
+        return self.get_user(user_id)
+
+    def remove_user_role(self, user_id: str, role):
+        removed = super().remove_user_role(user_id, role)
+        user_cache.invalidate(str(user_id))
+        return removed
+
+    def _campaigns_out(self, campaigns):
+        progress = sql_services.get_progress_by_campaign(self.db, [str(campaign.id) for campaign in campaigns])
+        return [_campaign_out(campaign, progress.get(str(campaign.id))) for campaign in campaigns]
+
+    def _one_campaign_out(self, campaign):
+        return self._campaigns_out([campaign])[0] if campaign else campaign
+
+    def get_campaign(self, campaign_id: str):
+        # Cached entries outlive the day they were built; days elapsed follow today's date
+        campaign = campaign_cache.get(str(campaign_id), self._load_campaign)
+        if campaign is None:
+            return None
+        return campaign.copy(update={"days_elapsed": days_elapsed(campaign.spud_date)})
+
+    def _load_campaign(self, campaign_id: str):
+        return self._one_campaign_out(super().get_campaign(campaign_id))
+
+    def get_campaigns(self, skip: int = 0, limit: int = 100):
+        return self._campaigns_out(super().get_campaigns(skip, limit))
+
+    def create_campaign(self, campaign):
+        created = self._one_campaign_out(super().create_campaign(campaign))
+        campaign_cache.put(created.id, created)
+        _queries_changed()
+        return created
+
+    def update_campaign(self, campaign_id: str, campaign_update):
+        updated = self._one_campaign_out(super().update_campaign(campaign_id, campaign_update))
+        campaign_cache.put(str(campaign_id), updated)
+        _queries_changed()
+        return updated
+
+    def delete_campaign(self, campaign_id: str):
+        deleted = self.get_campaign(campaign_id)
+        if deleted:
+            super().delete_campaign(campaign_id)
+            campaign_cache.put(str(campaign_id), None)
+            # Rigs, wells and tasks are deleted with their campaign
+            rig_cache.invalidate()
+            rig_location_cache.invalidate()
+            well_cache.invalidate()
+            _queries_changed()
+        return deleted
+
+    def get_campaign_kpi(self, campaign_id: str):
+        return _one(_campaign_kpi_out, super().get_campaign_kpi(campaign_id))
+
+    def get_campaign_kpis(self, skip: int = 0, limit: int = 100):
+        return _many(_campaign_kpi_out, super().get_campaign_kpis(skip, limit))
+
+    def _tasks_out(self, tasks):
+        # Comment summaries for the whole page at once; threads are never loaded here
+        summaries = sql_services.get_comment_summaries(self.db, [str(task.id) for task in tasks])
+        return [_task_out(task, *summaries.get(str(task.id), (0, None))) for task in tasks]
+
+    def _one_task_out(self, task):
+        return self._tasks_out([task])[0] if task else task
+
+    def get_task(self, task_id: str):
+        return self._one_task_out(super().get_task(task_id))
+
+    def get_tasks(self, skip: int = 0, limit: int = 100, campaign_id=None, status=None):
+        return self._tasks_out(super().get_tasks(skip, limit, campaign_id, status))
+
+    def create_task(self, task):
+        created = _one(_task_out, super().create_task(task))
+        _queries_changed()
+        return created
+
+    def update_task(self, task_id: str, task_update):
+        updated = self._one_task_out(super().update_task(task_id, task_update))
+        _queries_changed()
+        return updated
+
+    def delete_task(self, task_id: str):
+        deleted = self.get_task(task_id)
+        if deleted:
+            super().delete_task(task_id)
+            _queries_changed()
+        return deleted
+
+    def add_task_comment(self, task_id: str, comment):
+        if not super().add_task_comment(task_id, comment):
+            return None
+        return self.get_task(task_id)
+
+    def get_task_comments(self, task_id: str, after=None, limit: int = DEFAULT_COMMENT_PAGE_SIZE):
+        page = super().get_task_comments(task_id, after, limit)
+        if page is None:
+            return None
+        total, comments, has_more = page
+        return comment_page([_comment_out(comment) for comment in comments], total, has_more)
+
+    def search_tasks(self, query=None, skip: int = 0, limit: int = 20, prefix: bool = True, **filters):
+        total, hits, facets = super().search_tasks(query, skip, limit, prefix, **filters)
+        tasks = self._tasks_out([task for task, _ in hits])
+        return TaskSearchResult(
+            total=total,
+            items=[TaskSearchHit(task=task, score=score) for task, (_, score) in zip(tasks, hits)],
+            facets=facets
+        )
+
+    def get_grid_rows(self, entity: str, request):
+        key = (query_shape(entity, request), request.startRow, request.endRow)
+        rows, row_count = grid_block_cache.get(key, lambda key: super(SqlRepository, self).get_grid_rows(entity, request))
+        return GridResponse(rowData=rows, rowCount=row_count)
+
+    def aggregate(self, entity: str, request):
+        return aggregate_cache.get(aggregate_shape(entity, request), lambda key: super(SqlRepository, self).aggregate(entity, request))
+
+    def get_rig(self, rig_id: str):
+        return rig_cache.get(str(rig_id), self._load_rig)
+
+    def _load_rig(self, rig_id: str):
+        return _one(_rig_out, super().get_rig(rig_id))
+
+    def get_rigs(self, skip: int = 0, limit: int = 100, campaign_id=None):
+        return _many(_rig_out, super().get_rigs(skip, limit, campaign_id))
+
+    def create_rig(self, rig):
+        created = _one(_rig_out, super().create_rig(rig))
+        rig_cache.put(created.id, created)
+        rig_location_cache.invalidate()
+        _queries_changed()
+        return created
+
+    def update_rig(self, rig_id: str, rig_update):
+        updated = _one(_rig_out, super().update_rig(rig_id, rig_update))
+        rig_cache.put(str(rig_id), updated)
+        rig_location_cache.invalidate()
+        _queries_changed()
+        return updated
+
+    def delete_rig(self, rig_id: str):
+        deleted = self.get_rig(rig_id)
+        if deleted:
+            super().delete_rig(rig_id)
+            rig_cache.put(str(rig_id), None)
+            rig_location_cache.invalidate()
+            _queries_changed()
+        return deleted
+
+    def get_well(self, well_id: str):
+        return well_cache.get(str(well_id), self._load_well)
+
+    def _load_well(self, well_id: str):
+        return _one(_well_out, super().get_well(well_id))
+
+    def get_wells(self, skip: int = 0, limit: int = 100, campaign_id=None):
+        return _many(_well_out, super().get_wells(skip, limit, campaign_id))
+
+    def create_well(self, well):
+        created = _one(_well_out, super().create_well(well))
+        well_cache.put(created.id, created)
+        _queries_changed()
+        return created
+
+    def update_well(self, well_id: str, well_update):
+        updated = _one(_well_out, super().update_well(well_id, well_update))
+        well_cache.put(str(well_id), updated)
+        _queries_changed()
+        return updated
+
+    def delete_well(self, well_id: str):
+        deleted = self.get_well(well_id)
+        if deleted:
+            super().delete_well(well_id)
+            well_cache.put(str(well_id), None)
+            _queries_changed()
+        return deleted
+
+    def get_scenario(self, scenario_id: str):
+        return _one(_scenario_out, super().get_scenario(scenario_id))
+
+    def get_scenarios(self, skip: int = 0, limit: int = 100):
+        return _many(_scenario_out, super().get_scenarios(skip, limit))
+
+    def create_scenario(self, scenario):
+        return _one(_scenario_out, super().create_scenario(scenario))
+
+    def clone_scenario(self, scenario_id: str, clone):
+        return _one(_scenario_out, super().clone_scenario(scenario_id, clone))
+
+    def materialize_scenario(self, scenario_id: str):
+        return _one(_scenario_out, super().materialize_scenario(scenario_id))
+
+    def get_attachment(self, attachment_id: str):
+        return _one(_attachment_out, super().get_attachment(attachment_id))
+
+    def get_attachments(self, owner_type: str, owner_id: str, skip: int = 0, limit: int = 100):
+        return _many(_attachment_out, super().get_attachments(owner_type, owner_id, skip, limit))
+
+    def create_attachment(self, attachment):
+        return _one(_attachment_out, super().create_attachment(attachment))
+
+    def delete_attachment(self, attachment_id: str):
+        return _one(_attachment_out, super().delete_attachment(attachment_id))
@@ -2,4 +2,9 @@ from .user_service import *
 from .campaign_service import *
 from .task_service import *
 from .rig_service import *
-from .well_service import *
\ No newline at end of file
+from .well_service import *
+from .scenario_service import *
+from .kpi_service import *
+from .grid_service import *
+from .aggregate_service import *
+from .attachment_service import *
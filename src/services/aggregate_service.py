@@ -0,0 +1,91 @@
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from src.database.models import Campaign, Rig, Task, Well
+from src.models.aggregate import AggregateRequest, AggregateResult
+from src.services.aggregation import aggregate_measures, build_aggregate_result
+from src.services.grid_query import plain
+from src.services.purge_service import live_conditions
+from backend.calc.aggregate import measure_name
+
+# Aggregation field -> mapped column, per entity (see AGGREGATE_FIELDS)
+_AGGREGATE_SOURCES = {
+    "tasks": (Task, {
+        "status": Task.status,
+        "priority": Task.priority,
+        "assigned_to": Task.assignee_id,
+        "campaign_id": Task.campaign_id,
+        "well_id": Task.well_id,
+        "version": Task.version,
+    }),
+    "wells": (Well, {
+        "campaign_id": Well.campaign_id,
+        "status": Well.status,
+        "planned_td_m": Well.planned_td_m,
+        "actual_td_m": Well.actual_td_m,
+    }),
+    "campaigns": (Campaign, {
+        "rig": Campaign.rig,
+        "target_depth": Campaign.target_depth,
+        "current_depth": Campaign.current_depth,
+        "day_rate": Campaign.day_rate,
+    }),
+    "rigs": (Rig, {
+        "campaign_id": Rig.campaign_id,
+        "type": Rig.type,
+        "status": Rig.status,
+        "lat": Rig.lat,
+        "lon": Rig.lon,
+    }),
+}
+_FUNCS = {"count": func.count, "sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max}
+
+
+def _number(func_name: str, value):
+    if value is None or func_name == "count":
+        return value
+    # Numeric columns come back as Decimal; report floats, as the memory backend does
+    return float(value)
+
+
+def _filter_condition(column, values):
+    present = [value for value in values if value is not None]
+    conditions = [column.in_(present)] if present else []
+    if None in values:
+        conditions.append(column.is_(None))
+    return or_(*conditions) if conditions else column.in_([])
+
+
+def aggregate(db: Session, entity: str, request: AggregateRequest) -> AggregateResult:
+    """
+    Group an entity in SQL: one GROUP BY per level of the result (rows, pivot cells and
+    totals), each returning only the aggregated rows.
+    """
+    measures = aggregate_measures(entity, request)
+    model, mapped = _AGGREGATE_SOURCES[entity]
+    conditions = live_conditions(model) + [
+        _filter_condition(mapped[field], values) for field, values in request.filters.items()
+    ]
+    aggregates = [
+        (_FUNCS[func_name](mapped[field]) if field else func.count()).label(measure_name(func_name, field))
+        for func_name, field in measures
+    ]
+
+    def run(by):
+        query = (
+            select(*(mapped[field].label(field) for field in by), *aggregates)
+            .select_from(model)
+            .where(*conditions)
+            .group_by(*(mapped[field] for field in by))
+        )
+        return [
+            (
+                tuple(plain(row[field]) for field in by),
+                {
+                    measure_name(func_name, field): _number(func_name, row[measure_name(func_name, field)])
+                    for func_name, field in measures
+                },
+            )
+            for row in db.execute(query).mappings()
+        ]
+
+    return build_aggregate_result(request, measures, run)
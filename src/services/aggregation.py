@@ -0,0 +1,102 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.models.aggregate import AggregateResult, AggregateRow
+
+# Entity -> (dimension fields to group, pivot or filter on; numeric fields to aggregate)
+AGGREGATE_FIELDS = {
+    "tasks": (("status", "priority", "assigned_to", "campaign_id", "well_id"), ("version",)),
+    "wells": (("campaign_id", "status"), ("planned_td_m", "actual_td_m")),
+    "campaigns": (("rig",), ("target_depth", "current_depth", "day_rate")),
+    "rigs": (("campaign_id", "type", "status"), ("lat", "lon")),
+}
+MAX_GROUP_BY = 3
+
+Measures = List[Tuple[str, Optional[str]]]
+GroupRows = List[Tuple[tuple, Dict[str, Any]]]
+
+
+class AggregateQueryError(ValueError):
+    """
+    The aggregation names an unknown field or an aggregate that does not apply to it.
+    """
+
+
+def aggregate_measures(entity: str, request) -> Measures:
+    """
+    Validate ``request`` for ``entity`` and return its ``(func, field)`` measures.
+    """
+    if entity not in AGGREGATE_FIELDS:
+        raise AggregateQueryError(f"Unknown entity: {entity}")
+    dimensions, numeric = AGGREGATE_FIELDS[entity]
+    if len(request.group_by) > MAX_GROUP_BY:
+        raise AggregateQueryError(f"At most {MAX_GROUP_BY} group_by fields")
+    fields = list(request.group_by) + list(request.filters) + ([request.pivot] if request.pivot else [])
+    for field in fields:
+        if field not in dimensions:
+            raise AggregateQueryError(f"Cannot group or filter {entity} by {field}; use one of {list(dimensions)}")
+    if request.pivot in request.group_by:
+        raise AggregateQueryError("pivot must not also be in group_by")
+    measures = []
+    for measure in request.measures:
+        func = measure.func.value
+        if measure.field is not None and measure.field not in numeric:
+            raise AggregateQueryError(f"Cannot aggregate {entity}.{measure.field}; use one of {list(numeric)}")
+        if measure.field is None and func != "count":
+            raise AggregateQueryError(f"{func} needs a field")
+        measures.append((func, measure.field))
+    return measures
+
+
+def aggregate_shape(entity: str, request) -> str:
+    return json.dumps(
+        [entity, request.group_by, request.pivot, [(m.func.value, m.field) for m in request.measures],
+         {field: sorted(values, key=str) for field, values in request.filters.items()}],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _key_order(key: tuple):
+    # Missing values last, like NULLS LAST
+    return tuple((value is None, "" if value is None else str(value)) for value in key)
+
+
+def _pivot_label(value) -> str:
+    return "null" if value is None else str(value)
+
+
+def build_aggregate_result(
+    request, measures: Measures, run: Callable[[List[str]], GroupRows]
+) -> AggregateResult:
+    """
+    Assemble an ``AggregateResult`` from a backend's ``run(by)``, which returns one
+    ``(key, {measure: value})`` pair per group of the ``by`` fields (exactly one, with an
+    empty key, when ``by`` is empty).
+
+    Without a pivot this is one grouped query plus one for the totals (just one when
+    nothing is grouped); a pivot adds the per-cell query.
+    """
+    by = list(request.group_by)
+    rows = sorted(run(by), key=lambda row: _key_order(row[0]))
+    totals = rows[0][1] if not by and rows else run([])[0][1]
+    pivot_values: List[Any] = []
+    cells: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+    if request.pivot:
+        pivoted = sorted(run(by + [request.pivot]), key=lambda row: _key_order(row[0][-1:]))
+        pivot_values = list(dict.fromkeys(key[-1] for key, _ in pivoted))
+        for key, values in pivoted:
+            cells.setdefault(key[:-1], {})[_pivot_label(key[-1])] = values
+    return AggregateResult(
+        group_by=by,
+        pivot=request.pivot,
+        pivot_values=pivot_values,
+        rows=[
+            AggregateRow(
+                key=dict(zip(by, key)),
+                values=values,
+                pivot=cells.get(key, {}) if request.pivot else None
+            )
+            for key, values in rows
+        ],
+        totals=totals
+    )
@@ -0,0 +1,76 @@
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from src.database.models import Attachment
+from src.models.attachment import AttachmentCreate, AttachmentOwnerType
+from src.services.blob_store import blob_store
+import uuid
+from typing import List
+
+
+def get_attachment(db: Session, attachment_id: str):
+    return db.query(Attachment).filter(Attachment.id == attachment_id).first()
+
+
+def get_attachments(db: Session, owner_type: str, owner_id: str, skip: int = 0, limit: int = 100):
+    return (
+        db.query(Attachment)
+        .filter(Attachment.owner_type == owner_type, Attachment.owner_id == owner_id)
+        .order_by(Attachment.created_at)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def create_attachment(db: Session, attachment: AttachmentCreate):
+    db_attachment = Attachment(
+        id=str(uuid.uuid4()),
+        owner_type=attachment.owner_type.value,
+        owner_id=attachment.owner_id,
+        filename=attachment.filename,
+        content_type=attachment.content_type,
+        size=attachment.size,
+        s3_key=attachment.s3_key,
+        sha256=attachment.sha256,
+        uploaded_by=attachment.uploaded_by
+    )
+    db.add(db_attachment)
+    db.commit()
+    db.refresh(db_attachment)
+    return db_attachment
+
+
+def delete_attachment(db: Session, attachment_id: str):
+    db_attachment = get_attachment(db, attachment_id)
+    if not db_attachment:
+        return None
+
+    db.delete(db_attachment)
+    db.commit()
+    return db_attachment
+
+
+def blob_in_use(db: Session, sha256: str) -> bool:
+    """
+    Whether any attachment still refers to the stored blob with this content hash.
+    """
+    return db.query(Attachment.id).filter(Attachment.sha256 == sha256).first() is not None
+
+
+def delete_owned_attachments(db: Session, owner_type: AttachmentOwnerType, owner_ids) -> List[str]:
+    """
+    Delete the attachments of the given owners (a list or subquery of ids) without
+    committing; return the content hashes they referred to, for ``release_blobs``.
+    """
+    condition = (Attachment.owner_type == owner_type.value, Attachment.owner_id.in_(owner_ids))
+    sha256s = db.scalars(select(Attachment.sha256).where(*condition).distinct()).all()
+    db.execute(delete(Attachment).where(*condition), execution_options={"synchronize_session": False})
+    return list(sha256s)
+
+
+def release_blobs(db: Session, sha256s: List[str]):
+    """
+    After a commit that deleted attachments, delete the blobs nothing refers to any more.
+    """
+    if sha256s:
+        blob_store.release(sha256s, lambda sha256: blob_in_use(db, sha256))
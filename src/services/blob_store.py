@@ -0,0 +1,150 @@
+"""
+Content-addressed file storage for attachment bodies.
+
+Blobs are keyed by their sha256, so uploading the same file twice stores it once. An
+upload is streamed into a temporary file in the store's directory while it is hashed;
+on commit it is renamed to its key, or dropped if that key already exists. Only one
+chunk is ever held in memory.
+
+``LocalBlobStore`` keeps blobs on the local filesystem and stands in for S3: keys have
+the same ``sha256/ab/cd/<digest>`` shape an S3 bucket would use, and the API serves
+files by path so the server can send them with zero-copy ``sendfile``.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so the lock only covers this process
+    fcntl = None
+
+# 1 MiB: large enough that per-chunk overhead is negligible, small enough to stream
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredBlob(NamedTuple):
+    key: str
+    sha256: str
+    size: int
+    # False when an identical blob was already stored
+    created: bool
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+class BlobWriter:
+    """
+    One upload in progress; ``write`` chunks, then ``commit`` or ``abort``.
+    """
+
+    def __init__(self, store: "LocalBlobStore", max_size: Optional[int] = None):
+        self._store = store
+        self._max_size = max_size
+        self._digest = hashlib.sha256()
+        self.size = 0
+        fd, self._path = tempfile.mkstemp(prefix="upload-", dir=store.temporary_directory)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self._max_size is not None and self.size > self._max_size:
+            raise BlobTooLarge(f"Upload exceeds {self._max_size} bytes")
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> StoredBlob:
+        self._file.flush()
+        if self._store.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        sha256 = self._digest.hexdigest()
+        key = self._store.key_for(sha256)
+        path = self._store.path(key)
+        if os.path.exists(path):
+            os.remove(self._path)
+            return StoredBlob(key, sha256, self.size, False)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomic: a concurrent upload of the same content replaces it with identical bytes
+        os.replace(self._path, path)
+        return StoredBlob(key, sha256, self.size, True)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+class LocalBlobStore:
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        self.temporary_directory = os.path.join(directory, "tmp")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(sha256: str) -> str:
+        return f"sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/"))
+
+    def writer(self, max_size: Optional[int] = None) -> BlobWriter:
+        # Uploads are staged in the store's directory so commit is a same-filesystem rename
+        os.makedirs(self.temporary_directory, exist_ok=True)
+        return BlobWriter(self, max_size)
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold an exclusive lock shared by every process using this directory, e.g. around
+        storing a blob and recording it, so another worker cannot delete the blob as
+        unused in between.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(os.path.join(self.directory, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def release(self, sha256s: Iterable[str], in_use: Callable[[str], bool]):
+        """
+        Delete the blobs of these content hashes that ``in_use`` says no attachment refers
+        to any more. Call it once the attachment deletes are committed: the check runs
+        under ``locked``, so an upload recorded meanwhile keeps its blob.
+        """
+        with self.locked():
+            for sha256 in set(sha256s):
+                if not in_use(sha256):
+                    self.delete(self.key_for(sha256))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+# Uploads over this size are rejected with 413 while streaming, before all of it is stored
+MAX_ATTACHMENT_SIZE = int(os.getenv("ATTACHMENT_MAX_BYTES", str(1024 ** 3)))
+
+# ATTACHMENT_DIR holds uploaded files; ATTACHMENT_FSYNC=1 syncs each one before it is
+# recorded, so a committed attachment survives power loss
+blob_store = LocalBlobStore(
+    os.getenv("ATTACHMENT_DIR", os.path.join("data", "attachments")),
+    fsync=os.getenv("ATTACHMENT_FSYNC", "0") == "1",
+)
@@ -0,0 +1,137 @@
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from backend.calc.engine import compute_costs, compute_duration, estimate_eta
+
+# Task statuses that no longer count as open work
+CLOSED_TASK_STATUSES = frozenset({"done"})
+COMPLETED_WELL_STATUSES = frozenset({"completed"})
+
+
+def _status_name(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+
+def campaign_progress(target_depth, current_depth) -> float:
+    if target_depth and target_depth > 0:
+        return round(float(current_depth or 0) / float(target_depth) * 100, 2)
+    return 0.0
+
+
+def campaign_status(target_depth, current_depth) -> str:
+    current_depth = current_depth or 0
+    if target_depth is not None and current_depth >= target_depth:
+        return "Completed"
+    elif current_depth > 0:
+        return "In Progress"
+    else:
+        return "Not Started"
+
+
+def days_elapsed(spud_date: Optional[date]) -> int:
+    if spud_date:
+        return (date.today() - spud_date).days
+    return 0
+
+
+def build_campaign_kpis(
+    campaign_id: str,
+    name: str,
+    spud_date: Optional[date],
+    target_depth,
+    current_depth,
+    day_rate,
+    wells: Iterable[Tuple[Optional[str], Optional[date], Optional[date]]],
+    task_counts: Mapping[str, int],
+) -> dict:
+    """
+    Compute one campaign's KPI row.
+
+    ``wells`` are ``(status, start_date, end_date)`` tuples and ``task_counts`` maps task
+    status to count. Cost is the campaign day rate over the planned well days, and the
+    ETA the latest planned well end. Days elapsed depend on today's date, so they are
+    derived from ``spud_date`` when the row is read rather than stored.
+    """
+    well_count = wells_completed = planned_well_days = 0
+    end_dates = []
+    for status, start_date, end_date in wells:
+        well_count += 1
+        if status in COMPLETED_WELL_STATUSES:
+            wells_completed += 1
+        if end_date is not None:
+            end_dates.append(end_date)
+            if start_date is not None:
+                planned_well_days += compute_duration(start_date, end_date)
+    counts = {_status_name(status): count for status, count in task_counts.items()}
+    return {
+        "campaign_id": str(campaign_id),
+        "campaign_name": name,
+        "status": campaign_status(target_depth, current_depth),
+        "progress_pct": campaign_progress(target_depth, current_depth),
+        "spud_date": spud_date,
+        "well_count": well_count,
+        "wells_completed": wells_completed,
+        "planned_well_days": planned_well_days,
+        "estimated_cost": (
+            compute_costs(float(day_rate), planned_well_days) if day_rate is not None else None
+        ),
+        "eta": estimate_eta(end_dates),
+        "task_count": sum(counts.values()),
+        "open_tasks": sum(n for status, n in counts.items() if status not in CLOSED_TASK_STATUSES),
+        "blocked_tasks": counts.get("blocked", 0),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+class CampaignKpiStore:
+    """
+    Materialized per-campaign KPI rows for the in-memory backend.
+
+    Writes to a campaign, or to its wells or tasks, only mark that campaign dirty;
+    reads recompute the dirty rows from ``compute`` and serve the rest as stored, so a
+    dashboard request costs one pass over the campaigns that changed since the last one.
+    """
+
+    def __init__(self, compute: Callable[[str], Optional[dict]], campaign_ids: Callable[[], Iterable[str]]):
+        self._compute = compute
+        self._campaign_ids = campaign_ids
+        self._lock = threading.Lock()
+        self._rows: Dict[str, dict] = {}
+        # Ordered, so a full build keeps the campaigns' order
+        self._dirty: Dict[str, None] = {}
+        self._built = False
+
+    def reset(self):
+        """
+        Drop every row; the next read rebuilds them all.
+        """
+        with self._lock:
+            self._rows.clear()
+            self._dirty.clear()
+            self._built = False
+
+    def mark_dirty(self, *campaign_ids: Optional[str]):
+        with self._lock:
+            self._dirty.update(dict.fromkeys(str(campaign_id) for campaign_id in campaign_ids if campaign_id))
+
+    def _refresh(self):
+        if not self._built:
+            self._dirty = dict.fromkeys(self._campaign_ids())
+            self._built = True
+        for campaign_id in self._dirty:
+            row = self._compute(campaign_id)
+            if row is None:
+                self._rows.pop(campaign_id, None)
+            else:
+                self._rows[campaign_id] = row
+        self._dirty.clear()
+
+    def get(self, campaign_id: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            return self._rows.get(str(campaign_id))
+
+    def rows(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        with self._lock:
+            self._refresh()
+            return list(self._rows.values())[skip:skip + limit]
@@ -1,6 +1,11 @@
+from sqlalchemy import delete, or_, select
 from sqlalchemy.orm import Session
-from src.database.models import Campaign
+from src.database.models import Campaign, Rig, Task, Well
+from src.models.attachment import AttachmentOwnerType
 from src.models.campaign import CampaignCreate, CampaignUpdate
+from src.services.attachment_service import delete_owned_attachments, release_blobs
+from src.services.kpi_service import refresh_campaign_kpis
+from src.services.purge_service import soft_delete_tasks
 from datetime import date, datetime
 import uuid
 from typing import List, Optional
@@ -18,13 +23,15 @@ def create_campaign(db: Session, campaign: CampaignCreate):
     db_campaign = Campaign(
         id=str(uuid.uuid4()),
         name=campaign.name,
-        block=campaign.block,
-        field=campaign.field,
-        start_date=campaign.start_date,
-        end_date=campaign.end_date,
-        status=campaign.status
+        rig=campaign.rig,
+        start_date=campaign.spud_date,
+        target_depth=campaign.target_depth,
+        current_depth=campaign.current_depth,
+        day_rate=campaign.day_rate
     )
     db.add(db_campaign)
+    db.flush()
+    refresh_campaign_kpis(db, db_campaign.id)
     db.commit()
     db.refresh(db_campaign)
     return db_campaign
@@ -36,22 +43,45 @@ def update_campaign(db: Session, campaign_id: str, campaign_update: CampaignUpda
         return None
     
     update_data = campaign_update.dict(exclude_unset=True)
+    if "spud_date" in update_data:
+        update_data["start_date"] = update_data.pop("spud_date")
     for key, value in update_data.items():
         setattr(db_campaign, key, value)
     
     db_campaign.updated_at = datetime.utcnow()
+    db.flush()
+    refresh_campaign_kpis(db, campaign_id)
     db.commit()
     db.refresh(db_campaign)
     return db_campaign
 
 
 def delete_campaign(db: Session, campaign_id: str):
+    """
+    Delete a campaign with its rigs and wells in a few set-based statements, without
+    loading any children. Its tasks are soft-deleted and detached; the purge job removes
+    them and their comments later in batches. Attachments of the campaign and of its
+    wells and tasks are deleted at once.
+    """
     db_campaign = get_campaign(db, campaign_id)
     if not db_campaign:
         return None
     
-    db.delete(db_campaign)
+    # The bulk deletes bypass the session; drop the stale row so it is not seen again
+    db.expunge(db_campaign)
+    well_ids = select(Well.id).where(Well.campaign_id == campaign_id).scalar_subquery()
+    owned_tasks = or_(Task.campaign_id == campaign_id, Task.well_id.in_(well_ids))
+    released = delete_owned_attachments(db, AttachmentOwnerType.task, select(Task.id).where(owned_tasks))
+    released += delete_owned_attachments(db, AttachmentOwnerType.well, well_ids)
+    released += delete_owned_attachments(db, AttachmentOwnerType.campaign, [campaign_id])
+    soft_delete_tasks(db, owned_tasks, detach=True)
+    bulk = {"synchronize_session": False}
+    db.execute(delete(Rig).where(Rig.campaign_id == campaign_id), execution_options=bulk)
+    db.execute(delete(Well).where(Well.campaign_id == campaign_id), execution_options=bulk)
+    db.execute(delete(Campaign).where(Campaign.id == campaign_id), execution_options=bulk)
+    refresh_campaign_kpis(db, campaign_id)
     db.commit()
+    release_blobs(db, released)
     return db_campaign
 
 
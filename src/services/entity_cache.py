@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Defaults can be tuned per deployment; TTL bounds staleness across worker processes
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "30"))
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "5"))
+# Grid queries: whole ordered results are large, so far fewer of them are kept than blocks
+GRID_RESULT_CACHE_SIZE = int(os.getenv("GRID_RESULT_CACHE_SIZE", "16"))
+GRID_BLOCK_CACHE_SIZE = int(os.getenv("GRID_BLOCK_CACHE_SIZE", "256"))
+AGGREGATE_CACHE_SIZE = int(os.getenv("AGGREGATE_CACHE_SIZE", "128"))
+
+_MISSING = object()
+
+
+class EntityCache:
+    """
+    Thread-safe LRU cache with per-entry TTL for single-entity lookups.
+
+    A loader returning None is cached as a negative entry (for a shorter TTL), so
+    repeated lookups of missing ids do not hit the database either. Writers keep the
+    cache current through ``put`` (write-through) and ``invalidate``. ``clock`` returns
+    the current time in seconds for the TTLs (monotonic by default).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = ENTITY_CACHE_SIZE,
+        ttl: float = ENTITY_CACHE_TTL,
+        negative_ttl: float = NEGATIVE_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every write so a load that raced with it is not cached
+        self._generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[Hashable], Any]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    if value is _MISSING:
+                        self.negative_hits += 1
+                        return None
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader(key)
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Optional[Any]):
+        """
+        Write-through: cache ``value`` for ``key``; None records the id as missing.
+        """
+        with self._lock:
+            self._generation += 1
+            self._store(key, value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drop one key, or every entry when ``key`` is None.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _store(self, key: Hashable, value: Optional[Any]):
+        if value is None:
+            self._entries[key] = (_MISSING, self._clock() + self.negative_ttl)
+        else:
+            self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            }
+
+
+user_cache = EntityCache("users")
+campaign_cache = EntityCache("campaigns")
+rig_cache = EntityCache("rigs")
+well_cache = EntityCache("wells")
+# Server-side grid rows keyed by query shape: ordered in-memory results, and SQL blocks
+grid_result_cache = EntityCache("grid_results", maxsize=GRID_RESULT_CACHE_SIZE)
+grid_block_cache = EntityCache("grid_blocks", maxsize=GRID_BLOCK_CACHE_SIZE)
+# Grouped aggregations keyed by query shape (and, in memory, the column snapshots they read)
+aggregate_cache = EntityCache("aggregates", maxsize=AGGREGATE_CACHE_SIZE)
+# Rig coordinates as arrays for nearest-rig queries; one entry, dropped on any rig write
+rig_location_cache = EntityCache("rig_locations", maxsize=1)
+# TaskOut models built from the memory store's compact task records, keyed by (id, version)
+task_model_cache = EntityCache("task_models")
+
+entity_caches = {
+    cache.name: cache
+    for cache in (
+        user_cache, campaign_cache, rig_cache, well_cache, grid_result_cache, grid_block_cache, aggregate_cache,
+        task_model_cache, rig_location_cache,
+    )
+}
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in entity_caches.items()}
+
+
+def clear_entity_caches():
+    for cache in entity_caches.values():
+        cache.invalidate()
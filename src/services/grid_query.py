@@ -0,0 +1,299 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Column id -> value kind, per grid entity; only these can be filtered, sorted or grouped
+GRID_COLUMNS = {
+    "tasks": {
+        "id": "text",
+        "title": "text",
+        "description": "text",
+        "status": "text",
+        "priority": "text",
+        "due_date": "date",
+        "assigned_to": "text",
+        "campaign_id": "text",
+        "well_id": "text",
+        "version": "number",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+    "wells": {
+        "id": "text",
+        "name": "text",
+        "campaign_id": "text",
+        "status": "text",
+        "start_date": "date",
+        "end_date": "date",
+        "planned_td_m": "number",
+        "actual_td_m": "number",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+}
+AGG_FUNCS = ("sum", "min", "max", "avg", "count")
+# Largest block a single request may ask for (AG Grid's cacheBlockSize defaults to 100)
+MAX_BLOCK_SIZE = 1000
+
+
+class GridQueryError(ValueError):
+    """
+    The grid request names an unknown column, aggregation or filter.
+    """
+
+
+def grid_columns(entity: str, request) -> Dict[str, str]:
+    """
+    Validate ``request`` against the entity's columns and return them.
+    """
+    columns = GRID_COLUMNS.get(entity)
+    if columns is None:
+        raise GridQueryError(f"Unknown grid entity: {entity}")
+    if request.endRow < request.startRow or request.endRow - request.startRow > MAX_BLOCK_SIZE:
+        raise GridQueryError(f"endRow must be within {MAX_BLOCK_SIZE} rows after startRow")
+    if len(request.groupKeys) > len(request.rowGroupCols):
+        raise GridQueryError("More groupKeys than rowGroupCols")
+    names = [s.colId for s in request.sortModel] + list(request.filterModel or {})
+    names += [c.id for c in request.rowGroupCols] + [c.id for c in request.valueCols]
+    for name in names:
+        if name not in columns:
+            raise GridQueryError(f"Unknown column for {entity}: {name}")
+    for column in request.valueCols:
+        if (column.aggFunc or "sum") not in AGG_FUNCS:
+            raise GridQueryError(f"Unsupported aggFunc: {column.aggFunc}")
+    return columns
+
+
+def query_shape(entity: str, request) -> str:
+    """
+    Canonical key for everything that decides a result's rows and order, i.e. the request
+    without its block range.
+    """
+    return json.dumps(
+        [
+            entity,
+            [(s.colId, s.sort.value) for s in request.sortModel],
+            request.filterModel or {},
+            [c.id for c in request.rowGroupCols],
+            [(c.id, c.aggFunc or "sum") for c in request.valueCols],
+            request.groupKeys,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def plain(value):
+    # Enum members to their value and Decimals to float, so every backend reports a
+    # numeric column the same way whatever scale it stores; everything else as is
+    if isinstance(value, Decimal):
+        return float(value)
+    return getattr(value, "value", value)
+
+
+def group_key(value) -> Optional[str]:
+    """
+    String form of a group value, as AG Grid sends it back in ``groupKeys``.
+    """
+    value = plain(value)
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+
+
+def parse_value(kind: str, raw):
+    """
+    Coerce a filter operand or group key to the column's kind.
+    """
+    if raw is None or raw == "":
+        return None
+    if kind == "number":
+        return float(raw)
+    if kind in ("date", "datetime"):
+        # AG Grid sends dates as "YYYY-MM-DD hh:mm:ss"; filters compare whole days
+        return date.fromisoformat(str(raw)[:10])
+    return str(raw)
+
+
+def parse_group_key(kind: str, raw):
+    """
+    Coerce a group key to the column's kind. Unlike filter operands, datetime keys keep
+    their time: a group holds one exact value, as the grouping returned it.
+    """
+    if kind != "datetime" or raw is None or raw == "":
+        return parse_value(kind, raw)
+    try:
+        return datetime.fromisoformat(str(raw))
+    except ValueError:
+        raise GridQueryError(f"Invalid group key: {raw}")
+
+
+def iter_conditions(spec: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Return ``(operator, conditions)`` of a column filter; a single condition is an AND
+    of one. Handles both ``conditions`` (AG Grid 29+) and ``condition1``/``condition2``.
+    """
+    if "conditions" in spec:
+        return spec.get("operator", "AND").upper(), spec["conditions"]
+    if "condition1" in spec:
+        conditions = [spec["condition1"]] + ([spec["condition2"]] if spec.get("condition2") else [])
+        return spec.get("operator", "AND").upper(), conditions
+    return "AND", [spec]
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _condition_test(kind: str, condition: Dict[str, Any]) -> Callable[[Any], bool]:
+    filter_type = condition.get("filterType") or ("set" if "values" in condition else "text")
+    op = condition.get("type", "equals")
+    if op == "blank":
+        return lambda value: value is None or value == ""
+    if op == "notBlank":
+        return lambda value: value is not None and value != ""
+    if filter_type == "set":
+        allowed = {None if v is None else str(v) for v in condition.get("values") or []}
+        # Set-filtered columns repeat few distinct values; key each one once
+        memo: Dict[Any, bool] = {}
+
+        def test(value) -> bool:
+            hit = memo.get(value)
+            if hit is None:
+                hit = memo[value] = group_key(value) in allowed
+            return hit
+
+        return test
+    if filter_type == "text":
+        operand = str(condition.get("filter") or "").lower()
+        tests = {
+            "equals": lambda text: text == operand,
+            "notEqual": lambda text: text != operand,
+            "contains": lambda text: operand in text,
+            "notContains": lambda text: operand not in text,
+            "startsWith": lambda text: text.startswith(operand),
+            "endsWith": lambda text: text.endswith(operand),
+        }
+        if op not in tests:
+            raise GridQueryError(f"Unsupported text filter: {op}")
+        test = tests[op]
+        return lambda value: test("" if value is None else str(plain(value)).lower())
+    if filter_type in ("number", "date"):
+        if filter_type == "number":
+            low, high = parse_value("number", condition.get("filter")), parse_value("number", condition.get("filterTo"))
+            convert = float
+        else:
+            low, high = parse_value("date", condition.get("dateFrom")), parse_value("date", condition.get("dateTo"))
+            convert = _day
+        tests = {
+            "equals": lambda v: v == low,
+            "notEqual": lambda v: v != low,
+            "lessThan": lambda v: v < low,
+            "lessThanOrEqual": lambda v: v <= low,
+            "greaterThan": lambda v: v > low,
+            "greaterThanOrEqual": lambda v: v >= low,
+            "inRange": lambda v: low <= v <= high,
+        }
+        if op not in tests or low is None or (op == "inRange" and high is None):
+            raise GridQueryError(f"Unsupported {filter_type} filter: {op}")
+        test = tests[op]
+        return lambda value: value is not None and test(convert(value))
+    raise GridQueryError(f"Unsupported filterType: {filter_type}")
+
+
+def row_predicate(columns: Dict[str, str], filter_model: Optional[Dict[str, Any]]) -> Callable[[Any], bool]:
+    """
+    Compile an AG Grid filter model into a predicate over objects with the column
+    attributes.
+    """
+    checks = []
+    for name, spec in (filter_model or {}).items():
+        operator, conditions = iter_conditions(spec)
+        tests = [_condition_test(columns[name], condition) for condition in conditions]
+        if len(tests) == 1:
+            checks.append((name, tests[0]))
+        elif operator == "OR":
+            checks.append((name, lambda value, tests=tests: any(test(value) for test in tests)))
+        else:
+            checks.append((name, lambda value, tests=tests: all(test(value) for test in tests)))
+
+    def predicate(obj) -> bool:
+        for name, test in checks:
+            if not test(getattr(obj, name)):
+                return False
+        return True
+
+    return predicate
+
+
+def _sort_rows(rows: List, sorts: List[Tuple[Callable[[Any], Any], bool]]) -> List:
+    # Stable sorts applied last key first; None always sorts last, as NULLS LAST does
+    for key, descending in reversed(sorts):
+        present = [row for row in rows if key(row) is not None]
+        missing = [row for row in rows if key(row) is None] if len(present) < len(rows) else []
+        present.sort(key=key, reverse=descending)
+        rows = present + missing
+    return rows
+
+
+def _aggregate(func: str, values: List):
+    if func == "count":
+        # COUNT(column): any column, nulls skipped
+        return sum(1 for v in values if v is not None)
+    values = [float(v) for v in values if v is not None]
+    if not values:
+        return None
+    if func == "avg":
+        return sum(values) / len(values)
+    return {"sum": sum, "min": min, "max": max}[func](values)
+
+
+def query_rows(objects: Iterable, columns: Dict[str, str], request) -> Tuple[List, bool]:
+    """
+    Run a grid request over in-memory objects, ignoring its block range.
+
+    Returns ``(rows, grouped)``: the ordered matching objects at the leaf level, or
+    ``{group column, childCount, aggregates}`` dicts while ``groupKeys`` are fewer than
+    ``rowGroupCols``. Ties are broken by id (leaves) or by group value, as in SQL.
+    """
+    predicate = row_predicate(columns, request.filterModel)
+    keys = [
+        (column.id, None if key is None else str(key))
+        for column, key in zip(request.rowGroupCols, request.groupKeys)
+    ]
+    rows = [obj for obj in objects if predicate(obj)]
+    for name, key in keys:
+        rows = [obj for obj in rows if group_key(getattr(obj, name)) == key]
+    level = len(request.groupKeys)
+    if level == len(request.rowGroupCols):
+        sorts = [(_attribute_key(s.colId), s.sort.value == "desc") for s in request.sortModel]
+        return _sort_rows(rows, sorts + [(_attribute_key("id"), False)]), False
+
+    group_column = request.rowGroupCols[level].id
+    groups: Dict[Any, List] = {}
+    for obj in rows:
+        groups.setdefault(plain(getattr(obj, group_column)), []).append(obj)
+    group_rows = []
+    for value, members in groups.items():
+        row = {group_column: value, "childCount": len(members)}
+        for column in request.valueCols:
+            row[column.id] = _aggregate(column.aggFunc or "sum", [getattr(obj, column.id) for obj in members])
+        group_rows.append(row)
+    visible = {group_column, *(column.id for column in request.valueCols)}
+    sorts = [(_item_key(s.colId), s.sort.value == "desc") for s in request.sortModel if s.colId in visible]
+    if not any(s.colId == group_column for s in request.sortModel):
+        sorts.append((_item_key(group_column), False))
+    return _sort_rows(group_rows, sorts), True
+
+
+def _attribute_key(name: str):
+    return lambda obj: plain(getattr(obj, name))
+
+
+def _item_key(name: str):
+    return lambda row: row[name]
+
+
+def leaf_row(obj, columns: Dict[str, str]) -> Dict[str, Any]:
+    return {name: plain(getattr(obj, name)) for name in columns}
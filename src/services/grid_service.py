@@ -0,0 +1,166 @@
+from sqlalchemy import String, and_, cast, func, not_, or_, select
+from sqlalchemy.orm import Session
+from src.database.models import Task, Well
+from src.services.purge_service import live_conditions
+from src.services.grid_query import GridQueryError, grid_columns, iter_conditions, parse_group_key, parse_value, plain
+from typing import Any, Dict, List, Tuple
+
+# Grid column id -> mapped column; ``assigned_to`` is the API name of assignee_id
+_GRID_SOURCES = {
+    "tasks": (Task, {
+        "id": Task.id,
+        "title": Task.title,
+        "description": Task.description,
+        "status": Task.status,
+        "priority": Task.priority,
+        "due_date": Task.due_date,
+        "assigned_to": Task.assignee_id,
+        "campaign_id": Task.campaign_id,
+        "well_id": Task.well_id,
+        "version": Task.version,
+        "created_at": Task.created_at,
+        "updated_at": Task.updated_at,
+    }),
+    "wells": (Well, {
+        "id": Well.id,
+        "name": Well.name,
+        "campaign_id": Well.campaign_id,
+        "status": Well.status,
+        "start_date": Well.start_date,
+        "end_date": Well.end_date,
+        "planned_td_m": Well.planned_td_m,
+        "actual_td_m": Well.actual_td_m,
+        "created_at": Well.created_at,
+        "updated_at": Well.updated_at,
+    }),
+}
+_AGGREGATES = {"sum": func.sum, "min": func.min, "max": func.max, "avg": func.avg, "count": func.count}
+
+
+def _text(column):
+    return func.lower(column if isinstance(column.type, String) else cast(column, String))
+
+
+def _sql_condition(column, kind: str, condition: Dict[str, Any]):
+    filter_type = condition.get("filterType") or ("set" if "values" in condition else "text")
+    op = condition.get("type", "equals")
+    if op == "blank":
+        return or_(column.is_(None), cast(column, String) == "")
+    if op == "notBlank":
+        return and_(column.isnot(None), cast(column, String) != "")
+    if filter_type == "set":
+        values = condition.get("values") or []
+        present = [parse_value(kind, value) for value in values if value is not None]
+        conditions = [column.in_(present)] if present else []
+        if None in values:
+            conditions.append(column.is_(None))
+        return or_(*conditions) if conditions else column.in_([])
+    if filter_type == "text":
+        operand = str(condition.get("filter") or "").lower()
+        escaped = operand.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        text = _text(column)
+        conditions = {
+            "equals": lambda: text == operand,
+            "notEqual": lambda: or_(text != operand, column.is_(None)),
+            "contains": lambda: text.like(f"%{escaped}%", escape="\\"),
+            "notContains": lambda: or_(not_(text.like(f"%{escaped}%", escape="\\")), column.is_(None)),
+            "startsWith": lambda: text.like(f"{escaped}%", escape="\\"),
+            "endsWith": lambda: text.like(f"%{escaped}", escape="\\"),
+        }
+        if op not in conditions:
+            raise GridQueryError(f"Unsupported text filter: {op}")
+        return conditions[op]()
+    if filter_type in ("number", "date"):
+        if filter_type == "number":
+            low, high = parse_value("number", condition.get("filter")), parse_value("number", condition.get("filterTo"))
+        else:
+            low, high = parse_value("date", condition.get("dateFrom")), parse_value("date", condition.get("dateTo"))
+            if kind == "datetime":
+                # Filters compare whole days
+                column = func.date(column)
+        conditions = {
+            "equals": lambda: column == low,
+            "notEqual": lambda: column != low,
+            "lessThan": lambda: column < low,
+            "lessThanOrEqual": lambda: column <= low,
+            "greaterThan": lambda: column > low,
+            "greaterThanOrEqual": lambda: column >= low,
+            "inRange": lambda: column.between(low, high),
+        }
+        if op not in conditions or low is None or (op == "inRange" and high is None):
+            raise GridQueryError(f"Unsupported {filter_type} filter: {op}")
+        return conditions[op]()
+    raise GridQueryError(f"Unsupported filterType: {filter_type}")
+
+
+def _filter_conditions(mapped: Dict[str, Any], kinds: Dict[str, str], request) -> List:
+    conditions = []
+    for name, spec in (request.filterModel or {}).items():
+        operator, specs = iter_conditions(spec)
+        parts = [_sql_condition(mapped[name], kinds[name], condition) for condition in specs]
+        conditions.append(or_(*parts) if operator == "OR" else and_(*parts))
+    for column, key in zip(request.rowGroupCols, request.groupKeys):
+        # Same value the group level grouped on, so a group expands to childCount rows
+        value = parse_group_key(kinds[column.id], key)
+        conditions.append(mapped[column.id].is_(None) if value is None else mapped[column.id] == value)
+    return conditions
+
+
+def _order(expression, direction: str):
+    # NULLS LAST either way, matching the in-memory grid
+    return (expression.desc() if direction == "desc" else expression.asc()).nulls_last()
+
+
+def get_grid_rows(db: Session, entity: str, request) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Return ``(rows, row_count)`` for one block of an AG Grid server-side request.
+
+    Filters, sorting, grouping and aggregation are all done in SQL; only the requested
+    block (``startRow`` to ``endRow``) is read. Leaf rows are ordered by the sort model,
+    then by id so blocks never overlap.
+    """
+    kinds = grid_columns(entity, request)
+    model, mapped = _GRID_SOURCES[entity]
+    conditions = live_conditions(model) + _filter_conditions(mapped, kinds, request)
+    block = request.endRow - request.startRow
+    level = len(request.groupKeys)
+
+    if level == len(request.rowGroupCols):
+        query = (
+            select(*(column.label(name) for name, column in mapped.items()))
+            .where(*conditions)
+            .order_by(*(_order(mapped[s.colId], s.sort.value) for s in request.sortModel), model.id)
+        )
+        total = db.execute(select(func.count()).select_from(model).where(*conditions)).scalar()
+    else:
+        group_name = request.rowGroupCols[level].id
+        group_column = mapped[group_name]
+        columns = {group_name: group_column, "childCount": func.count()}
+        for value_column in request.valueCols:
+            columns[value_column.id] = _AGGREGATES[value_column.aggFunc or "sum"](mapped[value_column.id])
+        sorts = [
+            _order(columns[s.colId], s.sort.value) for s in request.sortModel if s.colId in columns
+        ]
+        if not any(s.colId == group_name for s in request.sortModel):
+            # Then by group value, so tied groups come in the same order on every backend
+            sorts.append(_order(group_column, "asc"))
+        query = (
+            select(*(column.label(name) for name, column in columns.items()))
+            .where(*conditions)
+            .group_by(group_column)
+            .order_by(*sorts)
+        )
+        groups = select(group_column).where(*conditions).group_by(group_column).subquery()
+        total = db.execute(select(func.count()).select_from(groups)).scalar()
+
+    rows = [
+        {name: plain(value) for name, value in row.items()}
+        for row in db.execute(query.offset(request.startRow).limit(block)).mappings()
+    ]
+    if level < len(request.rowGroupCols):
+        # Aggregates come back as Decimal from numeric columns; report plain numbers
+        for row in rows:
+            for value_column in request.valueCols:
+                if row[value_column.id] is not None and value_column.aggFunc != "count":
+                    row[value_column.id] = float(row[value_column.id])
+    return rows, total
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.database.models import Campaign, CampaignKpi, Task, Well
+from src.services.campaign_kpis import build_campaign_kpis
+from src.services.purge_service import live_conditions
+from typing import Dict, List, Optional
+
+
+def _kpi_values(campaign: Campaign, wells, task_counts) -> dict:
+    return build_campaign_kpis(
+        campaign.id, campaign.name, campaign.start_date, campaign.target_depth,
+        campaign.current_depth, campaign.day_rate, wells, task_counts
+    )
+
+
+def refresh_campaign_kpis(db: Session, *campaign_ids: Optional[str]):
+    """
+    Recompute the KPI rows of the given campaigns from their wells and tasks.
+
+    Called by the campaign, well and task writes before they commit, so a row never
+    lags the data it summarizes; the cost is two indexed queries per campaign.
+    """
+    for campaign_id in {str(campaign_id) for campaign_id in campaign_ids if campaign_id}:
+        campaign = db.get(Campaign, campaign_id)
+        if campaign is None:
+            db.query(CampaignKpi).filter(CampaignKpi.campaign_id == campaign_id).delete(synchronize_session=False)
+            continue
+        wells = (
+            db.query(Well.status, Well.start_date, Well.end_date)
+            .filter(Well.campaign_id == campaign_id)
+            .all()
+        )
+        task_counts = dict(
+            db.query(Task.status, func.count())
+            .filter(Task.campaign_id == campaign_id, *live_conditions(Task))
+            .group_by(Task.status)
+            .all()
+        )
+        db.merge(CampaignKpi(**_kpi_values(campaign, wells, task_counts)))
+
+
+def rebuild_campaign_kpis(db: Session):
+    """
+    Recompute every campaign's KPI row in three queries (after bulk loads).
+    """
+    wells = defaultdict(list)
+    for campaign_id, *well in db.query(Well.campaign_id, Well.status, Well.start_date, Well.end_date):
+        wells[str(campaign_id)].append(well)
+    task_counts = defaultdict(dict)
+    for campaign_id, status, count in (
+        db.query(Task.campaign_id, Task.status, func.count()).filter(*live_conditions(Task)).group_by(Task.campaign_id, Task.status)
+    ):
+        task_counts[str(campaign_id)][status] = count
+    db.query(CampaignKpi).delete(synchronize_session=False)
+    db.add_all(
+        CampaignKpi(**_kpi_values(campaign, wells[str(campaign.id)], task_counts[str(campaign.id)]))
+        for campaign in db.query(Campaign)
+    )
+    db.commit()
+
+
+def ensure_campaign_kpis(db: Session):
+    """
+    Backfill the KPI table when it is out of step with the campaigns (e.g. a database
+    created before the table existed).
+    """
+    campaigns = db.query(func.count(Campaign.id)).scalar()
+    if campaigns != db.query(func.count(CampaignKpi.campaign_id)).scalar():
+        rebuild_campaign_kpis(db)
+
+
+def get_campaign_kpi(db: Session, campaign_id: str):
+    return db.query(CampaignKpi).filter(CampaignKpi.campaign_id == campaign_id).first()
+
+
+def get_campaign_kpis(db: Session, skip: int = 0, limit: int = 100):
+    return db.query(CampaignKpi).offset(skip).limit(limit).all()
+
+
+def get_progress_by_campaign(db: Session, campaign_ids: List[str]) -> Dict[str, float]:
+    """
+    ``progress_pct`` of the given campaigns from their KPI rows, in one query.
+    """
+    if not campaign_ids:
+        return {}
+    rows = db.query(CampaignKpi.campaign_id, CampaignKpi.progress_pct).filter(CampaignKpi.campaign_id.in_(campaign_ids))
+    return {str(campaign_id): float(progress_pct) for campaign_id, progress_pct in rows}
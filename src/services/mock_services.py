@@ -1,30 +1,276 @@
+from collections import Counter
 from datetime import datetime, date
+from itertools import islice
+from operator import attrgetter
 from typing import List, Optional
 from src.models.user import UserOut, UserCreate, UserUpdate, UserRole
-from src.models.campaign import CampaignOut, CampaignCreate, CampaignUpdate
-from src.models.task import TaskOut, TaskCreate, TaskUpdate, TaskComment
+from src.models.campaign import CampaignOut, CampaignCreate, CampaignUpdate, CampaignKpi
+from src.models.task import TaskCreate, TaskUpdate, TaskSearchHit, TaskSearchResult
 from src.models.rig import RigOut, RigCreate, RigUpdate
-from src.models.well import WellOut, WellCreate, WellUpdate
+from src.models.well import WellCreate, WellUpdate
+from src.models.scenario import ScenarioOut, ScenarioCreate, ScenarioClone, ScenarioRecord
+from src.models.attachment import AttachmentCreate, AttachmentOut, AttachmentOwnerType
+from src.models.aggregate import AggregateRequest
+from src.models.grid import GridResponse
+from src.services.campaign_kpis import CampaignKpiStore, build_campaign_kpis, campaign_progress, days_elapsed
+from src.services.aggregation import AGGREGATE_FIELDS, aggregate_measures, aggregate_shape, build_aggregate_result
+from src.services.entity_cache import aggregate_cache, grid_result_cache, rig_location_cache, task_model_cache
+from src.services.grid_query import grid_columns, leaf_row, plain, query_rows, query_shape
+from src.services.records import CommentRecord, RecordCodec, TaskRecord, WellRecord
+from src.services.blob_store import blob_store
+from src.services.scenario_diff import build_scenario_diff
+from src.services.seed import generate_portfolio, parse_scale, paused_gc
+from src.services.store_log import StoreLog
+from src.services.task_comments import DEFAULT_COMMENT_PAGE_SIZE, CommentStore, ThreadCodec, comment_page
+from src.services.task_search import TaskSearchIndex
+from backend.calc.aggregate import ColumnTable
+import os
 import uuid
 
-# Mock data storage
-mock_users = []
-mock_campaigns = []
-mock_tasks = []
-mock_rigs = []
-mock_wells = []
+# Mock data storage, keyed by id (insertion ordered, so paging is stable); tasks and
+# wells are compact records (see src.services.records), the rest API models
+mock_users = {}
+mock_campaigns = {}
+mock_tasks = {}
+mock_rigs = {}
+mock_wells = {}
+mock_scenarios = {}
+mock_attachments = {}
+# Copy-on-write overlays: scenario_id -> {(kind, key): data}, where None hides a parent row
+mock_scenario_records = {}
+
+# Secondary indexes: key -> {id: None}, an insertion-ordered set of ids
+_users_by_email = {}
+_tasks_by_campaign = {}
+_rigs_by_campaign = {}
+_wells_by_campaign = {}
+_attachments_by_owner = {}
+_attachments_by_sha256 = {}
+
+# Comments per task in time order
+comment_store = CommentStore()
+
+# Full-text index over mock_tasks, built in the background after the data is loaded
+task_index = TaskSearchIndex(
+    lambda: mock_tasks.values(),
+    lambda task_id: (comment.message for comment in comment_store.thread(task_id)),
+    lambda task_id: mock_tasks.get(task_id),
+)
+
+
+def _compute_campaign_kpis(campaign_id: str):
+    campaign = mock_campaigns.get(campaign_id)
+    if campaign is None:
+        return None
+    wells = [
+        (well.status, well.start_date, well.end_date)
+        for well in map(mock_wells.__getitem__, _wells_by_campaign.get(campaign_id, ()))
+    ]
+    task_counts = Counter(mock_tasks[task_id].status for task_id in _tasks_by_campaign.get(campaign_id, ()))
+    return build_campaign_kpis(
+        campaign.id, campaign.name, campaign.spud_date, campaign.target_depth,
+        campaign.current_depth, campaign.day_rate, wells, task_counts
+    )
+
+
+# Materialized campaign KPIs; writes mark their campaign dirty, reads refresh it
+campaign_kpis = CampaignKpiStore(_compute_campaign_kpis, lambda: list(mock_campaigns))
+
+_STORES = (
+    mock_users, mock_campaigns, mock_tasks, mock_rigs, mock_wells, mock_scenarios,
+    mock_scenario_records, mock_attachments, _users_by_email, _tasks_by_campaign, _rigs_by_campaign,
+    _wells_by_campaign, _attachments_by_owner, _attachments_by_sha256,
+)
+
+# Stores written to the write log, by name, along with comment_store's threads as
+# "task_comments"; the secondary indexes are rebuilt from them
+_PERSISTED_STORES = {
+    "users": mock_users,
+    "campaigns": mock_campaigns,
+    "tasks": mock_tasks,
+    "rigs": mock_rigs,
+    "wells": mock_wells,
+    "scenarios": mock_scenarios,
+    "scenario_records": mock_scenario_records,
+    "attachments": mock_attachments,
+}
+
+
+def _capture_stores():
+    # Shallow copies are taken in C under the GIL, so writes cannot interleave with them
+    stores = {name: store.copy() for name, store in _PERSISTED_STORES.items()}
+    stores["scenario_records"] = {key: dict(records) for key, records in mock_scenario_records.items()}
+    stores["task_comments"] = comment_store.capture()
+    return stores
+
+
+# STORE_DATA_DIR makes the store durable: writes are logged there and restarts recover
+# from the latest snapshot plus the log instead of reseeding
+store_log = (
+    StoreLog(
+        os.environ["STORE_DATA_DIR"],
+        _capture_stores,
+        snapshot_every=int(os.getenv("STORE_SNAPSHOT_EVERY", "10000")),
+        fsync=os.getenv("STORE_LOG_FSYNC", "0") == "1",
+        # The large stores are recovered lazily, a row at a time on first read
+        codecs={
+            "tasks": RecordCodec(TaskRecord, ["campaign_id"]),
+            "wells": RecordCodec(WellRecord, ["campaign_id"]),
+            "task_comments": ThreadCodec(),
+        },
+    )
+    if os.getenv("STORE_DATA_DIR")
+    else None
+)
+
+
+def _persist(name: str, key: str):
+    """
+    Log the current value of one row (a delete if it is gone) after a write.
+    """
+    if store_log is not None:
+        store = comment_store if name == "task_comments" else _PERSISTED_STORES[name]
+        store_log.append(name, key, store.get(key))
+
+
+def _persist_scenario(scenario_id: str):
+    # Record writes can also copy rows down to the scenario's clones
+    _persist("scenarios", scenario_id)
+    _persist("scenario_records", scenario_id)
+    for child in mock_scenarios.values():
+        if child.parent_id == scenario_id:
+            _persist("scenario_records", child.id)
+
+
+def _index_add(index, key, item_id):
+    index.setdefault(key, {})[item_id] = None
+
+
+def _index_remove(index, key, item_id):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(item_id, None)
+        if not bucket:
+            del index[key]
+
+
+def _page(items, skip: int, limit: int):
+    return list(islice(items, skip, skip + limit))
+
+
+def _filtered(store, index, campaign_id: Optional[str]):
+    if campaign_id:
+        return (store[item_id] for item_id in index.get(campaign_id, ()))
+    return iter(store.values())
+
+
+def load_portfolio(portfolio):
+    """
+    Replace the store contents with a generated portfolio (see src.services.seed).
+    """
+    for store in _STORES:
+        store.clear()
+    task_index.reset()
+    campaign_kpis.reset()
+    task_model_cache.invalidate()
+    rig_location_cache.invalidate()
+    _queries_changed()
+    today = date.today()
+    comments = []
+    for row in portfolio["users"]:
+        mock_users[row["id"]] = UserOut(
+            id=row["id"], email=row["email"], name=row["name"], timezone=row["timezone"],
+            active=row["active"], roles=list(row["roles"]), created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+        _users_by_email[row["email"]] = row["id"]
+    for row in portfolio["campaigns"]:
+        mock_campaigns[row["id"]] = CampaignOut(
+            id=row["id"], name=row["name"], rig=row["rig"], spud_date=row["spud_date"],
+            target_depth=row["target_depth"], current_depth=row["current_depth"], day_rate=row["day_rate"],
+            progress_pct=round(row["current_depth"] / row["target_depth"] * 100, 2),
+            days_elapsed=(today - row["spud_date"]).days, last_updated=row["updated_at"]
+        )
+    for row in portfolio["rigs"]:
+        mock_rigs[row["id"]] = RigOut(**row)
+        _index_add(_rigs_by_campaign, row["campaign_id"], row["id"])
+    for row in portfolio["wells"]:
+        mock_wells[row["id"]] = WellRecord(**row)
+        _index_add(_wells_by_campaign, row["campaign_id"], row["id"])
+    for row in portfolio["tasks"]:
+        mock_tasks[row["id"]] = TaskRecord(
+            id=row["id"], title=row["title"], description=row["description"],
+            status=row["status"], priority=row["priority"], due_date=row["due_date"],
+            assigned_to=row["assignee_id"], labels=row["labels"], campaign_id=row["campaign_id"],
+            well_id=row["well_id"], version=row["version"], created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+        _index_add(_tasks_by_campaign, row["campaign_id"], row["id"])
+        for c in row["comments"]:
+            comments.append(CommentRecord.create(c["id"], row["id"], c["author_id"], c["body"], c["created_at"]))
+    comment_store.reset(comments)
+
+
+def _restore_stores(stores):
+    """
+    Replace the store contents with recovered rows and rebuild the secondary indexes.
+    """
+    for store in _STORES:
+        store.clear()
+    task_index.reset()
+    campaign_kpis.reset()
+    task_model_cache.invalidate()
+    rig_location_cache.invalidate()
+    _queries_changed()
+    for name, store in _PERSISTED_STORES.items():
+        store.update(stores.get(name, {}))
+    for user in mock_users.values():
+        _users_by_email[user.email] = user.id
+    for index, store in ((_tasks_by_campaign, mock_tasks), (_rigs_by_campaign, mock_rigs), (_wells_by_campaign, mock_wells)):
+        # Inlined _index_add: this runs once per row on every restart
+        for item_id, campaign_id in zip(store, map(attrgetter("campaign_id"), store.values())):
+            index.setdefault(campaign_id, {})[item_id] = None
+    comment_store.restore(stores.get("task_comments", {}))
+    for attachment in mock_attachments.values():
+        _index_add(_attachments_by_owner, (attachment.owner_type, attachment.owner_id), attachment.id)
+        _index_add(_attachments_by_sha256, attachment.sha256, attachment.id)
 
 
 def initialize_mock_data():
     """Initialize mock data for testing"""
-    global mock_users, mock_campaigns, mock_tasks, mock_rigs, mock_wells
-    
-    # Clear existing data
-    mock_users = []
-    mock_campaigns = []
-    mock_tasks = []
-    mock_rigs = []
-    mock_wells = []
+    if store_log is not None:
+        stores = store_log.recover()
+        if stores is not None:
+            with paused_gc():
+                _restore_stores(stores)
+            store_log.open()
+            task_index.start_build()
+            return
+
+    # SEED_SCALE (e.g. "large" or "tasks=50000") loads a generated portfolio instead
+    seed_scale = os.getenv("SEED_SCALE")
+    if seed_scale:
+        with paused_gc():
+            load_portfolio(generate_portfolio(parse_scale(seed_scale), int(os.getenv("SEED", "0"))))
+    else:
+        _load_demo_data()
+    if store_log is not None:
+        # The first snapshot is the base the log replays onto, so it is written up front
+        store_log.open()
+        store_log.snapshot()
+    task_index.start_build()
+
+
+def _load_demo_data():
+    # Clear existing data in place so importers keep valid references
+    for store in _STORES:
+        store.clear()
+    comment_store.reset()
+    task_index.reset()
+    campaign_kpis.reset()
+    task_model_cache.invalidate()
+    rig_location_cache.invalidate()
+    _queries_changed()
     
     # Create mock users
     user1 = UserOut(
@@ -37,11 +283,12 @@ def initialize_mock_data():
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_users.append(user1)
+    mock_users[user1.id] = user1
+    _users_by_email[user1.email] = user1.id
     
     # Create mock campaigns
     campaign1 = CampaignOut(
-        id=1,
+        id=str(uuid.uuid4()),
         name="Alpha-1",
         rig="Rig 7",
         spud_date=date.today(),
@@ -51,10 +298,10 @@ def initialize_mock_data():
         days_elapsed=10,
         last_updated=datetime.utcnow()
     )
-    mock_campaigns.append(campaign1)
+    mock_campaigns[campaign1.id] = campaign1
     
     # Create mock tasks
-    task1 = TaskOut(
+    task1 = TaskRecord(
         id=str(uuid.uuid4()),
         title="BOP Test",
         description="Perform BOP pressure test",
@@ -62,18 +309,18 @@ def initialize_mock_data():
         priority="normal",
         due_date=date.today(),
         assigned_to="eng1",
-        campaign_id=1,
+        campaign_id=campaign1.id,
         well_id=None,
-        comments=[],
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_tasks.append(task1)
+    mock_tasks[task1.id] = task1
+    _index_add(_tasks_by_campaign, task1.campaign_id, task1.id)
     
     # Create mock rigs
     rig1 = RigOut(
         id=str(uuid.uuid4()),
-        campaign_id="1",
+        campaign_id=campaign1.id,
         name="Rig 7",
         type="jackup",
         lat=29.9383,
@@ -83,12 +330,13 @@ def initialize_mock_data():
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_rigs.append(rig1)
+    mock_rigs[rig1.id] = rig1
+    _index_add(_rigs_by_campaign, rig1.campaign_id, rig1.id)
     
     # Create mock wells
-    well1 = WellOut(
+    well1 = WellRecord(
         id=str(uuid.uuid4()),
-        campaign_id="1",
+        campaign_id=campaign1.id,
         name="Well Alpha-1",
         status="Drilling",
         start_date=date.today(),
@@ -98,26 +346,22 @@ def initialize_mock_data():
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_wells.append(well1)
+    mock_wells[well1.id] = well1
+    _index_add(_wells_by_campaign, well1.campaign_id, well1.id)
 
 
 # User service mock implementations
 def get_user(db, user_id: str):
-    for user in mock_users:
-        if user.id == user_id:
-            return user
-    return None
+    return mock_users.get(user_id)
 
 
 def get_user_by_email(db, email: str):
-    for user in mock_users:
-        if user.email == email:
-            return user
-    return None
+    user_id = _users_by_email.get(email)
+    return mock_users.get(user_id) if user_id else None
 
 
 def get_users(db, skip: int = 0, limit: int = 100):
-    return mock_users[skip:skip+limit]
+    return _page(mock_users.values(), skip, limit)
 
 
 def create_user(db, user: UserCreate):
@@ -131,7 +375,9 @@ def create_user(db, user: UserCreate):
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_users.append(new_user)
+    mock_users[new_user.id] = new_user
+    _users_by_email[new_user.email] = new_user.id
+    _persist("users", new_user.id)
     return new_user
 
 
@@ -141,10 +387,14 @@ def update_user(db, user_id: str, user_update: UserUpdate):
         return None
     
     update_data = user_update.dict(exclude_unset=True)
+    if "email" in update_data:
+        _users_by_email.pop(user.email, None)
+        _users_by_email[update_data["email"]] = user.id
     for key, value in update_data.items():
         setattr(user, key, value)
     
     user.updated_at = datetime.utcnow()
+    _persist("users", user_id)
     return user
 
 
@@ -153,7 +403,9 @@ def delete_user(db, user_id: str):
     if not user:
         return None
     
-    mock_users.remove(user)
+    del mock_users[user_id]
+    _users_by_email.pop(user.email, None)
+    _persist("users", user_id)
     return user
 
 
@@ -178,6 +430,7 @@ def add_user_role(db, user_id: str, role: UserRole):
     if user and role not in user.roles:
         user.roles.append(role)
         user.updated_at = datetime.utcnow()
+        _persist("users", user_id)
     return user
 
 
@@ -186,41 +439,54 @@ def remove_user_role(db, user_id: str, role: UserRole):
     if user and role in user.roles:
         user.roles.remove(role)
         user.updated_at = datetime.utcnow()
+        _persist("users", user_id)
         return True
     return False
 
 
 # Campaign service mock implementations
-def get_campaign(db, campaign_id: int):
-    for campaign in mock_campaigns:
-        if campaign.id == campaign_id:
-            return campaign
-    return None
+def _campaign_out(campaign: Optional[CampaignOut]) -> Optional[CampaignOut]:
+    # Progress from the materialized KPI row, as the SQL backend reads it; days elapsed
+    # depend on today's date, so they are never stored
+    if campaign is None:
+        return None
+    row = campaign_kpis.get(campaign.id)
+    return campaign.copy(update={
+        "progress_pct": row["progress_pct"] if row else campaign_progress(campaign.target_depth, campaign.current_depth),
+        "days_elapsed": days_elapsed(campaign.spud_date),
+    })
+
+
+def get_campaign(db, campaign_id: str):
+    return _campaign_out(mock_campaigns.get(campaign_id))
 
 
 def get_campaigns(db, skip: int = 0, limit: int = 100):
-    return mock_campaigns[skip:skip+limit]
+    return [_campaign_out(campaign) for campaign in _page(mock_campaigns.values(), skip, limit)]
 
 
 def create_campaign(db, campaign: CampaignCreate):
-    new_id = max([c.id for c in mock_campaigns], default=0) + 1
     new_campaign = CampaignOut(
-        id=new_id,
+        id=str(uuid.uuid4()),
         name=campaign.name,
         rig=campaign.rig,
         spud_date=campaign.spud_date,
         target_depth=campaign.target_depth,
         current_depth=campaign.current_depth,
-        progress_pct=0.0,
-        days_elapsed=0,
+        day_rate=campaign.day_rate,
+        progress_pct=campaign_progress(campaign.target_depth, campaign.current_depth),
+        days_elapsed=days_elapsed(campaign.spud_date),
         last_updated=datetime.utcnow()
     )
-    mock_campaigns.append(new_campaign)
-    return new_campaign
+    mock_campaigns[new_campaign.id] = new_campaign
+    campaign_kpis.mark_dirty(new_campaign.id)
+    _queries_changed()
+    _persist("campaigns", new_campaign.id)
+    return _campaign_out(new_campaign)
 
 
-def update_campaign(db, campaign_id: int, campaign_update: CampaignUpdate):
-    campaign = get_campaign(db, campaign_id)
+def update_campaign(db, campaign_id: str, campaign_update: CampaignUpdate):
+    campaign = mock_campaigns.get(campaign_id)
     if not campaign:
         return None
     
@@ -228,16 +494,31 @@ def update_campaign(db, campaign_id: int, campaign_update: CampaignUpdate):
     for key, value in update_data.items():
         setattr(campaign, key, value)
     
+    campaign.progress_pct = campaign_progress(campaign.target_depth, campaign.current_depth)
     campaign.last_updated = datetime.utcnow()
-    return campaign
+    campaign_kpis.mark_dirty(campaign_id)
+    _queries_changed()
+    _persist("campaigns", campaign_id)
+    return _campaign_out(campaign)
 
 
-def delete_campaign(db, campaign_id: int):
-    campaign = get_campaign(db, campaign_id)
+def delete_campaign(db, campaign_id: str):
+    campaign = mock_campaigns.get(campaign_id)
     if not campaign:
         return None
     
-    mock_campaigns.remove(campaign)
+    # Same cascade as the SQL backend; here it is immediate, nothing is left to purge
+    for task_id in list(_tasks_by_campaign.get(campaign_id, ())):
+        delete_task(db, task_id)
+    for rig_id in list(_rigs_by_campaign.get(campaign_id, ())):
+        delete_rig(db, rig_id)
+    for well_id in list(_wells_by_campaign.get(campaign_id, ())):
+        delete_well(db, well_id)
+    del mock_campaigns[campaign_id]
+    _delete_owned_attachments(AttachmentOwnerType.campaign, campaign_id)
+    campaign_kpis.mark_dirty(campaign_id)
+    _queries_changed()
+    _persist("campaigns", campaign_id)
     return campaign
 
 
@@ -262,25 +543,39 @@ def get_campaign_status(campaign: CampaignOut) -> str:
         return "Not Started"
 
 
+def _kpi_out(row) -> CampaignKpi:
+    return CampaignKpi(**row, days_elapsed=days_elapsed(row["spud_date"]))
+
+
+def get_campaign_kpi(db, campaign_id: str):
+    row = campaign_kpis.get(campaign_id)
+    return _kpi_out(row) if row else None
+
+
+def get_campaign_kpis(db, skip: int = 0, limit: int = 100):
+    return [_kpi_out(row) for row in campaign_kpis.rows(skip, limit)]
+
+
 # Task service mock implementations
+def _task_out(task: TaskRecord):
+    # Every task write, comments included, bumps the version, so a cached model is never stale
+    return task_model_cache.get((task.id, task.version), lambda key: task.to_out(*comment_store.summary(task.id)))
+
+
 def get_task(db, task_id: str):
-    for task in mock_tasks:
-        if task.id == task_id:
-            return task
-    return None
+    task = mock_tasks.get(task_id)
+    return _task_out(task) if task else None
 
 
-def get_tasks(db, skip: int = 0, limit: int = 100, campaign_id: Optional[int] = None, status: Optional[str] = None):
-    result = mock_tasks
-    if campaign_id:
-        result = [t for t in result if t.campaign_id == campaign_id]
+def get_tasks(db, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None, status: Optional[str] = None):
+    result = _filtered(mock_tasks, _tasks_by_campaign, campaign_id)
     if status:
-        result = [t for t in result if t.status == status]
-    return result[skip:skip+limit]
+        result = (t for t in result if t.status == status)
+    return [_task_out(task) for task in _page(result, skip, limit)]
 
 
 def create_task(db, task: TaskCreate):
-    new_task = TaskOut(
+    new_task = TaskRecord(
         id=str(uuid.uuid4()),
         title=task.title,
         description=task.description,
@@ -288,73 +583,98 @@ def create_task(db, task: TaskCreate):
         priority=task.priority,
         due_date=task.due_date,
         assigned_to=task.assigned_to,
+        labels=task.labels,
         campaign_id=task.campaign_id,
         well_id=task.well_id,
-        comments=[],
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_tasks.append(new_task)
-    return new_task
+    mock_tasks[new_task.id] = new_task
+    _index_add(_tasks_by_campaign, new_task.campaign_id, new_task.id)
+    task_index.index_task(new_task)
+    campaign_kpis.mark_dirty(new_task.campaign_id)
+    _queries_changed()
+    _persist("tasks", new_task.id)
+    return _task_out(new_task)
 
 
 def update_task(db, task_id: str, task_update: TaskUpdate):
-    task = get_task(db, task_id)
+    task = mock_tasks.get(task_id)
     if not task:
         return None
     
     update_data = task_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(task, key, value)
+    task.update(**update_data)
     
+    task.version += 1
     task.updated_at = datetime.utcnow()
-    return task
+    task_index.index_task(task)
+    if "status" in update_data:
+        campaign_kpis.mark_dirty(task.campaign_id)
+    _queries_changed()
+    _persist("tasks", task_id)
+    return _task_out(task)
 
 
 def delete_task(db, task_id: str):
-    task = get_task(db, task_id)
+    task = mock_tasks.get(task_id)
     if not task:
         return None
     
-    mock_tasks.remove(task)
-    return task
+    deleted = _task_out(task)
+    del mock_tasks[task_id]
+    _index_remove(_tasks_by_campaign, task.campaign_id, task_id)
+    if comment_store.remove_task(task_id):
+        _persist("task_comments", task_id)
+    task_index.remove_task(task_id)
+    _delete_owned_attachments(AttachmentOwnerType.task, task_id)
+    campaign_kpis.mark_dirty(task.campaign_id)
+    _queries_changed()
+    _persist("tasks", task_id)
+    return deleted
 
 
 def add_task_comment(db, task_id: str, comment_data):
-    task = get_task(db, task_id)
+    task = mock_tasks.get(task_id)
     if not task:
         return None
     
-    comment = TaskComment(
-        author=comment_data.author,
-        message=comment_data.message,
-        timestamp_utc=datetime.utcnow()
+    comment = CommentRecord.create(
+        str(uuid.uuid4()), task.id, comment_data.author, comment_data.message, datetime.utcnow()
     )
-    task.comments.append(comment)
+    comment_store.add(comment)
+    task.version += 1
     task.updated_at = datetime.utcnow()
-    return task
+    task_index.add_comment(task.id, comment.message)
+    _persist("task_comments", task.id)
+    _persist("tasks", task_id)
+    return _task_out(task)
+
+
+def search_tasks(db, query: Optional[str] = None, skip: int = 0, limit: int = 20, prefix: bool = True, **filters):
+    total, hits, facets = task_index.search(query, filters, skip=skip, limit=limit, prefix=prefix)
+    return TaskSearchResult(
+        total=total,
+        items=[TaskSearchHit(task=_task_out(mock_tasks[task_id]), score=score) for task_id, score in hits],
+        facets=facets
+    )
 
 
-def get_task_comments(db, task_id: str):
-    task = get_task(db, task_id)
-    if not task:
-        return []
-    return task.comments
+def get_task_comments(db, task_id: str, after=None, limit: int = DEFAULT_COMMENT_PAGE_SIZE):
+    if task_id not in mock_tasks:
+        return None
+    comments, has_more = comment_store.page(task_id, after, limit)
+    total, _ = comment_store.summary(task_id)
+    return comment_page([comment.to_out() for comment in comments], total, has_more)
 
 
 # Rig service mock implementations
 def get_rig(db, rig_id: str):
-    for rig in mock_rigs:
-        if rig.id == rig_id:
-            return rig
-    return None
+    return mock_rigs.get(rig_id)
 
 
 def get_rigs(db, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
-    result = mock_rigs
-    if campaign_id:
-        result = [r for r in result if r.campaign_id == campaign_id]
-    return result[skip:skip+limit]
+    return _page(_filtered(mock_rigs, _rigs_by_campaign, campaign_id), skip, limit)
 
 
 def create_rig(db, rig: RigCreate):
@@ -370,7 +690,11 @@ def create_rig(db, rig: RigCreate):
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_rigs.append(new_rig)
+    mock_rigs[new_rig.id] = new_rig
+    _index_add(_rigs_by_campaign, new_rig.campaign_id, new_rig.id)
+    rig_location_cache.invalidate()
+    _queries_changed()
+    _persist("rigs", new_rig.id)
     return new_rig
 
 
@@ -380,10 +704,16 @@ def update_rig(db, rig_id: str, rig_update: RigUpdate):
         return None
     
     update_data = rig_update.dict(exclude_unset=True)
+    if "campaign_id" in update_data:
+        _index_remove(_rigs_by_campaign, rig.campaign_id, rig_id)
+        _index_add(_rigs_by_campaign, update_data["campaign_id"], rig_id)
     for key, value in update_data.items():
         setattr(rig, key, value)
     
     rig.updated_at = datetime.utcnow()
+    rig_location_cache.invalidate()
+    _queries_changed()
+    _persist("rigs", rig_id)
     return rig
 
 
@@ -392,27 +722,26 @@ def delete_rig(db, rig_id: str):
     if not rig:
         return None
     
-    mock_rigs.remove(rig)
+    del mock_rigs[rig_id]
+    _index_remove(_rigs_by_campaign, rig.campaign_id, rig_id)
+    rig_location_cache.invalidate()
+    _queries_changed()
+    _persist("rigs", rig_id)
     return rig
 
 
 # Well service mock implementations
 def get_well(db, well_id: str):
-    for well in mock_wells:
-        if well.id == well_id:
-            return well
-    return None
+    well = mock_wells.get(well_id)
+    return well.to_out() if well else None
 
 
 def get_wells(db, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None):
-    result = mock_wells
-    if campaign_id:
-        result = [w for w in result if w.campaign_id == campaign_id]
-    return result[skip:skip+limit]
+    return [well.to_out() for well in _page(_filtered(mock_wells, _wells_by_campaign, campaign_id), skip, limit)]
 
 
 def create_well(db, well: WellCreate):
-    new_well = WellOut(
+    new_well = WellRecord(
         id=str(uuid.uuid4()),
         campaign_id=well.campaign_id,
         name=well.name,
@@ -424,31 +753,298 @@ def create_well(db, well: WellCreate):
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    mock_wells.append(new_well)
-    return new_well
+    mock_wells[new_well.id] = new_well
+    _index_add(_wells_by_campaign, new_well.campaign_id, new_well.id)
+    campaign_kpis.mark_dirty(new_well.campaign_id)
+    _queries_changed()
+    _persist("wells", new_well.id)
+    return new_well.to_out()
 
 
 def update_well(db, well_id: str, well_update: WellUpdate):
-    well = get_well(db, well_id)
+    well = mock_wells.get(well_id)
     if not well:
         return None
     
     update_data = well_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(well, key, value)
+    campaign_kpis.mark_dirty(well.campaign_id, update_data.get("campaign_id"))
+    _queries_changed()
+    if "campaign_id" in update_data:
+        _index_remove(_wells_by_campaign, well.campaign_id, well_id)
+        _index_add(_wells_by_campaign, update_data["campaign_id"], well_id)
+    well.update(**update_data)
     
     well.updated_at = datetime.utcnow()
-    return well
+    _persist("wells", well_id)
+    return well.to_out()
 
 
 def delete_well(db, well_id: str):
-    well = get_well(db, well_id)
+    well = mock_wells.get(well_id)
     if not well:
         return None
     
-    mock_wells.remove(well)
-    return well
+    del mock_wells[well_id]
+    _index_remove(_wells_by_campaign, well.campaign_id, well_id)
+    _delete_owned_attachments(AttachmentOwnerType.well, well_id)
+    campaign_kpis.mark_dirty(well.campaign_id)
+    _queries_changed()
+    _persist("wells", well_id)
+    return well.to_out()
+
+
+# Scenario service mock implementations
+def get_scenario(db, scenario_id: str):
+    return mock_scenarios.get(scenario_id)
+
+
+def get_scenarios(db, skip: int = 0, limit: int = 100):
+    return _page(mock_scenarios.values(), skip, limit)
+
+
+def create_scenario(db, scenario: ScenarioCreate, parent_id: Optional[str] = None):
+    new_scenario = ScenarioOut(
+        id=str(uuid.uuid4()),
+        name=scenario.name,
+        status=scenario.status,
+        parent_id=parent_id,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    mock_scenarios[new_scenario.id] = new_scenario
+    mock_scenario_records[new_scenario.id] = {}
+    _persist_scenario(new_scenario.id)
+    return new_scenario
+
+
+def clone_scenario(db, scenario_id: str, clone: ScenarioClone):
+    """Clone in O(1): the clone stores no rows and reads through to its parent."""
+    if not get_scenario(db, scenario_id):
+        return None
+    return create_scenario(db, ScenarioCreate(name=clone.name), parent_id=scenario_id)
+
+
+def _resolve_scenario_record(scenario_id: str, kind: str, key: str):
+    """Walk the overlay chain; returns (data, owning scenario id) or (None, None)."""
+    scenario = get_scenario(None, scenario_id)
+    while scenario:
+        records = mock_scenario_records[scenario.id]
+        if (kind, key) in records:
+            data = records[(kind, key)]
+            return (data, scenario.id) if data is not None else (None, None)
+        scenario = get_scenario(None, scenario.parent_id) if scenario.parent_id else None
+    return None, None
+
+
+def get_scenario_record(db, scenario_id: str, kind: str, key: str):
+    data, source_id = _resolve_scenario_record(scenario_id, kind, key)
+    if data is None:
+        return None
+    return ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=source_id)
+
+
+def get_scenario_records(db, scenario_id: str, kind: str):
+    """All visible rows of ``kind``; overrides and tombstones shadow parent rows."""
+    chain = []
+    scenario = get_scenario(db, scenario_id)
+    while scenario:
+        chain.append(scenario.id)
+        scenario = get_scenario(db, scenario.parent_id) if scenario.parent_id else None
+    visible = {}
+    for source_id in reversed(chain):
+        for (record_kind, key), data in mock_scenario_records[source_id].items():
+            if record_kind == kind:
+                visible[key] = (data, source_id)
+    return [
+        ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=source_id)
+        for key, (data, source_id) in visible.items()
+        if data is not None
+    ]
+
+
+def _preserve_for_clones(scenario_id: str, kind: str, key: str):
+    # Copy the current value down to clones that still read through, so they keep
+    # seeing the row as it was when they were cloned.
+    current, _ = _resolve_scenario_record(scenario_id, kind, key)
+    for child in mock_scenarios.values():
+        if child.parent_id == scenario_id:
+            mock_scenario_records[child.id].setdefault((kind, key), current)
+
+
+def _touch_scenario(scenario_id: str):
+    scenario = get_scenario(None, scenario_id)
+    scenario.version += 1
+    scenario.updated_at = datetime.utcnow()
+
+
+def put_scenario_record(db, scenario_id: str, kind: str, key: str, data: dict):
+    if not get_scenario(db, scenario_id):
+        return None
+    _preserve_for_clones(scenario_id, kind, key)
+    mock_scenario_records[scenario_id][(kind, key)] = data
+    _touch_scenario(scenario_id)
+    _persist_scenario(scenario_id)
+    return ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=scenario_id)
+
+
+def delete_scenario_record(db, scenario_id: str, kind: str, key: str):
+    record = get_scenario_record(db, scenario_id, kind, key)
+    if not record:
+        return None
+    _preserve_for_clones(scenario_id, kind, key)
+    scenario = get_scenario(db, scenario_id)
+    if scenario.parent_id:
+        mock_scenario_records[scenario_id][(kind, key)] = None
+    else:
+        del mock_scenario_records[scenario_id][(kind, key)]
+    _touch_scenario(scenario_id)
+    _persist_scenario(scenario_id)
+    return record
+
+
+def materialize_scenario(db, scenario_id: str):
+    """Flatten the overlay chain into the scenario's own rows and detach it from its parent."""
+    scenario = get_scenario(db, scenario_id)
+    if not scenario:
+        return None
+    if scenario.parent_id:
+        kinds = {kind for records in mock_scenario_records.values() for kind, _ in records}
+        mock_scenario_records[scenario_id] = {
+            (record.kind.value, record.key): record.data
+            for kind in kinds
+            for record in get_scenario_records(db, scenario_id, kind)
+        }
+        scenario.parent_id = None
+        scenario.updated_at = datetime.utcnow()
+        _persist_scenario(scenario_id)
+    return scenario
+
+
+def diff_scenarios(db, scenario_a: str, scenario_b: str):
+    a, b = get_scenario(db, scenario_a), get_scenario(db, scenario_b)
+    if not a or not b:
+        return None
+    return build_scenario_diff(a, b, lambda scenario_id, kind: get_scenario_records(db, scenario_id, kind))
+
+
+# Attachment service mock implementations
+def get_attachment(db, attachment_id: str):
+    return mock_attachments.get(attachment_id)
+
+
+def get_attachments(db, owner_type: str, owner_id: str, skip: int = 0, limit: int = 100):
+    ids = _attachments_by_owner.get((owner_type, owner_id), ())
+    return _page(map(mock_attachments.__getitem__, ids), skip, limit)
+
+
+def create_attachment(db, attachment: AttachmentCreate):
+    new_attachment = AttachmentOut(
+        id=str(uuid.uuid4()),
+        owner_type=attachment.owner_type,
+        owner_id=attachment.owner_id,
+        filename=attachment.filename,
+        content_type=attachment.content_type,
+        size=attachment.size,
+        sha256=attachment.sha256,
+        uploaded_by=attachment.uploaded_by,
+        created_at=datetime.utcnow()
+    )
+    mock_attachments[new_attachment.id] = new_attachment
+    _index_add(_attachments_by_owner, (new_attachment.owner_type, new_attachment.owner_id), new_attachment.id)
+    _index_add(_attachments_by_sha256, new_attachment.sha256, new_attachment.id)
+    _persist("attachments", new_attachment.id)
+    return new_attachment
+
+
+def delete_attachment(db, attachment_id: str):
+    attachment = mock_attachments.pop(attachment_id, None)
+    if not attachment:
+        return None
+
+    _index_remove(_attachments_by_owner, (attachment.owner_type, attachment.owner_id), attachment_id)
+    _index_remove(_attachments_by_sha256, attachment.sha256, attachment_id)
+    _persist("attachments", attachment_id)
+    return attachment
+
+
+def _delete_owned_attachments(owner_type: AttachmentOwnerType, owner_id: str):
+    # As in the SQL backend, an owner's attachments go with it, and their blobs once unused
+    owned = list(_attachments_by_owner.get((owner_type, owner_id), ()))
+    released = [delete_attachment(None, attachment_id).sha256 for attachment_id in owned]
+    if released:
+        blob_store.release(released, lambda sha256: blob_in_use(None, sha256))
+
+
+def blob_in_use(db, sha256: str) -> bool:
+    return sha256 in _attachments_by_sha256
+
+
+# Server-side grid rows
+def _grid_candidates(entity: str, filter_model):
+    """
+    Narrow a grid query to one campaign's rows through the campaign index when the
+    filter pins campaign_id; the full filter still runs on what is returned.
+    """
+    store, index = (mock_tasks, _tasks_by_campaign) if entity == "tasks" else (mock_wells, _wells_by_campaign)
+    spec = (filter_model or {}).get("campaign_id") or {}
+    if spec.get("filterType") == "set":
+        campaign_ids = spec.get("values") or []
+    elif spec.get("filterType") == "text" and spec.get("type") == "equals":
+        campaign_ids = [spec.get("filter")]
+    else:
+        return list(store.values())
+    return [store[item_id] for campaign_id in campaign_ids for item_id in index.get(campaign_id, ())]
+
+
+def get_grid_rows(db, entity: str, request):
+    columns = grid_columns(entity, request)
+
+    def load(key):
+        return query_rows(_grid_candidates(entity, request.filterModel), columns, request)
+
+    rows, grouped = grid_result_cache.get(query_shape(entity, request), load)
+    block = rows[request.startRow:request.endRow]
+    return GridResponse(
+        rowData=block if grouped else [leaf_row(obj, columns) for obj in block],
+        rowCount=len(rows)
+    )
+
+
+# Grouped aggregation
+_AGGREGATE_STORES = {"tasks": mock_tasks, "wells": mock_wells, "campaigns": mock_campaigns, "rigs": mock_rigs}
+
+
+def _column_table(entity: str) -> ColumnTable:
+    dimensions, numeric = AGGREGATE_FIELDS[entity]
+    records = list(_AGGREGATE_STORES[entity].values())
+    return ColumnTable(
+        {field: [plain(getattr(record, field)) for record in records] for field in dimensions},
+        {field: [getattr(record, field) for record in records] for field in numeric}
+    )
+
+
+def aggregate(db, entity: str, request: AggregateRequest):
+    """
+    Group an entity through the vectorized calc engine. Each entity is loaded into a
+    column table once per write generation, so repeated and differently shaped queries
+    only re-run the numpy group-by.
+    """
+    measures = aggregate_measures(entity, request)
+
+    def load(key):
+        table = aggregate_cache.get(("table", entity), lambda key: _column_table(entity))
+        return build_aggregate_result(
+            request, measures, lambda by: table.aggregate(by, measures, request.filters)
+        )
+
+    return aggregate_cache.get(("result", aggregate_shape(entity, request)), load)
+
+
+def _queries_changed():
+    # Grid results and aggregates are derived from whole stores; drop them on any write
+    grid_result_cache.invalidate()
+    aggregate_cache.invalidate()
 
 
 # Initialize mock data
-initialize_mock_data()
\ No newline at end of file
+initialize_mock_data()
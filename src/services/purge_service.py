@@ -0,0 +1,141 @@
+"""
+Soft-deleted tasks and the background job that removes them.
+
+Deleting a task, or the well or campaign it belongs to, only stamps ``Task.deleted_at``
+with one UPDATE, and every read filters those rows out (``live_conditions``), so they
+disappear at once. :class:`TaskPurger` then deletes them and their comments in small
+batches, each its own short transaction, so no request waits on a large delete and
+writers are never blocked for long.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from src.database.models import Task, TaskComment, task_search
+from typing import Callable, List, Optional
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+PURGE_INTERVAL_SECONDS = float(os.getenv("PURGE_INTERVAL_SECONDS", "60"))
+# Pause between batches of one pass, leaving room for other writers
+PURGE_BATCH_PAUSE_SECONDS = float(os.getenv("PURGE_BATCH_PAUSE_SECONDS", "0.05"))
+
+logger = logging.getLogger(__name__)
+
+
+def live_conditions(model) -> List:
+    """
+    Conditions excluding soft-deleted rows of ``model``; only tasks are soft-deleted.
+    """
+    return [model.deleted_at.is_(None)] if model is Task else []
+
+
+def soft_delete_tasks(db: Session, *conditions, detach: bool = False) -> int:
+    """
+    Mark the live tasks matching ``conditions`` deleted in one statement.
+
+    ``detach`` also clears their campaign and well, so those rows can be deleted before
+    the purge gets to the tasks.
+    """
+    values = {"deleted_at": datetime.utcnow(), "version": Task.version + 1}
+    if detach:
+        values.update(campaign_id=None, well_id=None)
+    result = db.execute(
+        update(Task).where(*conditions, *live_conditions(Task)).values(values),
+        execution_options={"synchronize_session": False},
+    )
+    if detach:
+        # Already soft-deleted tasks still reference the rows about to go
+        db.execute(
+            update(Task).where(*conditions, Task.deleted_at.isnot(None)).values(campaign_id=None, well_id=None),
+            execution_options={"synchronize_session": False},
+        )
+    return result.rowcount
+
+
+def purge_deleted_tasks(db: Session, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Permanently delete one batch of soft-deleted tasks and their comments; return how
+    many tasks were removed (0 when there is nothing left).
+    """
+    task_ids = list(db.execute(
+        select(Task.id).where(Task.deleted_at.isnot(None)).order_by(Task.deleted_at).limit(batch_size)
+    ).scalars())
+    if not task_ids:
+        return 0
+    if db.get_bind().dialect.name == "sqlite":
+        # Their full-text rows are keyed by the stored id, so select it from the tasks
+        db.execute(delete(task_search).where(task_search.c.task_id.in_(select(Task.id).where(Task.id.in_(task_ids)))))
+    db.execute(delete(TaskComment).where(TaskComment.task_id.in_(task_ids)), execution_options={"synchronize_session": False})
+    db.execute(delete(Task).where(Task.id.in_(task_ids)), execution_options={"synchronize_session": False})
+    db.commit()
+    return len(task_ids)
+
+
+class TaskPurger:
+    """
+    Daemon thread running :func:`purge_deleted_tasks` until nothing is left, then
+    sleeping ``interval`` seconds. ``wake`` starts a pass early, e.g. after a large
+    delete.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = PURGE_INTERVAL_SECONDS,
+        batch_size: int = PURGE_BATCH_SIZE,
+        pause: float = PURGE_BATCH_PAUSE_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.purged = 0
+        self.passes = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="task-purge", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> int:
+        """
+        Purge everything soft-deleted, batch by batch; return the number of tasks removed.
+        """
+        removed = 0
+        with self._session_factory() as db:
+            while not self._stop.is_set():
+                count = purge_deleted_tasks(db, self.batch_size)
+                removed += count
+                self.purged += count
+                if count < self.batch_size:
+                    break
+                self._stop.wait(self.pause)
+        self.passes += 1
+        return removed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Task purge failed; retrying in %ss", self.interval)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stats(self):
+        return {"purged": self.purged, "passes": self.passes, "running": self._thread is not None}
@@ -0,0 +1,229 @@
+"""
+Compact rows for the in-memory task and well stores.
+
+A pydantic model keeps a per-instance ``__dict__`` and fields-set bookkeeping, which
+costs kilobytes per row at scale. The records here keep one slot per field instead.
+Values are shared wherever they repeat:
+
+- statuses are the ``TaskStatus`` members themselves;
+- priorities, labels, ids, titles and descriptions go through ``sys.intern``;
+- dates come from one table of date objects.
+
+Comments are named tuples kept apart from their tasks (see src.services.task_comments).
+
+The stores, indexes and queries read the record attributes directly. Pydantic models
+are built only when a row leaves the service layer (``to_out``).
+
+Records recovered from a store snapshot start out holding only their id and saved
+columns (see ``RecordCodec``); the rest of the row is decoded from the snapshot the
+first time another field is read. Writes must go through ``update`` (or follow a read),
+which decodes the row first.
+"""
+import pickle
+import sys
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import repeat
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from src.models.task import TaskComment, TaskOut, TaskStatus
+from src.models.well import WellOut
+from src.services.store_log import RowCodec, SnapshotRows
+
+_DATES: Dict[date, date] = {}
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    return None if value is None else sys.intern(str(value))
+
+
+def _day(value: Optional[date]) -> Optional[date]:
+    return None if value is None else _DATES.setdefault(value, value)
+
+
+def _decimal(value) -> Decimal:
+    # As pydantic coerces a float, so depths serialize the same as WellOut's
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _labels(values: Optional[Iterable[str]]):
+    return None if values is None else tuple(sys.intern(value) for value in values)
+
+
+class CommentRecord(NamedTuple):
+    id: str
+    task_id: str
+    author: str
+    message: str
+    timestamp_utc: datetime
+
+    @classmethod
+    def create(cls, id: str, task_id: str, author: str, message: str, timestamp_utc: datetime) -> "CommentRecord":
+        return cls(id, sys.intern(task_id), sys.intern(author), message, timestamp_utc)
+
+    def to_out(self) -> TaskComment:
+        return TaskComment(id=self.id, author=self.author, message=self.message, timestamp_utc=self.timestamp_utc)
+
+
+def _unpickle_record(cls, values: tuple):
+    record = cls.__new__(cls)
+    for member, value in zip(cls._MEMBERS, values):
+        member.__set__(record, value)
+    record._rows = None
+    return record
+
+
+class _SnapshotRecord:
+    __slots__ = ("_rows", "_row")
+
+    _FIELDS: Dict[str, object] = {}
+    # The subclass's fields in row order, and their slot descriptors
+    _ROW: Tuple[str, ...] = ()
+    _MEMBERS: tuple = ()
+
+    def __init_subclass__(cls):
+        cls._ROW = cls.__slots__
+        cls._MEMBERS = tuple(cls.__dict__[name] for name in cls.__slots__)
+
+    def __getattr__(self, name):
+        # Only reached for a slot that is not set, i.e. a field still in the snapshot
+        if name in self._ROW and self._rows is not None:
+            self._load()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def _load(self):
+        rows = self._rows
+        if rows is None:
+            return
+        cls = type(self)
+        for member, name, value in zip(cls._MEMBERS, cls._ROW, pickle.loads(rows[self._row])):
+            # Fields set since recovery are newer than the snapshot
+            try:
+                member.__get__(self, cls)
+            except AttributeError:
+                normalize = cls._FIELDS.get(name)
+                member.__set__(self, normalize(value) if normalize is not None and value is not None else value)
+        self._rows = None
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._ROW)
+
+    def __reduce__(self):
+        return _unpickle_record, (type(self), self._values())
+
+
+class RecordCodec(RowCodec):
+    """
+    Writes a record store to snapshots as one pickled tuple of fields per record, and
+    recovers it as records that decode their row on first read.
+    """
+
+    def __init__(self, record_class, columns: Iterable[str] = ()):
+        self.record_class = record_class
+        self.columns = tuple(columns)
+
+    def encode(self, record) -> bytes:
+        rows = record._rows
+        if rows is not None:
+            return rows[record._row]
+        return pickle.dumps(record._values(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, rows: SnapshotRows, keys: list) -> dict:
+        # Filled a slot at a time across all records, so no Python code runs per row
+        cls = self.record_class
+        records = list(map(cls.__new__, repeat(cls, len(keys))))
+        deque(map(cls.id.__set__, records, keys), 0)
+        for name in self.columns:
+            deque(map(getattr(cls, name).__set__, records, rows.columns[name]), 0)
+        deque(map(cls._rows.__set__, records, repeat(rows)), 0)
+        deque(map(cls._row.__set__, records, range(len(keys))), 0)
+        return dict(zip(keys, records))
+
+
+class TaskRecord(_SnapshotRecord):
+    __slots__ = (
+        "id", "title", "description", "status", "priority", "due_date", "assigned_to", "labels",
+        "campaign_id", "well_id", "version", "created_at", "updated_at",
+    )
+
+    # Field -> normalizer applied on every write
+    _FIELDS = {
+        "title": _text,
+        "description": _text,
+        "status": TaskStatus,
+        "priority": _text,
+        "due_date": _day,
+        "assigned_to": _text,
+        "labels": _labels,
+        "campaign_id": _text,
+        "well_id": _text,
+    }
+
+    def __init__(self, id: str, created_at: datetime, updated_at: datetime, version: int = 1, **fields):
+        self._rows = None
+        self.id = sys.intern(id)
+        self.version = version
+        self.created_at = created_at
+        self.updated_at = updated_at
+        for name in self._FIELDS:
+            setattr(self, name, None)
+        self.status = TaskStatus.backlog
+        self.update(**fields)
+
+    def update(self, **fields):
+        self._load()
+        normalizers = self._FIELDS
+        for name, value in fields.items():
+            setattr(self, name, normalizers[name](value) if value is not None else None)
+        if self.status is None:
+            self.status = TaskStatus.backlog
+
+    def to_out(self, comment_count: int = 0, latest_comment: Optional[CommentRecord] = None) -> TaskOut:
+        return TaskOut(
+            id=self.id, title=self.title, description=self.description, status=self.status,
+            priority=self.priority, due_date=self.due_date, assigned_to=self.assigned_to,
+            labels=list(self.labels) if self.labels is not None else None,
+            campaign_id=self.campaign_id, well_id=self.well_id, comment_count=comment_count,
+            latest_comment=latest_comment.to_out() if latest_comment is not None else None,
+            version=self.version, created_at=self.created_at, updated_at=self.updated_at
+        )
+
+
+class WellRecord(_SnapshotRecord):
+    __slots__ = (
+        "id", "campaign_id", "name", "status", "start_date", "end_date", "planned_td_m", "actual_td_m",
+        "created_at", "updated_at",
+    )
+
+    _FIELDS = {
+        "campaign_id": _text,
+        "name": _text,
+        "status": _text,
+        "start_date": _day,
+        "end_date": _day,
+        "planned_td_m": _decimal,
+        "actual_td_m": _decimal,
+    }
+
+    def __init__(self, id: str, created_at: datetime, updated_at: datetime, **fields):
+        self._rows = None
+        self.id = sys.intern(id)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        for name in self._FIELDS:
+            setattr(self, name, None)
+        self.update(**fields)
+
+    def update(self, **fields):
+        self._load()
+        normalizers = self._FIELDS
+        for name, value in fields.items():
+            setattr(self, name, normalizers[name](value) if value is not None else None)
+
+    def to_out(self) -> WellOut:
+        return WellOut(
+            id=self.id, campaign_id=self.campaign_id, name=self.name, status=self.status,
+            start_date=self.start_date, end_date=self.end_date, planned_td_m=self.planned_td_m,
+            actual_td_m=self.actual_td_m, created_at=self.created_at, updated_at=self.updated_at
+        )
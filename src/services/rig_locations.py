@@ -0,0 +1,57 @@
+"""
+Nearest-rig queries over the rigs' coordinates.
+
+Rig positions are loaded once into arrays and cached until a rig is written; distances
+from a point to every rig are then one vectorized haversine (see backend/calc/distance).
+"""
+import numpy as np
+from typing import Callable, List, Optional, Sequence
+from backend.calc.distance import DEFAULT_MOVE_SPEED_KNOTS, coordinates, haversine_km, nearest_rows, transit_days
+from src.models.rig import RigDistance, RigOut
+from src.services.entity_cache import rig_location_cache
+
+# Rig statuses that can take new work
+AVAILABLE_RIG_STATUSES = frozenset({"Idle"})
+_PAGE_SIZE = 500
+
+
+class RigLocations:
+    def __init__(self, rigs: Sequence[RigOut]):
+        self.rigs = list(rigs)
+        self.lat, self.lon = coordinates([{"lat": rig.lat, "lon": rig.lon} for rig in self.rigs])
+        self.available = np.array([rig.status in AVAILABLE_RIG_STATUSES for rig in self.rigs], dtype=bool)
+
+
+def _load_all(get_rigs: Callable[..., List[RigOut]]) -> RigLocations:
+    rigs: List[RigOut] = []
+    while True:
+        page = get_rigs(skip=len(rigs), limit=_PAGE_SIZE)
+        rigs.extend(page)
+        if len(page) < _PAGE_SIZE:
+            return RigLocations(rigs)
+
+
+def rig_locations(get_rigs: Callable[..., List[RigOut]]) -> RigLocations:
+    return rig_location_cache.get("all", lambda key: _load_all(get_rigs))
+
+
+def nearest_rigs(
+    get_rigs: Callable[..., List[RigOut]],
+    lat: float,
+    lon: float,
+    limit: int = 5,
+    available_only: bool = True,
+    speed_knots: Optional[float] = None,
+) -> List[RigDistance]:
+    """
+    The ``limit`` rigs closest to ``(lat, lon)``, nearest first, with their transit time.
+    Rigs without coordinates are skipped.
+    """
+    locations = rig_locations(get_rigs)
+    distances = haversine_km(locations.lat, locations.lon, lat, lon)
+    rows = np.flatnonzero(locations.available) if available_only else np.arange(len(locations.rigs))
+    speed = speed_knots or DEFAULT_MOVE_SPEED_KNOTS
+    return [
+        RigDistance(rig=rig, distance_km=round(km, 3), transit_days=round(float(transit_days(km, speed)), 3))
+        for rig, km in nearest_rows(distances, rows, limit, locations.rigs)
+    ]
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+from backend.calc.diff import diff_projects, field_changes, iter_changes
+from src.models.scenario import ScenarioRecord, ScenarioRecordKind
+
+# Diffs keyed by (scenario_a, scenario_b, version_a, version_b); a write to either
+# scenario bumps its version, so stale entries are never hit and simply age out.
+DIFF_CACHE_SIZE = 64
+_diff_cache: "OrderedDict[Tuple[str, str, int, int], dict]" = OrderedDict()
+
+
+def _stream(records: List[ScenarioRecord]):
+    return ((r.key, r.data) for r in sorted(records, key=lambda r: r.key))
+
+
+def build_scenario_diff(
+    scenario_a, scenario_b, get_records: Callable[[str, str], List[ScenarioRecord]]
+) -> Dict:
+    """
+    Diff two scenarios, reusing a cached result while both versions are unchanged.
+    ``get_records(scenario_id, kind)`` returns the resolved rows of one kind.
+
+    Scenarios hold no maintenance windows (there is no record kind or table for them),
+    so none are passed to ``diff_projects``: the conflicts it reports are rig double
+    bookings only, and maintenance clashes never appear in a scenario diff.
+    """
+    key = (str(scenario_a.id), str(scenario_b.id), scenario_a.version, scenario_b.version)
+    if key in _diff_cache:
+        _diff_cache.move_to_end(key)
+        return _diff_cache[key]
+
+    a_id, b_id = key[0], key[1]
+    result = {
+        "scenario_a": a_id,
+        "scenario_b": b_id,
+        "versions": [scenario_a.version, scenario_b.version],
+        "projects": diff_projects(
+            _stream(get_records(a_id, ScenarioRecordKind.project.value)),
+            _stream(get_records(b_id, ScenarioRecordKind.project.value)),
+        ),
+    }
+    for kind in (ScenarioRecordKind.campaign, ScenarioRecordKind.campaign_project):
+        changes = []
+        for record_key, old, new in iter_changes(
+            _stream(get_records(a_id, kind.value)), _stream(get_records(b_id, kind.value))
+        ):
+            if old is None or new is None:
+                changes.append({"key": record_key, "change": "added" if old is None else "removed", "fields": {}})
+            elif old != new:
+                changes.append({"key": record_key, "change": "modified", "fields": field_changes(old, new)})
+        result[kind.value] = changes
+
+    _diff_cache[key] = result
+    if len(_diff_cache) > DIFF_CACHE_SIZE:
+        _diff_cache.popitem(last=False)
+    return result
@@ -0,0 +1,176 @@
+from sqlalchemy.orm import Session
+from src.database.models import Scenario, ScenarioRecord as ScenarioRecordModel
+from src.models.scenario import ScenarioCreate, ScenarioClone, ScenarioRecord
+from src.services.scenario_diff import build_scenario_diff
+from datetime import datetime
+import uuid
+from typing import List, Optional
+
+
+def get_scenario(db: Session, scenario_id: str):
+    return db.query(Scenario).filter(Scenario.id == scenario_id).first()
+
+
+def get_scenarios(db: Session, skip: int = 0, limit: int = 100):
+    return db.query(Scenario).offset(skip).limit(limit).all()
+
+
+def create_scenario(db: Session, scenario: ScenarioCreate, parent_id: Optional[str] = None):
+    db_scenario = Scenario(
+        id=str(uuid.uuid4()),
+        name=scenario.name,
+        status=scenario.status,
+        parent_id=parent_id
+    )
+    db.add(db_scenario)
+    db.commit()
+    db.refresh(db_scenario)
+    return db_scenario
+
+
+def clone_scenario(db: Session, scenario_id: str, clone: ScenarioClone):
+    """
+    Clone in O(1): the clone stores no rows and reads through to its parent.
+    """
+    if not get_scenario(db, scenario_id):
+        return None
+    return create_scenario(db, ScenarioCreate(name=clone.name), parent_id=scenario_id)
+
+
+def _scenario_chain(db: Session, scenario_id: str) -> List[str]:
+    chain = []
+    scenario = get_scenario(db, scenario_id)
+    while scenario:
+        chain.append(str(scenario.id))
+        scenario = get_scenario(db, scenario.parent_id) if scenario.parent_id else None
+    return chain
+
+
+def _resolve_scenario_record(db: Session, scenario_id: str, kind: str, key: str):
+    chain = _scenario_chain(db, scenario_id)
+    rows = {
+        str(row.scenario_id): row
+        for row in db.query(ScenarioRecordModel).filter(
+            ScenarioRecordModel.scenario_id.in_(chain),
+            ScenarioRecordModel.kind == kind,
+            ScenarioRecordModel.key == key,
+        )
+    }
+    for source_id in chain:
+        if source_id in rows:
+            row = rows[source_id]
+            return (row.data, source_id) if row.data is not None else (None, None)
+    return None, None
+
+
+def get_scenario_record(db: Session, scenario_id: str, kind: str, key: str):
+    data, source_id = _resolve_scenario_record(db, scenario_id, kind, key)
+    if data is None:
+        return None
+    return ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=source_id)
+
+
+def get_scenario_records(db: Session, scenario_id: str, kind: str):
+    """
+    All visible rows of ``kind``; overrides and tombstones shadow parent rows.
+    """
+    chain = _scenario_chain(db, scenario_id)
+    depth = {source_id: i for i, source_id in enumerate(chain)}
+    visible = {}
+    rows = db.query(ScenarioRecordModel).filter(
+        ScenarioRecordModel.scenario_id.in_(chain), ScenarioRecordModel.kind == kind
+    )
+    for row in rows:
+        source_id = str(row.scenario_id)
+        current = visible.get(row.key)
+        if current is None or depth[source_id] < depth[current[1]]:
+            visible[row.key] = (row.data, source_id)
+    return [
+        ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=source_id)
+        for key, (data, source_id) in visible.items()
+        if data is not None
+    ]
+
+
+def _preserve_for_clones(db: Session, scenario_id: str, kind: str, key: str):
+    # Copy the current value down to clones that still read through, so they keep
+    # seeing the row as it was when they were cloned.
+    current, _ = _resolve_scenario_record(db, scenario_id, kind, key)
+    for child in db.query(Scenario).filter(Scenario.parent_id == scenario_id):
+        if db.get(ScenarioRecordModel, (child.id, kind, key)) is None:
+            db.add(ScenarioRecordModel(scenario_id=child.id, kind=kind, key=key, data=current))
+
+
+def _touch_scenario(db: Session, scenario_id: str):
+    db.query(Scenario).filter(Scenario.id == scenario_id).update(
+        {Scenario.version: Scenario.version + 1, Scenario.updated_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+
+
+def put_scenario_record(db: Session, scenario_id: str, kind: str, key: str, data: dict):
+    if not get_scenario(db, scenario_id):
+        return None
+    _preserve_for_clones(db, scenario_id, kind, key)
+    db.merge(ScenarioRecordModel(scenario_id=scenario_id, kind=kind, key=key, data=data))
+    _touch_scenario(db, scenario_id)
+    db.commit()
+    return ScenarioRecord(kind=kind, key=key, data=data, source_scenario_id=str(scenario_id))
+
+
+def delete_scenario_record(db: Session, scenario_id: str, kind: str, key: str):
+    record = get_scenario_record(db, scenario_id, kind, key)
+    if not record:
+        return None
+    _preserve_for_clones(db, scenario_id, kind, key)
+    scenario = get_scenario(db, scenario_id)
+    if scenario.parent_id:
+        db.merge(ScenarioRecordModel(scenario_id=scenario_id, kind=kind, key=key, data=None))
+    else:
+        db.query(ScenarioRecordModel).filter(
+            ScenarioRecordModel.scenario_id == scenario_id,
+            ScenarioRecordModel.kind == kind,
+            ScenarioRecordModel.key == key,
+        ).delete(synchronize_session=False)
+    _touch_scenario(db, scenario_id)
+    db.commit()
+    return record
+
+
+def materialize_scenario(db: Session, scenario_id: str):
+    """
+    Flatten the overlay chain into the scenario's own rows and detach it from its parent.
+    """
+    scenario = get_scenario(db, scenario_id)
+    if not scenario:
+        return None
+    if scenario.parent_id:
+        chain = _scenario_chain(db, scenario_id)
+        kinds = [
+            kind
+            for (kind,) in db.query(ScenarioRecordModel.kind)
+            .filter(ScenarioRecordModel.scenario_id.in_(chain))
+            .distinct()
+        ]
+        flattened = [record for kind in kinds for record in get_scenario_records(db, scenario_id, kind)]
+        db.query(ScenarioRecordModel).filter(
+            ScenarioRecordModel.scenario_id == scenario_id
+        ).delete(synchronize_session=False)
+        db.add_all(
+            ScenarioRecordModel(
+                scenario_id=scenario_id, kind=record.kind.value, key=record.key, data=record.data
+            )
+            for record in flattened
+        )
+        scenario.parent_id = None
+        scenario.updated_at = datetime.utcnow()
+        db.commit()
+        db.refresh(scenario)
+    return scenario
+
+
+def diff_scenarios(db: Session, scenario_a: str, scenario_b: str):
+    a, b = get_scenario(db, scenario_a), get_scenario(db, scenario_b)
+    if not a or not b:
+        return None
+    return build_scenario_diff(a, b, lambda scenario_id, kind: get_scenario_records(db, scenario_id, kind))
@@ -0,0 +1,352 @@
+"""
+Deterministic synthetic portfolios for load testing and profiling.
+
+``generate_portfolio(scale, seed)`` always returns the same rows (ids included) for the same
+inputs. The in-memory store loads them at startup when SEED_SCALE is set (see
+``initialize_mock_data``); the SQL backends are loaded in bulk with::
+
+    STORAGE_BACKEND=postgresql python -m src.services.seed --scale large --seed 42 --replace
+
+SEED_SCALE / --scale take a preset name, ``key=value`` overrides, or both:
+``large``, ``tasks=50000``, ``large,rigs=80,comments_per_task=0``.
+"""
+import argparse
+import csv
+import gc
+import io
+import random
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List
+from src.models import RecordStatus, RigType, TaskStatus, UserRole
+
+# Every seeded user can log in with this password (SQL backends)
+SEED_PASSWORD = "password123"
+SEED_ORIGIN = datetime(2025, 1, 1)
+# Rows per executemany batch on databases without COPY
+INSERT_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class SeedScale:
+    users: int = 20
+    campaigns: int = 10
+    rigs: int = 5
+    wells: int = 100
+    tasks: int = 1_000
+    # Average; each task gets between 0 and twice this many
+    comments_per_task: float = 1.0
+
+
+SEED_PRESETS = {
+    "small": SeedScale(),
+    "medium": SeedScale(users=100, campaigns=50, rigs=20, wells=1_000, tasks=20_000),
+    "large": SeedScale(users=500, campaigns=200, rigs=50, wells=5_000, tasks=200_000, comments_per_task=2.0),
+}
+
+_FIELDS = ("Alpha", "Bravo", "Corvus", "Delta", "Eider", "Fulmar", "Gannet", "Heron", "Ivar", "Johan")
+_BLOCKS = ("North", "South", "East", "West", "Central")
+_RIG_STATUSES = ("Drilling", "Moving", "Idle", "Maintenance")
+_WELL_STATUSES = ("planned", "drilling", "suspended", "completed")
+_PRIORITIES = ("low", "normal", "normal", "high", "urgent")
+_TASK_TITLES = (
+    "BOP pressure test", "Run 13-3/8in casing", "Cement 9-5/8in liner", "Mud weight review",
+    "Rig move planning", "Wellhead installation", "Logging run", "Formation integrity test",
+    "Kick drill", "Permit to work audit", "Mud logging review", "Directional survey QC",
+    "Supply boat schedule", "Crew change", "Bit change", "Completion design review",
+)
+_LABELS = ("safety", "hse", "logistics", "casing", "cementing", "wellhead", "weather", "critical-path")
+_TASK_DETAILS = (
+    "Coordinate with the drilling supervisor and confirm the procedure before shift change.",
+    "Third-party crew required on site; check mobilisation and permits.",
+    "Results to be logged in the daily drilling report.",
+    "Waiting on weather window for the supply vessel.",
+    "Follow up on findings from the last audit.",
+)
+_COMMENTS = (
+    "Done, results attached to the daily report.",
+    "Delayed by weather, rescheduled to next shift.",
+    "Need sign-off from the ops manager.",
+    "Parts arrived on the last supply run.",
+    "Pressure held for 15 minutes, test passed.",
+    "Crew briefed at the pre-tour meeting.",
+)
+
+
+def parse_scale(spec: str) -> SeedScale:
+    """
+    Parse ``preset``, ``key=value,...`` or ``preset,key=value,...`` into a SeedScale.
+    """
+    scale = SEED_PRESETS["small"]
+    overrides: Dict[str, Any] = {}
+    types = {f.name: f.type for f in fields(SeedScale)}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if "=" not in part:
+            if part not in SEED_PRESETS:
+                raise ValueError(f"Unknown seed preset {part!r}; expected one of {sorted(SEED_PRESETS)}")
+            scale = SEED_PRESETS[part]
+            continue
+        key, value = (s.strip() for s in part.split("=", 1))
+        if key not in types:
+            raise ValueError(f"Unknown seed scale field {key!r}; expected one of {sorted(types)}")
+        overrides[key] = float(value) if types[key] is float else int(value)
+    return replace(scale, **overrides)
+
+
+def _uuid(rng: random.Random) -> str:
+    # Version 4 layout from seeded bits (uuid.UUID(int=...) is ~3x slower)
+    h = "%032x" % rng.getrandbits(128)
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-a{h[17:20]}-{h[20:]}"
+
+
+def generate_portfolio(scale: SeedScale, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build users, campaigns, rigs, wells and tasks (with comments) as plain dicts.
+
+    Tasks mostly belong to a well and its campaign, are due within a year of the
+    campaign's spud date, and are more likely done the earlier they were due.
+    """
+    rng = random.Random(seed)
+    users = []
+    for i in range(scale.users):
+        users.append({
+            "id": _uuid(rng),
+            "email": f"user{i:05d}@example.com",
+            "name": f"User {i:05d}",
+            "timezone": "UTC",
+            "active": True,
+            "roles": [UserRole.admin] if i == 0 else [rng.choice(list(UserRole))],
+            "created_at": SEED_ORIGIN,
+            "updated_at": SEED_ORIGIN,
+        })
+
+    campaigns = []
+    for i in range(scale.campaigns):
+        target = float(rng.randrange(1_500, 6_000))
+        campaigns.append({
+            "id": _uuid(rng),
+            "name": f"{_FIELDS[i % len(_FIELDS)]}-{i // len(_FIELDS) + 1}",
+            "block": rng.choice(_BLOCKS),
+            "field": _FIELDS[i % len(_FIELDS)],
+            "rig": f"Rig {i % max(1, scale.rigs) + 1}",
+            "spud_date": SEED_ORIGIN.date() + timedelta(days=rng.randrange(365)),
+            "target_depth": target,
+            "current_depth": round(target * rng.choice((0.0, rng.random(), 1.0)), 1),
+            "day_rate": float(rng.randrange(80, 450) * 1_000),
+            "created_at": SEED_ORIGIN,
+            "updated_at": SEED_ORIGIN + timedelta(minutes=rng.randrange(525_600)),
+        })
+    if not campaigns and (scale.rigs or scale.wells or scale.tasks):
+        raise ValueError("Rigs, wells and tasks need at least one campaign")
+
+    rig_types = list(RigType)
+    rigs = []
+    for i in range(scale.rigs):
+        rigs.append({
+            "id": _uuid(rng),
+            "campaign_id": campaigns[i % len(campaigns)]["id"],
+            "name": f"Rig {i + 1}",
+            "type": rng.choice(rig_types),
+            "lat": round(rng.uniform(-60, 70), 6),
+            "lon": round(rng.uniform(-180, 180), 6),
+            "status": rng.choice(_RIG_STATUSES),
+            "notes": None,
+            "created_at": SEED_ORIGIN,
+            "updated_at": SEED_ORIGIN,
+        })
+
+    wells = []
+    for i in range(scale.wells):
+        campaign = campaigns[rng.randrange(len(campaigns))]
+        start = campaign["spud_date"] + timedelta(days=rng.randrange(0, 300))
+        planned = rng.randrange(1_500, 6_000)
+        status = rng.choice(_WELL_STATUSES)
+        wells.append({
+            "id": _uuid(rng),
+            "campaign_id": campaign["id"],
+            "name": f"{campaign['name']}/W{i + 1:05d}",
+            "status": status,
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randrange(20, 120)),
+            "planned_td_m": float(planned),
+            "actual_td_m": float(planned if status == "completed" else rng.randrange(0, planned)),
+            "created_at": SEED_ORIGIN,
+            "updated_at": SEED_ORIGIN,
+        })
+
+    statuses = list(TaskStatus)
+    campaign_by_id = {c["id"]: c for c in campaigns}
+    today = SEED_ORIGIN.date() + timedelta(days=365)
+    max_comments = int(round(scale.comments_per_task * 2))
+    if max_comments and not users:
+        raise ValueError("Comments need at least one user")
+    # The task loop dominates at scale; index with random() rather than randrange/choice
+    rand = rng.random
+    user_ids = [u["id"] for u in users]
+    tasks = []
+    for _ in range(scale.tasks):
+        well = wells[int(rand() * len(wells))] if wells and rand() < 0.8 else None
+        campaign = campaign_by_id[well["campaign_id"]] if well else campaigns[int(rand() * len(campaigns))]
+        due = campaign["spud_date"] + timedelta(days=int(rand() * 395) - 30)
+        if due < today and rand() < 0.7:
+            status = TaskStatus.done
+        else:
+            status = statuses[int(rand() * len(statuses))]
+        created = SEED_ORIGIN + timedelta(minutes=int(rand() * 525_600))
+        comments = []
+        for c in range(int(rand() * (max_comments + 1))):
+            comments.append({
+                "id": _uuid(rng),
+                "author_id": user_ids[int(rand() * len(user_ids))],
+                "body": _COMMENTS[int(rand() * len(_COMMENTS))],
+                "created_at": created + timedelta(hours=c + 1),
+            })
+        tasks.append({
+            "id": _uuid(rng),
+            "title": f"{_TASK_TITLES[int(rand() * len(_TASK_TITLES))]} ({well['name'] if well else campaign['name']})",
+            "description": _TASK_DETAILS[int(rand() * len(_TASK_DETAILS))],
+            "status": status,
+            "priority": _PRIORITIES[int(rand() * len(_PRIORITIES))],
+            "due_date": due,
+            "assignee_id": user_ids[int(rand() * len(user_ids))] if user_ids and rand() < 0.9 else None,
+            "labels": rng.sample(_LABELS, int(rand() * 3)),
+            "campaign_id": campaign["id"],
+            "well_id": well["id"] if well else None,
+            "version": 1 + len(comments),
+            "created_at": created,
+            "updated_at": comments[-1]["created_at"] if comments else created,
+            "comments": comments,
+        })
+    return {"users": users, "campaigns": campaigns, "rigs": rigs, "wells": wells, "tasks": tasks}
+
+
+@contextmanager
+def paused_gc():
+    """
+    Suspend the cyclic garbage collector while building millions of (acyclic) rows;
+    otherwise repeated full collections over the growing heap double the load time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _copy_rows(connection, table, columns: List[str], rows: List[Dict[str, Any]]) -> bool:
+    """
+    Stream rows through PostgreSQL COPY; returns False when the driver has no COPY support.
+    """
+    dbapi_connection = connection.connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(_copy_value(row[column]) for column in columns)
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        return True
+    if hasattr(cursor, "copy"):  # psycopg 3
+        with cursor.copy(statement.replace("WITH (FORMAT csv)", "")) as copy:
+            for row in rows:
+                copy.write_row([_copy_value(row[column]) for column in columns])
+        return True
+    return False
+
+
+def _copy_value(value):
+    # Enum columns store member names; csv writes None as an empty, i.e. NULL, field
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, list):
+        return "{" + ",".join(value) + "}"
+    return value
+
+
+def load_database(portfolio: Dict[str, List[Dict[str, Any]]], engine, replace_existing: bool = False) -> Dict[str, int]:
+    """
+    Bulk insert a portfolio with COPY on PostgreSQL, or batched executemany elsewhere.
+
+    Returns the number of rows written per table.
+    """
+    from src.database.connection import Base
+    from src.database.models import Campaign, Rig, Task, TaskComment, User, UserRoleModel, Well
+    from sqlalchemy.orm import Session
+    from src.services.kpi_service import rebuild_campaign_kpis
+    from src.services.task_service import rebuild_search_index
+    from src.services.user_service import get_password_hash
+
+    # One hash for everyone: bcrypt costs ~0.2s per call
+    hashed_password = get_password_hash(SEED_PASSWORD)
+    tables = [
+        (User.__table__, [dict(u, hashed_password=hashed_password) for u in portfolio["users"]]),
+        (UserRoleModel.__table__, [
+            {"user_id": u["id"], "role": role} for u in portfolio["users"] for role in u["roles"]
+        ]),
+        (Campaign.__table__, [
+            dict(c, start_date=c["spud_date"], status=RecordStatus.active) for c in portfolio["campaigns"]
+        ]),
+        (Rig.__table__, portfolio["rigs"]),
+        (Well.__table__, portfolio["wells"]),
+        (Task.__table__, portfolio["tasks"]),
+        (TaskComment.__table__, [
+            dict(comment, task_id=t["id"]) for t in portfolio["tasks"] for comment in t["comments"]
+        ]),
+    ]
+    Base.metadata.create_all(bind=engine)
+    counts = {}
+    with engine.begin() as connection:
+        if replace_existing:
+            for table, _ in reversed(tables):
+                connection.execute(table.delete())
+        for table, rows in tables:
+            columns = [column.name for column in table.columns]
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+            counts[table.name] = len(rows)
+            if not rows:
+                continue
+            if engine.dialect.name == "postgresql" and _copy_rows(connection, table, columns, rows):
+                continue
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                connection.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+    with Session(bind=engine) as session:
+        rebuild_search_index(session)
+        rebuild_campaign_kpis(session)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load a synthetic portfolio into the configured database")
+    parser.add_argument("--scale", default="small", help="preset and/or key=value overrides")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replace", action="store_true", help="delete existing rows first")
+    args = parser.parse_args(argv)
+
+    from src.database.connection import STORAGE_BACKEND, engine
+
+    if STORAGE_BACKEND == "memory":
+        print("The memory store is seeded at startup; set SEED_SCALE instead", file=sys.stderr)
+        return 2
+    scale = parse_scale(args.scale)
+    with paused_gc():
+        started = time.perf_counter()
+        portfolio = generate_portfolio(scale, args.seed)
+        generated = time.perf_counter()
+        counts = load_database(portfolio, engine, replace_existing=args.replace)
+        loaded = time.perf_counter()
+    print(f"scale: {asdict(scale)}")
+    print(f"rows: {counts}")
+    print(f"generated in {generated - started:.1f}s, loaded in {loaded - generated:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
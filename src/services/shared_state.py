@@ -0,0 +1,113 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no cross-process coordination
+    fcntl = None
+
+_COUNTER = struct.Struct("<Q")
+
+
+class StateGeneration:
+    """
+    Write generation shared by every worker process on one host.
+
+    A single 64-bit counter lives in a small memory-mapped file. Each committed write
+    bumps it under an exclusive ``flock``; readers only compare the mapped value with
+    the last one they saw, which costs no syscall and no lock. When another process has
+    written, ``sync`` runs ``on_change`` so per-process caches are dropped instead of
+    serving rows that worker never saw change. A torn read can at worst look like a
+    change and cause one spurious clear.
+
+    With no path (or no ``fcntl``) it is disabled and every method is a no-op, which is
+    right for a single worker.
+    """
+
+    def __init__(self, path: Optional[str], on_change: Callable[[], None]):
+        self.path = path if fcntl is not None else None
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._seen = 0
+        self.changes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _mapped(self) -> mmap.mmap:
+        # Opened lazily, after any fork by the process manager
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    if os.fstat(fd).st_size < _COUNTER.size:
+                        os.ftruncate(fd, _COUNTER.size)
+                    mapped = mmap.mmap(fd, _COUNTER.size)
+                    self._seen = _COUNTER.unpack_from(mapped)[0]
+                    self._fd, self._map = fd, mapped
+        return self._map
+
+    def current(self) -> int:
+        return _COUNTER.unpack_from(self._mapped())[0] if self.enabled else 0
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold an exclusive cross-process lock, e.g. to run startup work one worker at a
+        time. It is a separate file from the counter's, so writes inside it can bump.
+        """
+        if not self.enabled:
+            yield
+            return
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def bump(self):
+        """
+        Record a committed write. This process's caches were updated by the write
+        itself, so they are kept unless another process wrote in between.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            counter = self._mapped()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                generation = _COUNTER.unpack_from(counter)[0]
+                _COUNTER.pack_into(counter, 0, generation + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            stale, self._seen = generation != self._seen, generation + 1
+        if stale:
+            self._changed()
+
+    def sync(self):
+        """
+        Drop local caches if another process has written since the last call.
+        """
+        if not self.enabled:
+            return
+        generation = _COUNTER.unpack_from(self._mapped())[0]
+        if generation == self._seen:
+            return
+        with self._lock:
+            if generation == self._seen:
+                return
+            self._seen = generation
+        self._changed()
+
+    def _changed(self):
+        self.changes += 1
+        self._on_change()
@@ -0,0 +1,311 @@
+"""
+Write-ahead log and snapshots for the in-memory store.
+
+Every write appends one record, the written row's current value (``None`` for a
+delete), to a log segment; each record is framed as ``<length, crc32, lsn>`` followed
+by its pickled ``(store, key, value)``. Once enough records have built up, a snapshot
+of all stores is written in the background, and log segments it covers are deleted.
+
+A snapshot is a table of contents followed by one section per store. Small stores are
+a single pickle. Stores with a :class:`RowCodec` (the large record stores) are written
+row by row: the encoded rows back to back, an array of their offsets, the keys, and
+any columns the codec keeps beside the rows. Recovery maps the file and, for those
+stores, only reads the keys and columns: each row becomes a placeholder from
+``codec.lazy`` that decodes itself from the mapping when first read, so start-up time
+does not grow with the size of the rows. Rows not read or written since are copied
+into the next snapshot as they are.
+
+Recovery then replays the log records that came after the snapshot. Records are whole
+row values, so replaying one that the snapshot already reflects is harmless. A torn
+record at the end of the log, e.g. from a crash mid-write, is dropped.
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.services.seed import paused_gc
+
+SNAPSHOT_FILE = "snapshot.bin"
+SNAPSHOT_MAGIC = b"DDSTORE4"
+# magic, lsn covered, table of contents offset and length
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQ")
+# payload length, crc32 of the payload, lsn
+_RECORD_HEADER = struct.Struct("<IIQ")
+_WRITE_BUFFER = 1 << 20
+
+Stores = Dict[str, dict]
+
+
+class SnapshotRows:
+    """
+    One store's rows in a mapped snapshot. ``rows[i]`` is row ``i``'s encoded bytes (a
+    view of the mapping) and ``columns[name][i]`` its saved column values.
+    """
+
+    __slots__ = ("_data", "_offsets", "columns")
+
+    def __init__(self, data: memoryview, offsets: memoryview, columns: Dict[str, list]):
+        self._data = data
+        self._offsets = offsets
+        self.columns = columns
+
+    def __getitem__(self, index: int) -> memoryview:
+        return self._data[self._offsets[index]:self._offsets[index + 1]]
+
+
+class RowCodec:
+    """
+    How a store is written to snapshots row by row and recovered lazily.
+
+    ``encode`` turns a value into bytes (a placeholder that was never read can return
+    its bytes from the old snapshot); ``load(rows, keys)`` returns the store, mapping
+    each key to the placeholder for its row. ``columns`` name attributes saved beside
+    the rows, e.g. the ones the store's secondary indexes are rebuilt from, so recovery
+    need not decode any row.
+    """
+
+    columns: Tuple[str, ...] = ()
+
+    def encode(self, value) -> bytes:
+        raise NotImplementedError
+
+    def load(self, rows: SnapshotRows, keys: list) -> dict:
+        raise NotImplementedError
+
+    def column(self, value, name: str):
+        return getattr(value, name)
+
+
+class StoreLog:
+    """
+    Durable log of the in-memory stores in ``directory``.
+
+    ``capture`` returns a point-in-time copy of every store for snapshots, and ``codecs``
+    the :class:`RowCodec` of each store written row by row. Appends are flushed to the
+    OS, which survives a process restart; set ``fsync`` to also survive power loss, at
+    the cost of one disk sync per write.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        capture: Callable[[], Stores],
+        snapshot_every: int = 10_000,
+        fsync: bool = False,
+        codecs: Optional[Dict[str, RowCodec]] = None,
+    ):
+        self.directory = directory
+        self._capture = capture
+        self._codecs = codecs or {}
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self._lsn = 0
+        self._snapshot_lsn = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        # Segments are named after the first lsn they hold
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith("wal-") and name.endswith(".log"):
+                segments.append((int(name[4:-4]), self._path(name)))
+        return sorted(segments)
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Tuple[int, str, object, object]]:
+        with open(path, "r+b") as file:
+            data = file.read()
+            offset = 0
+            while offset + _RECORD_HEADER.size <= len(data):
+                length, crc, lsn = _RECORD_HEADER.unpack_from(data, offset)
+                start = offset + _RECORD_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                store, key, value = pickle.loads(payload)
+                yield lsn, store, key, value
+                offset = start + length
+            if offset < len(data):
+                # Torn tail: drop it so later appends follow the last whole record
+                file.truncate(offset)
+
+    def recover(self) -> Optional[Stores]:
+        """
+        Return the stores as of the last logged write, or None when there is nothing on
+        disk yet.
+        """
+        stores = None
+        lsn = 0
+        path = self._path(SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with paused_gc():
+                lsn, stores = self._read_snapshot(path)
+        self._snapshot_lsn = lsn
+        for _, segment in self._segments():
+            for record_lsn, store, key, value in self._read_segment(segment):
+                if record_lsn <= self._snapshot_lsn:
+                    continue
+                if stores is None:
+                    stores = {}
+                rows = stores.setdefault(store, {})
+                if value is None:
+                    rows.pop(key, None)
+                else:
+                    rows[key] = value
+                lsn = record_lsn
+        self._lsn = lsn
+        return stores
+
+    def _read_snapshot(self, path: str) -> Tuple[int, Stores]:
+        with open(path, "rb") as file:
+            # Left open for as long as placeholders refer to it, even once a newer
+            # snapshot has replaced the file
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, lsn, toc_offset, toc_length = _SNAPSHOT_HEADER.unpack_from(mapped)
+        if magic != SNAPSHOT_MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a store snapshot of this version; remove it to reseed")
+        view = memoryview(mapped)
+
+        def load(offset: int, length: int):
+            return pickle.loads(view[offset:offset + length])
+
+        stores = {}
+        for name, section in load(toc_offset, toc_length).items():
+            if section[0] == "pickle":
+                stores[name] = load(*section[1:])
+                continue
+            _, data, data_length, offsets, count, keys, columns = section
+            codec = self._codecs.get(name)
+            if codec is None:
+                raise ValueError(f"{path} stores {name} row by row, but no codec is registered for it")
+            rows = SnapshotRows(
+                view[data:data + data_length],
+                view[offsets:offsets + 8 * (count + 1)].cast("Q"),
+                {column: load(*where) for column, where in columns.items()},
+            )
+            stores[name] = codec.load(rows, load(*keys))
+        return lsn, stores
+
+    def open(self):
+        """
+        Start a new log segment after the recovered (or snapshotted) lsn.
+        """
+        with self._lock:
+            self._rotate()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._path(f"wal-{self._lsn + 1:020d}.log"), "ab")
+
+    def append(self, store: str, key, value):
+        payload = pickle.dumps((store, key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._lsn += 1
+            self._file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self._lsn))
+            self._file.write(payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            due = self._lsn - self._snapshot_lsn >= self.snapshot_every
+        if due:
+            self.snapshot(background=True)
+
+    def snapshot(self, background: bool = False):
+        """
+        Write a snapshot of the current stores and drop the log segments it covers.
+
+        The log rotates and the stores are captured under the append lock, so every
+        write after the snapshot's lsn is in a segment that is kept. In the background
+        only one snapshot runs at a time.
+        """
+        with self._lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return
+            lsn = self._lsn
+            self._rotate()
+            stores = self._capture()
+            if background:
+                self._snapshot_thread = threading.Thread(
+                    target=self._write_snapshot, args=(lsn, stores), name="store-snapshot", daemon=True
+                )
+                self._snapshot_lsn = lsn
+                self._snapshot_thread.start()
+                return
+        self._write_snapshot(lsn, stores)
+        self._snapshot_lsn = lsn
+
+    @staticmethod
+    def _write_pickle(file, value) -> Tuple[int, int]:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        offset = file.tell()
+        file.write(payload)
+        return offset, len(payload)
+
+    def _write_rows(self, file, rows: dict, codec: RowCodec) -> Tuple[Any, ...]:
+        keys = list(rows)
+        values = list(rows.values())
+        data = file.tell()
+        offsets = array("Q", [0])
+        end = 0
+        for value in values:
+            encoded = codec.encode(value)
+            file.write(encoded)
+            end += len(encoded)
+            offsets.append(end)
+        # Align the offsets so they can be read in place as 64-bit integers
+        file.write(b"\0" * (-file.tell() % 8))
+        offsets_at = file.tell()
+        file.write(offsets.tobytes())
+        columns = {
+            name: self._write_pickle(file, [codec.column(value, name) for value in values])
+            for name in codec.columns
+        }
+        return ("rows", data, end, offsets_at, len(values), self._write_pickle(file, keys), columns)
+
+    def _write_snapshot(self, lsn: int, stores: Stores):
+        path = self._path(SNAPSHOT_FILE)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb", buffering=_WRITE_BUFFER) as file:
+            file.write(b"\0" * _SNAPSHOT_HEADER.size)
+            toc = {}
+            for name, rows in stores.items():
+                codec = self._codecs.get(name)
+                if codec is None:
+                    toc[name] = ("pickle", *self._write_pickle(file, rows))
+                else:
+                    toc[name] = self._write_rows(file, rows, codec)
+            toc_offset, toc_length = self._write_pickle(file, toc)
+            file.seek(0)
+            file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, lsn, toc_offset, toc_length))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+        segments = self._segments()
+        for (_, segment), (next_first, _) in zip(segments, segments[1:]):
+            # Every record of this segment is at or before the snapshot
+            if next_first <= lsn + 1:
+                os.remove(segment)
+
+    def close(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"lsn": self._lsn, "snapshot_lsn": self._snapshot_lsn}
@@ -0,0 +1,192 @@
+"""
+Task comments, stored apart from their tasks and read a page at a time.
+
+Comments are ordered by ``(timestamp, id)``, oldest first. A page cursor is that key of
+the last comment returned, so a page never skips or repeats comments when new ones are
+added while a client pages through the thread. Tasks only carry a count and the latest
+comment.
+"""
+import base64
+import pickle
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from itertools import repeat
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.models.task import TaskComment, TaskCommentPage
+from src.services.records import CommentRecord
+from src.services.store_log import RowCodec, SnapshotRows
+
+CommentKey = Tuple[datetime, str]
+
+DEFAULT_COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 200
+
+
+class CommentCursorError(ValueError):
+    pass
+
+
+def encode_cursor(key: CommentKey) -> str:
+    timestamp, comment_id = key
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{comment_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CommentKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, comment_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), comment_id
+    except ValueError:
+        raise CommentCursorError("Invalid comment cursor")
+
+
+def comment_key(comment: CommentRecord) -> CommentKey:
+    return comment.timestamp_utc, comment.id
+
+
+def comment_page(items: List[TaskComment], total: int, has_more: bool) -> TaskCommentPage:
+    last = items[-1] if has_more and items else None
+    return TaskCommentPage(
+        items=items,
+        total=total,
+        next_cursor=encode_cursor((last.timestamp_utc, last.id)) if last is not None else None,
+    )
+
+
+class SnapshotThread(tuple):
+    """
+    A task's comments still in a mapped store snapshot, as ``(rows, index)``; decoded
+    when the thread is first accessed.
+    """
+
+    __slots__ = ()
+
+    rows = property(itemgetter(0))
+    index = property(itemgetter(1))
+
+    def comments(self) -> List[CommentRecord]:
+        return [CommentRecord.create(*comment) for comment in pickle.loads(self.rows[self.index])]
+
+
+class ThreadCodec(RowCodec):
+    """
+    Writes comment threads to store snapshots one task per row.
+    """
+
+    def encode(self, thread) -> bytes:
+        if isinstance(thread, SnapshotThread):
+            return thread.rows[thread.index]
+        return pickle.dumps(tuple(map(tuple, thread)), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, rows: SnapshotRows, keys: list) -> dict:
+        return dict(zip(keys, map(SnapshotThread, zip(repeat(rows), range(len(keys))))))
+
+
+class CommentStore:
+    """
+    The memory backend's comment threads: per task, a list kept in key order.
+
+    Appends are O(1) for comments arriving in time order, and a page starting after a
+    cursor is found with a binary search instead of a scan of the thread. Threads
+    restored from a snapshot stay there until a task's comments are first read.
+    """
+
+    def __init__(self):
+        self._threads: Dict[str, Union[List[CommentRecord], SnapshotThread, tuple]] = {}
+        self._keys: Dict[str, List[CommentKey]] = {}
+        self._lock = threading.Lock()
+
+    def _thread(self, task_id: str) -> List[CommentRecord]:
+        # Called with the lock held
+        thread = self._threads.get(task_id)
+        if thread is None:
+            return []
+        if task_id not in self._keys:
+            thread = thread.comments() if isinstance(thread, SnapshotThread) else list(thread)
+            self._threads[task_id] = thread
+            self._keys[task_id] = [comment_key(comment) for comment in thread]
+        return thread
+
+    def reset(self, comments: Iterable[CommentRecord] = ()):
+        with self._lock:
+            self._threads.clear()
+            self._keys.clear()
+            for comment in comments:
+                self._threads.setdefault(comment.task_id, []).append(comment)
+            for task_id, thread in self._threads.items():
+                thread.sort(key=comment_key)
+                self._keys[task_id] = [comment_key(comment) for comment in thread]
+
+    def restore(self, threads: Dict[str, Iterable[CommentRecord]]):
+        """
+        Replace the threads with ones recovered from the store log, each in key order.
+        """
+        with self._lock:
+            self._threads.clear()
+            self._keys.clear()
+            self._threads.update(threads)
+
+    def capture(self) -> Dict[str, Union[tuple, SnapshotThread]]:
+        """
+        A point-in-time copy of every thread, for a store snapshot.
+        """
+        with self._lock:
+            return {
+                task_id: thread if task_id not in self._keys else tuple(thread)
+                for task_id, thread in self._threads.items()
+            }
+
+    def get(self, task_id: str) -> Optional[Tuple[CommentRecord, ...]]:
+        """
+        A task's thread as logged to the store log, or None when it has no comments.
+        """
+        with self._lock:
+            thread = self._thread(task_id)
+            return tuple(thread) if thread else None
+
+    def add(self, comment: CommentRecord):
+        key = comment_key(comment)
+        with self._lock:
+            self._thread(comment.task_id)
+            thread = self._threads.setdefault(comment.task_id, [])
+            keys = self._keys.setdefault(comment.task_id, [])
+            if not keys or keys[-1] < key:
+                thread.append(comment)
+                keys.append(key)
+            else:
+                position = bisect_right(keys, key)
+                thread.insert(position, comment)
+                keys.insert(position, key)
+
+    def remove_task(self, task_id: str) -> List[CommentRecord]:
+        with self._lock:
+            thread = self._thread(task_id)
+            self._keys.pop(task_id, None)
+            self._threads.pop(task_id, None)
+            return thread
+
+    def thread(self, task_id: str) -> List[CommentRecord]:
+        with self._lock:
+            return list(self._thread(task_id))
+
+    def summary(self, task_id: str) -> Tuple[int, Optional[CommentRecord]]:
+        """
+        The number of comments on a task and its latest one.
+        """
+        with self._lock:
+            thread = self._thread(task_id)
+            return (len(thread), thread[-1]) if thread else (0, None)
+
+    def page(
+        self, task_id: str, after: Optional[CommentKey] = None, limit: int = DEFAULT_COMMENT_PAGE_SIZE
+    ) -> Tuple[List[CommentRecord], bool]:
+        """
+        Up to ``limit`` comments after the ``after`` key, and whether more follow.
+        """
+        with self._lock:
+            thread = self._thread(task_id)
+            start = bisect_right(self._keys.get(task_id, []), after) if after is not None else 0
+            items = thread[start:start + limit]
+            return items, start + limit < len(thread)
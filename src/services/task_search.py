@@ -0,0 +1,390 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Field weights for term frequency: a hit in the title counts twice a description hit
+TITLE_WEIGHT = 2.0
+LABEL_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+COMMENT_WEIGHT = 0.5
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Shorter prefixes would expand to most of the vocabulary
+MIN_PREFIX_LENGTH = 2
+FACETS = ("status", "priority", "assigned_to", "campaign_id")
+# While the index is being built a search waits this long for it, then falls back to
+# scanning at most SCAN_LIMIT tasks
+BUILD_WAIT_SECONDS = 1.0
+SCAN_LIMIT = 5000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with".split()
+)
+
+
+@lru_cache(maxsize=65536)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS)
+
+
+def tokenize(text: Optional[str]) -> Tuple[str, ...]:
+    # Titles, labels and canned comments repeat a lot; the cache spares re-tokenizing them
+    return _tokenize(text) if text else ()
+
+
+def parse_query(query: Optional[str], prefix: bool = True) -> List[Tuple[str, bool]]:
+    """
+    Split a query into ``(term, is_prefix)`` pairs.
+
+    ``term*`` asks for prefix matching explicitly; with ``prefix`` the last term is
+    prefix-matched too, so results follow the user as they type.
+    """
+    if not query:
+        return []
+    terms = []
+    for word in query.split():
+        tokens = tokenize(word)
+        for i, token in enumerate(tokens):
+            terms.append((token, word.endswith("*") and i == len(tokens) - 1))
+    if prefix and terms:
+        token, _ = terms[-1]
+        terms[-1] = (token, True)
+    return [(token, is_prefix and len(token) >= MIN_PREFIX_LENGTH) for token, is_prefix in terms]
+
+
+def _facet_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    return getattr(value, "value", value)
+
+
+class TaskSearchIndex:
+    """
+    In-process inverted index over task titles, labels, descriptions and comments.
+
+    Postings map each term to ``{task_id: weighted term frequency}``; a sorted vocabulary
+    serves prefix queries with a binary search. Results are ranked with BM25 and every
+    query term must match (AND), as with ``to_tsquery('a & b')``.
+
+    The index is built from ``loader`` (and each task's comment messages from
+    ``comments(task_id)``) by a background thread (:meth:`start_build`), then kept current
+    by the write paths calling :meth:`index_task` / :meth:`add_comment` /
+    :meth:`remove_task`. A search during the build waits up to ``BUILD_WAIT_SECONDS`` for
+    it, then answers from a bounded scan instead (see :meth:`_scan`); tasks written during
+    the build are noted and re-indexed from ``lookup(task_id)`` before it is swapped in.
+    """
+
+    _STATE = ("_postings", "_doc_terms", "_doc_length", "_total_length", "_facets", "_facet_docs", "_vocabulary")
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable],
+        comments: Callable[[str], Iterable[str]],
+        lookup: Callable[[str], Optional[object]] = lambda task_id: None,
+    ):
+        self._loader = loader
+        self._comments = comments
+        self._lookup = lookup
+        self._lock = threading.RLock()
+        self._built = False
+        self._building = False
+        # Set once a build is swapped in, for searches waiting on it
+        self._ready = threading.Event()
+        # Bumped by reset, so a build of replaced data is thrown away
+        self._generation = 0
+        self._dirty: set = set()
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_length: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._facets: Dict[str, Tuple[Optional[str], ...]] = {}
+        # facet name -> value -> task ids, for filtering without visiting every match
+        self._facet_docs: Dict[str, Dict[str, set]] = {name: {} for name in FACETS}
+        self._vocabulary: List[str] = []
+
+    def reset(self):
+        """
+        Drop everything; the next search starts a rebuild from the loader.
+        """
+        with self._lock:
+            self._built = False
+            self._ready.clear()
+            self._generation += 1
+            self._dirty.clear()
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_length.clear()
+            self._total_length = 0.0
+            self._facets.clear()
+            for docs in self._facet_docs.values():
+                docs.clear()
+            self._vocabulary = []
+
+    def start_build(self):
+        """
+        Build the index in a daemon thread unless it is built or being built.
+        """
+        with self._lock:
+            if self._built or self._building:
+                return
+            self._building = True
+            generation = self._generation
+            tasks = list(self._loader())
+        threading.Thread(target=self._build, args=(generation, tasks), name="task-search-index", daemon=True).start()
+
+    def _build(self, generation: int, tasks: List):
+        try:
+            # Tokenize outside the lock so searches and writes carry on meanwhile
+            fresh = TaskSearchIndex(self._loader, self._comments)
+            for task in tasks:
+                fresh._add(task)
+            fresh._vocabulary = sorted(fresh._postings)
+            with self._lock:
+                if generation != self._generation:
+                    return
+                for name in self._STATE:
+                    setattr(self, name, getattr(fresh, name))
+                self._built = True
+                self._ready.set()
+                for task_id in self._dirty:
+                    self._remove(task_id)
+                    task = self._lookup(task_id)
+                    if task is not None:
+                        self._add(task)
+                self._dirty.clear()
+        finally:
+            with self._lock:
+                self._building = False
+
+    def _postings_for(self, term: str) -> Dict[str, float]:
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            if self._built:
+                insort(self._vocabulary, term)
+        return postings
+
+    def _add_terms(self, task_id: str, terms: Dict[str, float]):
+        doc_terms = self._doc_terms.get(task_id)
+        if doc_terms is None:
+            # New document: ``terms`` becomes its term vector as is
+            self._doc_terms[task_id] = terms
+            all_postings = self._postings
+            for term, weight in terms.items():
+                postings = all_postings.get(term)
+                if postings is None:
+                    postings = self._postings_for(term)
+                postings[task_id] = weight
+        else:
+            for term, weight in terms.items():
+                postings = self._postings_for(term)
+                postings[task_id] = postings.get(task_id, 0.0) + weight
+                doc_terms[term] = doc_terms.get(term, 0.0) + weight
+        added = sum(terms.values())
+        self._doc_length[task_id] = self._doc_length.get(task_id, 0.0) + added
+        self._total_length += added
+
+    def _add(self, task):
+        task_id = str(task.id)
+        terms: Dict[str, float] = {}
+        fields = [(task.title, TITLE_WEIGHT), (task.description, DESCRIPTION_WEIGHT)]
+        fields += [(label, LABEL_WEIGHT) for label in (getattr(task, "labels", None) or [])]
+        fields += [(message, COMMENT_WEIGHT) for message in self._comments(task_id)]
+        for text, weight in fields:
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        self._add_terms(task_id, terms)
+        values = tuple(_facet_value(getattr(task, name, None)) for name in FACETS)
+        self._facets[task_id] = values
+        for name, value in zip(FACETS, values):
+            self._facet_docs[name].setdefault(value, set()).add(task_id)
+
+    def _remove(self, task_id: str):
+        for term, weight in self._doc_terms.pop(task_id, {}).items():
+            postings = self._postings[term]
+            del postings[task_id]
+            if not postings:
+                del self._postings[term]
+                i = bisect_left(self._vocabulary, term)
+                if i < len(self._vocabulary) and self._vocabulary[i] == term:
+                    del self._vocabulary[i]
+            self._total_length -= weight
+        self._doc_length.pop(task_id, None)
+        values = self._facets.pop(task_id, None)
+        if values is not None:
+            for name, value in zip(FACETS, values):
+                docs = self._facet_docs[name][value]
+                docs.discard(task_id)
+                if not docs:
+                    del self._facet_docs[name][value]
+
+    def index_task(self, task):
+        """
+        Add or re-index a task after it was created or updated.
+        """
+        with self._lock:
+            if self._built:
+                self._remove(str(task.id))
+                self._add(task)
+            elif self._building:
+                self._dirty.add(str(task.id))
+
+    def add_comment(self, task_id: str, message: str):
+        """
+        Index one new comment without re-tokenizing the rest of the task.
+        """
+        with self._lock:
+            if self._built and task_id in self._facets:
+                terms: Dict[str, float] = {}
+                for token in tokenize(message):
+                    terms[token] = terms.get(token, 0.0) + COMMENT_WEIGHT
+                self._add_terms(task_id, terms)
+            elif self._building:
+                self._dirty.add(str(task_id))
+
+    def remove_task(self, task_id: str):
+        with self._lock:
+            if self._built:
+                self._remove(str(task_id))
+            elif self._building:
+                self._dirty.add(str(task_id))
+
+    def _expand(self, term: str, is_prefix: bool) -> List[str]:
+        if not is_prefix:
+            return [term] if term in self._postings else []
+        vocabulary = self._vocabulary
+        matches = []
+        for i in range(bisect_left(vocabulary, term), len(vocabulary)):
+            if not vocabulary[i].startswith(term):
+                break
+            matches.append(vocabulary[i])
+        return matches
+
+    def _term_scores(self, expansions: List[str]) -> Dict[str, float]:
+        """
+        BM25 contribution of one query term; a document matching several expansions of a
+        prefix keeps its best one.
+        """
+        total_docs = len(self._facets)
+        average_length = self._total_length / total_docs if total_docs else 1.0
+        scores: Dict[str, float] = {}
+        doc_length = self._doc_length
+        base = BM25_K1 * (1 - BM25_B)
+        scale = BM25_K1 * BM25_B / average_length
+        for term in expansions:
+            postings = self._postings[term]
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (BM25_K1 + 1)
+            if not scores:
+                scores = {
+                    task_id: boost * tf / (tf + base + scale * doc_length[task_id])
+                    for task_id, tf in postings.items()
+                }
+                continue
+            for task_id, tf in postings.items():
+                score = boost * tf / (tf + base + scale * doc_length[task_id])
+                if score > scores.get(task_id, 0.0):
+                    scores[task_id] = score
+        return scores
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, str]] = None,
+        skip: int = 0,
+        limit: int = 20,
+        prefix: bool = True,
+    ) -> Tuple[int, List[Tuple[str, float]], Dict[str, Dict[str, int]]]:
+        """
+        Return ``(total, [(task_id, score)], facets)`` for tasks matching every term.
+
+        ``filters`` narrow on facet fields; facet counts cover the filtered matches.
+        Without a query every task matches with score 0, in insertion order.
+        """
+        if not self._built:
+            self.start_build()
+            if not self._ready.wait(BUILD_WAIT_SECONDS):
+                return self._scan(query, filters, skip, limit, prefix)
+        with self._lock:
+            terms = parse_query(query, prefix)
+            if terms:
+                expanded = [self._expand(term, is_prefix) for term, is_prefix in terms]
+                # Rarest term first keeps the running intersection small
+                expanded.sort(key=lambda terms: sum(len(self._postings[t]) for t in terms))
+                scores: Dict[str, float] = {}
+                for i, expansions in enumerate(expanded):
+                    term_scores = self._term_scores(expansions)
+                    if i == 0:
+                        scores = term_scores
+                    else:
+                        scores = {
+                            task_id: score + term_scores[task_id]
+                            for task_id, score in scores.items()
+                            if task_id in term_scores
+                        }
+                    if not scores:
+                        break
+            else:
+                scores = dict.fromkeys(self._facets, 0.0)
+
+            matched = list(scores)
+            for name, value in (filters or {}).items():
+                if value is not None:
+                    allowed = self._facet_docs[name].get(value, ())
+                    matched = [task_id for task_id in matched if task_id in allowed]
+            facets = _facet_counts(map(self._facets.__getitem__, matched))
+            top = heapq.nlargest(skip + limit, matched, key=scores.__getitem__)[skip:]
+            return len(matched), [(task_id, scores[task_id]) for task_id in top], facets
+
+    def _scan(
+        self, query: Optional[str], filters: Optional[Dict[str, str]], skip: int, limit: int, prefix: bool
+    ) -> Tuple[int, List[Tuple[str, float]], Dict[str, Dict[str, int]]]:
+        """
+        :meth:`search` without the index, every match scoring 0. Only the first
+        ``SCAN_LIMIT`` tasks are checked, and the scan stops once the requested page is
+        full, so ``total`` and the facets count the matches found so far.
+        """
+        terms = parse_query(query, prefix)
+        wanted = [(FACETS.index(name), value) for name, value in (filters or {}).items() if value is not None]
+        matched: List[str] = []
+        rows = []
+        for task in islice(list(self._loader()), SCAN_LIMIT):
+            task_id = str(task.id)
+            values = tuple(_facet_value(getattr(task, name, None)) for name in FACETS)
+            if any(values[i] != value for i, value in wanted):
+                continue
+            if terms:
+                tokens = set(tokenize(task.title)) | set(tokenize(task.description))
+                for text in (getattr(task, "labels", None) or []):
+                    tokens.update(tokenize(text))
+                for message in self._comments(task_id):
+                    tokens.update(tokenize(message))
+                if not all(
+                    any(token.startswith(term) for token in tokens) if is_prefix else term in tokens
+                    for term, is_prefix in terms
+                ):
+                    continue
+            matched.append(task_id)
+            rows.append(values)
+            if len(matched) >= skip + limit:
+                break
+        return len(matched), [(task_id, 0.0) for task_id in matched[skip:skip + limit]], _facet_counts(rows)
+
+
+def _facet_counts(rows: Iterable[Tuple[Optional[str], ...]]) -> Dict[str, Dict[str, int]]:
+    rows = list(rows)
+    facets = {}
+    for i, name in enumerate(FACETS):
+        counts = Counter(map(itemgetter(i), rows))
+        counts.pop(None, None)
+        facets[name] = dict(counts)
+    return facets
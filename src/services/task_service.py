@@ -1,17 +1,33 @@
+from sqlalchemy import String, and_, cast, delete, func, insert, literal, literal_column, or_, select, tuple_, update
 from sqlalchemy.orm import Session
-from src.database.models import Task, TaskComment
+from src.database.models import Task, TaskComment, task_search
+from src.models.attachment import AttachmentOwnerType
 from src.models.task import TaskCreate, TaskUpdate, TaskCommentCreate
+from src.services.attachment_service import delete_owned_attachments, release_blobs
+from src.services.kpi_service import refresh_campaign_kpis
+from src.services.purge_service import live_conditions, soft_delete_tasks
+from src.services.task_search import COMMENT_WEIGHT, DESCRIPTION_WEIGHT, FACETS, LABEL_WEIGHT, TITLE_WEIGHT, parse_query
 from datetime import datetime
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+# Text search configuration for to_tsvector/to_tsquery (stemming and stop words)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+# API facet name -> column
+_FACET_COLUMNS = {
+    "status": Task.status,
+    "priority": Task.priority,
+    "assigned_to": Task.assignee_id,
+    "campaign_id": Task.campaign_id,
+}
 
 
 def get_task(db: Session, task_id: str):
-    return db.query(Task).filter(Task.id == task_id).first()
+    return db.query(Task).filter(Task.id == task_id, *live_conditions(Task)).first()
 
 
 def get_tasks(db: Session, skip: int = 0, limit: int = 100, campaign_id: Optional[str] = None, status: Optional[str] = None):
-    query = db.query(Task)
+    query = db.query(Task).filter(*live_conditions(Task))
     if campaign_id:
         query = query.filter(Task.campaign_id == campaign_id)
     if status:
@@ -29,9 +45,13 @@ def create_task(db: Session, task: TaskCreate):
         status=task.status,
         priority=task.priority,
         due_date=task.due_date,
-        assignee_id=task.assignee_id
+        assignee_id=task.assigned_to,
+        labels=task.labels
     )
     db.add(db_task)
+    db.flush()
+    _refresh_search_vector(db, db_task.id)
+    refresh_campaign_kpis(db, db_task.campaign_id)
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -43,10 +63,17 @@ def update_task(db: Session, task_id: str, task_update: TaskUpdate):
         return None
     
     update_data = task_update.dict(exclude_unset=True)
+    if "assigned_to" in update_data:
+        update_data["assignee_id"] = update_data.pop("assigned_to")
     for key, value in update_data.items():
         setattr(db_task, key, value)
     
+    db_task.version = (db_task.version or 1) + 1
     db_task.updated_at = datetime.utcnow()
+    db.flush()
+    _refresh_search_vector(db, task_id)
+    if "status" in update_data:
+        refresh_campaign_kpis(db, db_task.campaign_id)
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -57,8 +84,12 @@ def delete_task(db: Session, task_id: str):
     if not db_task:
         return None
     
-    db.delete(db_task)
+    # Hidden at once; the purge job deletes the row and its comments later
+    soft_delete_tasks(db, Task.id == task_id)
+    released = delete_owned_attachments(db, AttachmentOwnerType.task, [task_id])
+    refresh_campaign_kpis(db, db_task.campaign_id)
     db.commit()
+    release_blobs(db, released)
     return db_task
 
 
@@ -74,10 +105,242 @@ def add_task_comment(db: Session, task_id: str, comment: TaskCommentCreate):
         body=comment.message
     )
     db.add(db_comment)
+    db_task.version = (db_task.version or 1) + 1
+    db.flush()
+    _refresh_search_vector(db, task_id)
     db.commit()
     db.refresh(db_comment)
     return db_comment
 
 
-def get_task_comments(db: Session, task_id: str):
-    return db.query(TaskComment).filter(TaskComment.task_id == task_id).all()
\ No newline at end of file
+def get_task_comments(db: Session, task_id: str, after: Optional[Tuple[datetime, str]] = None, limit: int = 50):
+    """
+    Return ``(total, comments, has_more)`` for one page of a task's comments, oldest first,
+    starting after the ``(created_at, id)`` key ``after``; None if the task does not exist.
+    """
+    if not get_task(db, task_id):
+        return None
+    total = db.query(func.count(TaskComment.id)).filter(TaskComment.task_id == task_id).scalar()
+    query = db.query(TaskComment).filter(TaskComment.task_id == task_id)
+    if after is not None:
+        created_at, comment_id = after
+        query = query.filter(or_(
+            TaskComment.created_at > created_at,
+            and_(TaskComment.created_at == created_at, TaskComment.id > comment_id),
+        ))
+    rows = query.order_by(TaskComment.created_at, TaskComment.id).limit(limit + 1).all()
+    return total, rows[:limit], len(rows) > limit
+
+
+def get_comment_summaries(db: Session, task_ids: List[str]) -> Dict[str, Tuple[int, TaskComment]]:
+    """
+    Comment count and latest comment of each task that has any, in two queries for the
+    whole batch rather than loading every task's thread.
+    """
+    if not task_ids:
+        return {}
+    counts = dict(
+        db.query(TaskComment.task_id, func.count(TaskComment.id))
+        .filter(TaskComment.task_id.in_(task_ids))
+        .group_by(TaskComment.task_id)
+    )
+    if not counts:
+        return {}
+    ranked = (
+        select(
+            TaskComment.id,
+            func.row_number().over(
+                partition_by=TaskComment.task_id,
+                order_by=(TaskComment.created_at.desc(), TaskComment.id.desc()),
+            ).label("position"),
+        )
+        .where(TaskComment.task_id.in_(list(counts)))
+        .subquery()
+    )
+    latest = db.query(TaskComment).join(ranked, ranked.c.id == TaskComment.id).filter(ranked.c.position == 1)
+    return {str(comment.task_id): (counts[comment.task_id], comment) for comment in latest}
+
+
+def _search_document():
+    """
+    tsvector expression for a task row: title and labels rank highest, then the
+    description, then comments.
+    """
+    comments = (
+        select(func.string_agg(TaskComment.body, " "))
+        .where(TaskComment.task_id == Task.id)
+        .scalar_subquery()
+    )
+    parts = [
+        (func.coalesce(Task.title, ""), "A"),
+        (func.coalesce(func.array_to_string(Task.labels, " "), ""), "A"),
+        (func.coalesce(Task.description, ""), "B"),
+        (func.coalesce(comments, ""), "C"),
+    ]
+    document = None
+    for text, weight in parts:
+        vector = func.setweight(func.to_tsvector(SEARCH_CONFIG, text), literal_column(f"'{weight}'"))
+        document = vector if document is None else document.op("||")(vector)
+    return document
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _replace_search_rows(db: Session, *conditions):
+    """
+    Rewrite the SQLite FTS5 rows of the tasks matching ``conditions``.
+    """
+    comments = (
+        select(func.group_concat(TaskComment.body, " "))
+        .where(TaskComment.task_id == Task.id)
+        .scalar_subquery()
+    )
+    db.execute(delete(task_search).where(task_search.c.task_id.in_(select(Task.id).where(*conditions))))
+    db.execute(insert(task_search).from_select(
+        ["task_id", "title", "labels", "description", "comments"],
+        select(Task.id, Task.title, cast(Task.labels, String), Task.description, comments).where(*conditions),
+    ))
+
+
+def _search_vector_values():
+    # Keep updated_at as is: refreshing the index is not a change to the task
+    return {"search_vector": _search_document(), "updated_at": Task.updated_at}
+
+
+def _refresh_search_vector(db: Session, task_id: str):
+    # Part of the write's transaction, so the index never lags the row
+    if _is_postgresql(db):
+        db.execute(
+            update(Task).where(Task.id == task_id).values(_search_vector_values()),
+            execution_options={"synchronize_session": False},
+        )
+    elif _is_sqlite(db):
+        _replace_search_rows(db, Task.id == task_id)
+
+
+def rebuild_search_index(db: Session):
+    """
+    Recompute every task's search vector, or SQLite search row, in one statement (after
+    bulk loads).
+    """
+    if _is_postgresql(db):
+        db.execute(
+            update(Task).values(_search_vector_values()),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    elif _is_sqlite(db):
+        db.execute(delete(task_search))
+        _replace_search_rows(db)
+        db.commit()
+
+
+def ensure_search_index(db: Session):
+    """
+    Backfill the SQLite search table when it is out of step with the tasks (e.g. a
+    database created before the table existed).
+    """
+    if _is_sqlite(db):
+        tasks = db.query(func.count(Task.id)).scalar()
+        if tasks != db.execute(select(func.count()).select_from(task_search)).scalar():
+            rebuild_search_index(db)
+
+
+def _fts5_query(terms: List[Tuple[str, bool]]) -> str:
+    # Terms are [a-z0-9]+ tokens, so quoting them is all the escaping FTS5 needs
+    return " AND ".join(f'"{term}"*' if is_prefix else f'"{term}"' for term, is_prefix in terms)
+
+
+def _match_condition(db: Session, terms: List[Tuple[str, bool]]):
+    """
+    Return ``(condition, rank)`` requiring every term.
+
+    PostgreSQL uses the GIN-indexed tsvector and SQLite its FTS5 table, ranked with BM25
+    and the in-memory index's field weights; other databases fall back to a
+    case-insensitive substring scan with no ranking.
+    """
+    if _is_postgresql(db):
+        tsquery = func.to_tsquery(
+            SEARCH_CONFIG, " & ".join(f"{term}:*" if is_prefix else term for term, is_prefix in terms)
+        )
+        return Task.search_vector.op("@@")(tsquery), func.ts_rank_cd(Task.search_vector, tsquery)
+    if _is_sqlite(db):
+        fts = literal_column("task_search")
+        # bm25() is lower for better matches
+        ranked = (
+            select(
+                task_search.c.task_id,
+                (-func.bm25(fts, 0.0, TITLE_WEIGHT, LABEL_WEIGHT, DESCRIPTION_WEIGHT, COMMENT_WEIGHT)).label("score"),
+            )
+            .where(fts.op("MATCH")(_fts5_query(terms)))
+            .subquery()
+        )
+        # An implicit join: the full-text query runs once, however the rows are used
+        return ranked.c.task_id == Task.id, ranked.c.score
+    conditions = []
+    for term, _ in terms:
+        pattern = f"%{term}%"
+        conditions.append(or_(
+            Task.title.ilike(pattern),
+            Task.description.ilike(pattern),
+            cast(Task.labels, String).ilike(pattern),
+            Task.comments.any(TaskComment.body.ilike(pattern)),
+        ))
+    return and_(*conditions), literal(0.0)
+
+
+def _facet_counts(db: Session, conditions) -> Dict[str, Dict[str, int]]:
+    facets: Dict[str, Dict[str, int]] = {name: {} for name in FACETS}
+    columns = [_FACET_COLUMNS[name] for name in FACETS]
+    if _is_postgresql(db):
+        # One pass over the matches for all four facets
+        rows = (
+            db.query(*columns, func.count())
+            .filter(*conditions)
+            .group_by(func.grouping_sets(*(tuple_(column) for column in columns)))
+            .all()
+        )
+    else:
+        rows = []
+        for i, column in enumerate(columns):
+            for value, count in db.query(column, func.count()).filter(*conditions).group_by(column):
+                row = [None] * len(columns)
+                row[i] = value
+                rows.append((*row, count))
+    for *values, count in rows:
+        for name, value in zip(FACETS, values):
+            if value is not None:
+                facets[name][str(getattr(value, "value", value))] = count
+    return facets
+
+
+def search_tasks(
+    db: Session, query: Optional[str] = None, skip: int = 0, limit: int = 20, prefix: bool = True, **filters
+):
+    """
+    Return ``(total, [(task, score)], facets)`` for tasks matching every query term.
+    """
+    conditions = live_conditions(Task) + [
+        _FACET_COLUMNS[name] == value for name, value in filters.items() if value is not None
+    ]
+    terms = parse_query(query, prefix)
+    rank = literal(0.0)
+    if terms:
+        match, rank = _match_condition(db, terms)
+        conditions.append(match)
+    total = db.query(func.count(Task.id)).filter(*conditions).scalar()
+    rows = (
+        db.query(Task, rank.label("score"))
+        .filter(*conditions)
+        .order_by(rank.desc(), Task.created_at, Task.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return total, [(task, float(score)) for task, score in rows], _facet_counts(db, conditions)
@@ -1,6 +1,11 @@
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from src.database.models import Well
+from src.database.models import Task, Well
+from src.models.attachment import AttachmentOwnerType
 from src.models.well import WellCreate, WellUpdate
+from src.services.attachment_service import delete_owned_attachments, release_blobs
+from src.services.kpi_service import refresh_campaign_kpis
+from src.services.purge_service import soft_delete_tasks
 import uuid
 from typing import List, Optional
 
@@ -28,6 +33,8 @@ def create_well(db: Session, well: WellCreate):
         actual_td_m=well.actual_td_m
     )
     db.add(db_well)
+    db.flush()
+    refresh_campaign_kpis(db, db_well.campaign_id)
     db.commit()
     db.refresh(db_well)
     return db_well
@@ -38,20 +45,34 @@ def update_well(db: Session, well_id: str, well_update: WellUpdate):
     if not db_well:
         return None
     
+    previous_campaign_id = db_well.campaign_id
     update_data = well_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_well, key, value)
     
+    db.flush()
+    refresh_campaign_kpis(db, previous_campaign_id, db_well.campaign_id)
     db.commit()
     db.refresh(db_well)
     return db_well
 
 
 def delete_well(db: Session, well_id: str):
+    """
+    Delete a well without loading its tasks: they are soft-deleted and detached in one
+    statement and purged later. Attachments of the well and its tasks go at once.
+    """
     db_well = get_well(db, well_id)
     if not db_well:
         return None
     
-    db.delete(db_well)
+    db.expunge(db_well)
+    # Before the tasks are detached from the well
+    released = delete_owned_attachments(db, AttachmentOwnerType.task, select(Task.id).where(Task.well_id == well_id))
+    released += delete_owned_attachments(db, AttachmentOwnerType.well, [well_id])
+    soft_delete_tasks(db, Task.well_id == well_id, detach=True)
+    db.execute(delete(Well).where(Well.id == well_id), execution_options={"synchronize_session": False})
+    refresh_campaign_kpis(db, db_well.campaign_id)
     db.commit()
+    release_blobs(db, released)
     return db_well
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Attachment uploads and downloads (src.api.attachments) over the content-addressed blob
+store, and blobs being released when their owners are deleted.
+"""
+
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.api import attachments
+from src.main import app
+from src.models.attachment import AttachmentCreate, AttachmentOwnerType
+from src.services import attachment_service, campaign_service, mock_services, task_service
+from src.services.blob_store import blob_store
+from src.services.seed import generate_portfolio, load_database, parse_scale
+
+
+@pytest.fixture
+def blobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "directory", str(tmp_path))
+    monkeypatch.setattr(blob_store, "temporary_directory", str(tmp_path / "tmp"))
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def client():
+    mock_services.load_portfolio(generate_portfolio(parse_scale("small"), 0))
+    return TestClient(app)
+
+
+def _stored(directory):
+    return sorted(name for _, _, names in os.walk(directory / "sha256") for name in names)
+
+
+def _upload(client, owner_id, body, owner_type="task", **headers):
+    params = {
+        "owner_type": owner_type,
+        "owner_id": owner_id,
+        "filename": "log.txt",
+        "uploaded_by": next(iter(mock_services.mock_users)),
+    }
+    return client.post("/attachments/", params=params, content=body, headers=headers)
+
+
+def _owner(kind):
+    return next(iter({"task": mock_services.mock_tasks, "well": mock_services.mock_wells}[kind]))
+
+
+def test_same_content_is_stored_once(client, blobs):
+    first = _upload(client, _owner("task"), b"drilling report")
+    second = _upload(client, _owner("well"), b"drilling report", owner_type="well")
+    assert first.status_code == second.status_code == 201
+    digest = hashlib.sha256(b"drilling report").hexdigest()
+    assert first.json()["sha256"] == second.json()["sha256"] == digest
+    assert _stored(blobs) == [digest]
+
+    # The blob stays until its last attachment is deleted
+    assert client.delete(f"/attachments/{first.json()['id']}").status_code == 204
+    assert _stored(blobs) == [digest]
+    assert client.delete(f"/attachments/{second.json()['id']}").status_code == 204
+    assert _stored(blobs) == []
+
+
+def test_oversize_uploads_are_rejected_and_cleaned_up(client, blobs, monkeypatch):
+    monkeypatch.setattr(attachments, "MAX_ATTACHMENT_SIZE", 10)
+    # Rejected up front from the declared length
+    assert _upload(client, _owner("task"), b"x" * 11).status_code == 413
+    # Rejected while streaming a chunked body, with the partial upload removed
+    response = _upload(client, _owner("task"), iter([b"x" * 6, b"x" * 6]))
+    assert response.status_code == 413
+    assert os.listdir(blobs / "tmp") == []
+    assert not (blobs / "sha256").exists()
+
+
+def test_get_and_head_serve_the_content(client, blobs):
+    attachment = _upload(client, _owner("task"), b"0123456789", **{"content-type": "text/plain"})
+    url = f"/attachments/{attachment.json()['id']}/content"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["etag"] == f'"{attachment.json()["sha256"]}"'
+
+    head = client.head(url)
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["content-length"] == "10"
+    assert head.headers["etag"] == response.headers["etag"]
+
+    ranged = client.get(url, headers={"Range": "bytes=2-4"})
+    assert (ranged.status_code, ranged.content) == (206, b"234")
+    assert client.get("/attachments/missing/content").status_code == 404
+    # HEAD is served but not documented as a second operation
+    operations = client.get("/openapi.json").json()["paths"]["/attachments/{attachment_id}/content"]
+    assert list(operations) == ["get"]
+
+
+def test_deleting_an_owner_releases_its_blobs(client, blobs):
+    task_id, other_id = list(mock_services.mock_tasks)[-2:]
+    _upload(client, task_id, b"only here")
+    _upload(client, task_id, b"shared")
+    _upload(client, other_id, b"shared")
+    assert len(_stored(blobs)) == 2
+
+    assert client.delete(f"/tasks/{task_id}").status_code == 204
+    listed = client.get("/attachments/", params={"owner_type": "task", "owner_id": task_id})
+    assert listed.json() == []
+    assert _stored(blobs) == [hashlib.sha256(b"shared").hexdigest()]
+
+
+def test_sql_campaign_delete_releases_blobs_of_its_wells_and_tasks(blobs):
+    portfolio = generate_portfolio(parse_scale("small"), 0)
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    load_database(portfolio, engine)
+    campaign = portfolio["campaigns"][0]["id"]
+    task = next(row for row in portfolio["tasks"] if row["campaign_id"] == campaign)
+    well = next(row for row in portfolio["wells"] if row["campaign_id"] == campaign)
+    kept = next(row for row in portfolio["tasks"] if row["campaign_id"] != campaign)
+
+    with Session(bind=engine) as db:
+        for owner_type, owner_id, body in [
+            (AttachmentOwnerType.campaign, campaign, b"campaign"),
+            (AttachmentOwnerType.well, well["id"], b"well"),
+            (AttachmentOwnerType.task, task["id"], b"task"),
+            (AttachmentOwnerType.task, kept["id"], b"task"),
+        ]:
+            writer = blob_store.writer()
+            writer.write(body)
+            blob = writer.commit()
+            attachment_service.create_attachment(
+                db,
+                AttachmentCreate(
+                    owner_type=owner_type,
+                    owner_id=owner_id,
+                    filename="f",
+                    content_type="text/plain",
+                    uploaded_by=portfolio["users"][0]["id"],
+                    size=blob.size,
+                    sha256=blob.sha256,
+                    s3_key=blob.key,
+                ),
+            )
+        assert len(_stored(blobs)) == 3
+
+        campaign_service.delete_campaign(db, campaign)
+        assert _stored(blobs) == [hashlib.sha256(b"task").hexdigest()]
+        owners = [
+            (a.owner_type, a.owner_id)
+            for a in attachment_service.get_attachments(db, "task", kept["id"])
+        ]
+        assert owners == [("task", kept["id"])]
+
+        task_service.delete_task(db, kept["id"])
+        assert _stored(blobs) == []
+    engine.dispose()
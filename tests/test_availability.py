@@ -0,0 +1,178 @@
+"""
+Blocked-day calendars (backend.calc.availability) against brute force, and the
+maintenance-clash detection that uses them (backend.calc.engine.detect_conflicts).
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from backend.calc import engine
+from backend.calc.availability import BlockedCalendar, DayBitset, next_free
+from backend.calc.engine import detect_conflicts
+
+BASE = date(2025, 1, 1)
+
+
+def _random_bitset(rng, days):
+    bitset, blocked = DayBitset(), set()
+    for _ in range(rng.randrange(6)):
+        start = rng.randrange(days)
+        end = start + rng.randrange(1, 80)
+        bitset.add(start, end)
+        blocked.update(range(start, end))
+    return bitset, blocked
+
+
+def _brute_next_free(start, length, blocked):
+    t = start
+    while any(day in blocked for day in range(t, t + max(length, 1))):
+        t += 1
+    return t
+
+
+def test_next_free_matches_brute_force():
+    rng = random.Random(0)
+    mismatches = 0
+    for _ in range(3000):
+        days = rng.choice([64, 200, 600])
+        bitsets, blocked = [], set()
+        for _ in range(rng.randrange(4)):
+            bitset, days_blocked = _random_bitset(rng, days)
+            bitsets.append(bitset)
+            blocked |= days_blocked
+        start = rng.randrange(days)
+        length = rng.randrange(0, 70)
+        if next_free(start, length, bitsets) != _brute_next_free(start, length, blocked):
+            mismatches += 1
+    assert mismatches == 0
+
+
+def test_bitset_queries_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(500):
+        bitset, blocked = _random_bitset(rng, 300)
+        start = rng.randrange(-10, 400)
+        end = start + rng.randrange(0, 150)
+        inside = [day for day in range(start, end) if day in blocked]
+        assert bitset.last_in(start, end) == (inside[-1] if inside else None)
+        assert bitset.intersects(start, end) == bool(inside)
+
+
+def test_calendar_blocks_windows_inclusively():
+    calendar = BlockedCalendar(
+        [{"platform_id": "pf1", "start_date": BASE, "end_date": BASE + timedelta(days=2)}]
+    )
+    day = BASE.toordinal()
+    assert not calendar.is_free(("platform", "pf1"), day + 2, day + 3)
+    assert calendar.is_free(("platform", "pf1"), day + 3, day + 10)
+    assert calendar.is_free(("platform", "other"), day, day + 3)
+    assert calendar.next_free(day - 1, 2, ("platform", "pf1")) == day + 3
+    assert calendar.touching(("platform", "pf1"), [(day - 5, day), (day - 1, day + 1)]) == [1]
+
+
+def _brute_conflicts(projects, windows):
+    """Every rig double booking and maintenance clash, by comparing all pairs."""
+    conflicts = []
+    for i, a in enumerate(projects):
+        for b in projects[i + 1 :]:
+            if a.get("rig_id") and a.get("rig_id") == b.get("rig_id"):
+                first, second = sorted([a, b], key=lambda p: p["planned_start"])
+                if first["planned_end"] > second["planned_start"]:
+                    conflicts.append(("rig", a["rig_id"], first["id"], second["id"]))
+    for w in windows:
+        scope = "platform_id" if w.get("platform_id") else "rig_id"
+        for p in projects:
+            clashes = p["planned_start"] <= w["end_date"] and w["start_date"] < p["planned_end"]
+            if p.get(scope) == w[scope] and clashes:
+                conflicts.append(("maintenance", w["id"], p["id"]))
+    return conflicts
+
+
+def _key(conflict):
+    if conflict["type"] == "rig_double_booking":
+        return ("rig", conflict["rig_id"], *conflict["project_ids"])
+    return ("maintenance", conflict["window_id"], conflict["project_id"])
+
+
+def _schedule(rng, projects=60, windows=40):
+    project_list = []
+    for i in range(projects):
+        start = BASE + timedelta(days=rng.randrange(200))
+        project_list.append(
+            {
+                "id": f"p{i}",
+                "planned_start": start,
+                "planned_end": start + timedelta(days=rng.randrange(0, 30)),
+                "rig_id": f"r{rng.randrange(5)}" if rng.random() < 0.8 else None,
+                "platform_id": f"pf{rng.randrange(3)}",
+            }
+        )
+    window_list = []
+    for i in range(windows):
+        start = BASE + timedelta(days=rng.randrange(220))
+        scope = (
+            {"platform_id": f"pf{rng.randrange(3)}"}
+            if rng.random() < 0.5
+            else {"rig_id": f"r{rng.randrange(5)}"}
+        )
+        window_list.append(
+            {
+                "id": f"w{i}",
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randrange(7)),
+                **scope,
+            }
+        )
+    return project_list, window_list
+
+
+@pytest.mark.parametrize("calendar_from", [engine.CALENDAR_MIN_WINDOWS, 1, 10**9])
+def test_detect_conflicts_matches_brute_force(monkeypatch, calendar_from):
+    # Both the direct comparison and the calendar prefilter find every clash
+    monkeypatch.setattr(engine, "CALENDAR_MIN_WINDOWS", calendar_from)
+    rng = random.Random(calendar_from)
+    for _ in range(30):
+        projects, windows = _schedule(rng)
+        found = sorted(map(_key, detect_conflicts(projects, windows)))
+        assert found == sorted(_brute_conflicts(projects, windows))
+
+
+def test_detect_conflicts_reports_each_kind():
+    projects = [
+        {"id": "a", "planned_start": BASE, "planned_end": BASE + timedelta(days=5), "rig_id": "r1"},
+        {
+            "id": "b",
+            "planned_start": BASE + timedelta(days=4),
+            "planned_end": BASE + timedelta(days=8),
+            "rig_id": "r1",
+            "platform_id": "pf1",
+        },
+        # Starts the day b finishes: no overlap
+        {
+            "id": "c",
+            "planned_start": BASE + timedelta(days=8),
+            "planned_end": BASE + timedelta(days=9),
+            "rig_id": "r1",
+        },
+    ]
+    windows = [
+        {
+            "id": "w1",
+            "platform_id": "pf1",
+            "start_date": BASE + timedelta(days=7),
+            "end_date": BASE + timedelta(days=7),
+        },
+        # Starts the day c finishes: no clash
+        {
+            "id": "w2",
+            "rig_id": "r1",
+            "start_date": BASE + timedelta(days=9),
+            "end_date": BASE + timedelta(days=9),
+        },
+    ]
+    assert detect_conflicts(projects, windows) == [
+        {"type": "rig_double_booking", "rig_id": "r1", "project_ids": ["a", "b"]},
+        {"type": "maintenance_clash", "platform_id": "pf1", "project_id": "b", "window_id": "w1"},
+    ]
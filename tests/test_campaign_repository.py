@@ -0,0 +1,64 @@
+"""
+Campaigns read through the SQL repository (src.repositories.sql): progress from the
+materialized KPI rows, and days elapsed current even for cached campaigns.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import CampaignKpi
+from src.repositories.sql import SqlRepository
+from src.services import campaign_kpis
+from src.services.entity_cache import campaign_cache
+from src.services.seed import generate_portfolio, load_database, parse_scale
+
+
+@pytest.fixture
+def repo():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    load_database(generate_portfolio(parse_scale("small"), 0), engine)
+    campaign_cache.invalidate()
+    with Session(bind=engine) as db:
+        yield SqlRepository(db)
+    campaign_cache.invalidate()
+    engine.dispose()
+
+
+def test_campaign_pages_read_progress_from_kpi_rows(repo):
+    kpis = {kpi.campaign_id: kpi.progress_pct for kpi in repo.get_campaign_kpis(limit=1000)}
+    statements = []
+    event.listen(repo.db.get_bind(), "before_cursor_execute", lambda *args: statements.append(1))
+    campaigns = repo.get_campaigns(limit=1000)
+    # One query for the page and one for all of its KPI rows
+    assert len(statements) == 2
+    assert len(campaigns) == len(kpis)
+    assert all(campaign.progress_pct == kpis[campaign.id] for campaign in campaigns)
+
+    # The KPI row is what is reported, even where it differs from the campaign's depths
+    campaign_id = campaigns[0].id
+    repo.db.query(CampaignKpi).filter(CampaignKpi.campaign_id == campaign_id).update(
+        {"progress_pct": 12.5}
+    )
+    assert repo.get_campaigns(limit=1)[0].progress_pct == 12.5
+
+
+def test_cached_campaigns_follow_todays_date(repo, monkeypatch):
+    campaign = repo.get_campaigns(limit=1)[0]
+    assert repo.get_campaign(campaign.id) == campaign
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(campaign_kpis, "date", Tomorrow)
+    # Served from the cache, with days elapsed counted to the new date
+    assert campaign_cache.stats()["size"] == 1
+    assert repo.get_campaign(campaign.id).days_elapsed == campaign.days_elapsed + 1
+    assert repo.get_campaign("missing") is None
@@ -0,0 +1,124 @@
+"""
+The dependency graph (backend.calc.dag): incremental updates must leave exactly the
+schedule a full recompute gives.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from backend.calc.dag import DependencyCycleError, DependencyGraph
+
+BASE = date(2025, 1, 1)
+
+
+def _dates(rng):
+    start = BASE + timedelta(days=rng.randrange(60))
+    return start, start + timedelta(days=rng.randrange(0, 20))
+
+
+class Model:
+    """The same projects as plain dicts, rebuilt from scratch for comparison."""
+
+    def __init__(self):
+        self.projects = {}
+
+    def add(self, pid, start, end):
+        self.projects[pid] = {"id": pid, "planned_start": start, "planned_end": end, "deps": {}}
+
+    def full(self):
+        return DependencyGraph.from_projects(
+            {**p, "dependencies": p["deps"]} for p in self.projects.values()
+        )
+
+
+def _span(model, pid):
+    project = model.projects[pid]
+    return project["planned_start"], project["planned_end"]
+
+
+def _early(schedule):
+    return {pid: (s["early_start"], s["early_finish"]) for pid, s in schedule.items()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_a_full_recompute(seed):
+    rng = random.Random(seed)
+    graph, model = DependencyGraph(), Model()
+    ids = iter(f"p{i}" for i in range(1000))
+    for _ in range(8):
+        pid = next(ids)
+        model.add(pid, *_dates(rng))
+        graph.add_project(pid, *_span(model, pid))
+
+    cycles = 0
+    for _ in range(200):
+        before = _early(graph.schedule())
+        pids = list(model.projects)
+        edit = rng.choice(["add", "remove", "dates", "link", "link", "unlink"])
+        if edit == "add" or len(pids) < 3:
+            pid = next(ids)
+            model.add(pid, *_dates(rng))
+            moved = graph.add_project(pid, *_span(model, pid))
+        elif edit == "remove":
+            pid = rng.choice(pids)
+            del model.projects[pid]
+            for p in model.projects.values():
+                p["deps"].pop(pid, None)
+            moved = graph.remove_project(pid)
+            before.pop(pid)
+        elif edit == "dates":
+            pid = rng.choice(pids)
+            start, end = _dates(rng)
+            model.projects[pid].update(planned_start=start, planned_end=end)
+            moved = graph.set_dates(pid, *_span(model, pid))
+        elif edit == "link":
+            pred, succ = rng.sample(pids, 2)
+            lag = rng.randrange(-2, 5)
+            try:
+                moved = graph.add_dependency(pred, succ, lag)
+            except DependencyCycleError as error:
+                cycles += 1
+                assert error.cycle[0] == error.cycle[-1] == pred
+                moved = {}
+            else:
+                model.projects[succ]["deps"][pred] = lag
+        else:
+            links = [(pred, p["id"]) for p in model.projects.values() for pred in p["deps"]]
+            if not links:
+                continue
+            pred, succ = rng.choice(links)
+            del model.projects[succ]["deps"][pred]
+            moved = graph.remove_dependency(pred, succ)
+
+        full = model.full()
+        after = graph.schedule()
+        assert after == full.schedule()
+        assert set(graph.critical_path()) == set(full.critical_path())
+        assert graph.project_finish == full.project_finish
+        # Exactly the projects whose early dates changed are reported, with their new dates
+        early = _early(after)
+        assert set(moved) == {pid for pid, dates in early.items() if before.get(pid) != dates}
+        assert all(early[pid] == dates for pid, dates in moved.items())
+    assert cycles
+
+
+def test_cycle_is_reported_with_its_path():
+    graph = DependencyGraph()
+    for pid in "abc":
+        graph.add_project(pid, BASE, BASE + timedelta(days=2))
+    graph.add_dependency("a", "b")
+    graph.add_dependency("b", "c", lag=3)
+    assert graph.project_finish == BASE + timedelta(days=9)
+    with pytest.raises(DependencyCycleError) as error:
+        graph.add_dependency("c", "a")
+    assert error.value.cycle == ["c", "a", "b", "c"]
+    assert graph.critical_path() == ["a", "b", "c"]
+    with pytest.raises(DependencyCycleError):
+        DependencyGraph.from_projects(
+            [
+                {"id": "x", "planned_start": BASE, "planned_end": BASE, "dependencies": ["y"]},
+                {"id": "y", "planned_start": BASE, "planned_end": BASE, "dependencies": ["x"]},
+            ]
+        )
@@ -0,0 +1,125 @@
+"""
+Rig-move distances (backend.calc.distance) and the move costs they add to rig leveling.
+"""
+
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from backend.calc.distance import TransitMatrix, haversine_km, transit_days
+from backend.calc.scheduler import level_rigs
+
+BASE = date(2025, 1, 1)
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+def _places(rng, count, prefix):
+    return [
+        {"id": f"{prefix}{i}", "lat": rng.uniform(-60, 60), "lon": rng.uniform(-180, 180)}
+        for i in range(count)
+    ]
+
+
+def test_matrix_matches_pairwise_distances():
+    rng = random.Random(0)
+    origins, targets = _places(rng, 15, "o"), _places(rng, 10, "t")
+    origins.append({"id": "unknown", "lat": None, "lon": 3.0})
+    matrix = TransitMatrix(origins, targets, speed_knots=10)
+    for o in origins[:-1]:
+        for t in targets:
+            km = _haversine(o["lat"], o["lon"], t["lat"], t["lon"])
+            assert matrix.distance(o["id"], t["id"]) == pytest.approx(km)
+            assert matrix.days(o["id"], t["id"]) == pytest.approx(km / (10 * 1.852 * 24))
+    assert math.isnan(matrix.distance("unknown", "t0"))
+    # One degree of latitude is about 111 km
+    assert float(haversine_km(0, 0, 1, 0)) == pytest.approx(111.2, abs=0.1)
+    with pytest.raises(ValueError):
+        transit_days(1.0, 0)
+
+
+def test_nearest_matches_sorting_every_distance():
+    rng = random.Random(1)
+    origins = _places(rng, 40, "r") + [{"id": "unknown"}]
+    target = {"id": "well", "lat": 10.0, "lon": 10.0}
+    matrix = TransitMatrix(origins, [target])
+    expected = sorted(
+        (_haversine(o["lat"], o["lon"], 10.0, 10.0), o["id"]) for o in origins if "lat" in o
+    )
+    assert [rig for rig, _ in matrix.nearest("well", limit=5)] == [r for _, r in expected[:5]]
+    assert len(matrix.nearest("well", limit=100)) == 40
+    candidates = ["r3", "r7", "unknown", "missing"]
+    assert {rig for rig, _ in matrix.nearest("well", candidates=candidates)} == {"r3", "r7"}
+
+
+def _project(id, day, lat, lon, days=10):
+    start = BASE + timedelta(days=day)
+    return {
+        "id": id,
+        "planned_start": start,
+        "planned_end": start + timedelta(days=days),
+        "project_type": "Drilling",
+        "lat": lat,
+        "lon": lon,
+    }
+
+
+def test_assignment_prefers_the_rig_with_the_shorter_move():
+    rigs = [
+        {"id": "far", "day_rate": 1000.0, "lat": 0.0, "lon": 40.0},
+        {"id": "near", "day_rate": 1000.0, "lat": 0.0, "lon": 1.0},
+    ]
+    projects = [_project("p0", 0, 0.0, 0.0)]
+    # Without a move speed both rigs cost the same and the first one is taken
+    plain = level_rigs(projects, rigs, objective="cost", max_iterations=1)
+    assert plain["assignments"]["p0"]["rig_id"] == "far"
+
+    moved = level_rigs(projects, rigs, objective="cost", max_iterations=1, move_speed_knots=8)
+    assert moved["assignments"]["p0"]["rig_id"] == "near"
+    move = TransitMatrix(rigs, projects, 8).days("near", "p0")
+    assert moved["total_cost"] == pytest.approx(plain["total_cost"] + move * 1000.0, rel=1e-6)
+
+
+def test_moves_are_measured_from_the_previous_project():
+    # One rig, parked far east; p0 and p1 are close together in the west
+    rigs = [{"id": "r0", "day_rate": 500.0, "lat": 0.0, "lon": 50.0}]
+    projects = [_project("p0", 0, 0.0, 0.0), _project("p1", 20, 0.0, 0.5)]
+    result = level_rigs(projects, rigs, objective="cost", max_iterations=1, move_speed_knots=6)
+    rig_to_p0 = TransitMatrix(rigs, projects[:1], 6).days("r0", "p0")
+    p0_to_p1 = TransitMatrix(projects, speed_knots=6).days("p0", "p1")
+    base = level_rigs(projects, rigs, objective="cost", max_iterations=1)["total_cost"]
+    assert result["total_cost"] == pytest.approx(base + (rig_to_p0 + p0_to_p1) * 500.0, rel=1e-5)
+
+
+def test_rigs_chain_through_nearby_projects():
+    # Two clusters far apart, one rig parked at each; each rig stays in its own cluster
+    rigs = [
+        {"id": "west", "day_rate": 800.0, "lat": 0.0, "lon": 0.0},
+        {"id": "east", "day_rate": 800.0, "lat": 0.0, "lon": 30.0},
+    ]
+    projects = [
+        _project(f"{side}{i}", 15 * i, 0.0, lon + 0.2 * i)
+        for i in range(4)
+        for side, lon in (("w", 0.0), ("e", 30.0))
+    ]
+    home = {"w": "west", "e": "east"}
+
+    def crossings(result):
+        assert result["conflicts"] == []
+        return sum(a["rig_id"] != home[id[0]] for id, a in result["assignments"].items())
+
+    # Without move costs the rigs are interchangeable and wander between clusters
+    assert crossings(level_rigs(projects, rigs, objective="cost", max_iterations=50, seed=0))
+    moved = level_rigs(
+        projects, rigs, objective="cost", max_iterations=50, seed=0, move_speed_knots=5
+    )
+    assert crossings(moved) == 0
@@ -0,0 +1,136 @@
+"""
+The per-entity LRU/TTL cache (src.services.entity_cache), driven by an injected clock.
+"""
+
+import threading
+
+from src.services.entity_cache import EntityCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(**options):
+    clock = Clock()
+    options = {"maxsize": 3, "ttl": 30, "negative_ttl": 5, **options}
+    return EntityCache("test", clock=clock, **options), clock
+
+
+class Loader:
+    def __init__(self, values=None):
+        self.values = values or {}
+        self.calls = []
+
+    def __call__(self, key):
+        self.calls.append(key)
+        return self.values.get(key, f"{key} loaded")
+
+
+def test_hits_after_the_first_load():
+    cache, _ = _cache()
+    load = Loader()
+    assert cache.get("a", load) == "a loaded"
+    assert cache.get("a", load) == "a loaded"
+    assert load.calls == ["a"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, _ = _cache()
+    load = Loader()
+    for key in "abc":
+        cache.get(key, load)
+    # Reading a makes b the least recently used
+    cache.get("a", load)
+    cache.get("d", load)
+    assert cache.stats()["evictions"] == 1
+    load.calls.clear()
+    for key in "acd":
+        cache.get(key, load)
+    assert load.calls == []
+    cache.get("b", load)
+    assert load.calls == ["b"]
+    assert cache.stats()["size"] == 3
+
+
+def test_entries_expire_after_their_ttl():
+    cache, clock = _cache()
+    load = Loader()
+    cache.get("a", load)
+    clock.now += 29.9
+    cache.get("a", load)
+    assert load.calls == ["a"]
+    clock.now += 0.1
+    cache.get("a", load)
+    assert load.calls == ["a", "a"]
+    # A write-through put restarts the TTL
+    clock.now += 20
+    cache.put("a", "written")
+    clock.now += 20
+    assert cache.get("a", load) == "written"
+
+
+def test_missing_ids_are_cached_for_the_negative_ttl():
+    cache, clock = _cache()
+    load = Loader({"gone": None})
+    assert cache.get("gone", load) is None
+    clock.now += 4.9
+    assert cache.get("gone", load) is None
+    assert load.calls == ["gone"]
+    assert cache.stats()["negative_hits"] == 1
+    clock.now += 0.1
+    cache.get("gone", load)
+    assert load.calls == ["gone", "gone"]
+    # put(None) records a deletion the same way
+    cache.put("a", None)
+    assert cache.get("a", load) is None
+    assert "a" not in load.calls
+
+
+def test_invalidate_drops_one_key_or_all():
+    cache, _ = _cache()
+    load = Loader()
+    for key in "ab":
+        cache.get(key, load)
+    cache.invalidate("a")
+    assert cache.stats()["size"] == 1
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+
+
+def test_a_load_racing_with_a_write_is_not_cached():
+    cache, _ = _cache()
+    loading, written = threading.Event(), threading.Event()
+
+    def slow_load(key):
+        # Reads the old value, then a writer updates the entity before it is stored
+        loading.set()
+        written.wait(5)
+        return "stale"
+
+    reader = threading.Thread(target=lambda: cache.get("a", slow_load))
+    reader.start()
+    assert loading.wait(5)
+    cache.put("a", "fresh")
+    written.set()
+    reader.join()
+    assert cache.get("a", Loader()) == "fresh"
+
+    # Invalidation during a load likewise keeps the stale result out
+    loading.clear()
+    written.clear()
+    reader = threading.Thread(target=lambda: cache.get("b", slow_load))
+    reader.start()
+    assert loading.wait(5)
+    cache.invalidate("b")
+    written.set()
+    reader.join()
+    load = Loader()
+    assert cache.get("b", load) == "b loaded"
+    assert load.calls == ["b"]
@@ -0,0 +1,148 @@
+"""
+Response compression (src.middleware.compression) and conditional GETs
+(src.middleware.conditional), on a small app and on the API's own endpoints.
+"""
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.main import app
+from src.middleware import CompressionMiddleware, ConditionalGetMiddleware, compression
+from src.services import mock_services
+from src.services.seed import generate_portfolio, parse_scale
+
+BODY = "drilling report " * 200
+
+
+def _streamed(request):
+    async def chunks():
+        yield BODY.encode()
+        yield BODY.encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def _tagged(request):
+    return PlainTextResponse(BODY, headers={"ETag": '"v1"', "Cache-Control": "max-age=60"})
+
+
+ROUTES = {
+    "/text": lambda request: PlainTextResponse(BODY),
+    "/small": lambda request: PlainTextResponse("ok"),
+    "/streamed": _streamed,
+    "/ranged": lambda request: PlainTextResponse(BODY, headers={"Accept-Ranges": "bytes"}),
+    "/encoded": lambda request: Response(
+        gzip.compress(BODY.encode()), headers={"Content-Encoding": "gzip"}
+    ),
+    "/tagged": _tagged,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    small = Starlette(routes=[Route(path, endpoint) for path, endpoint in ROUTES.items()])
+    # Same order as src.main: compression outside the conditional layer
+    return TestClient(CompressionMiddleware(ConditionalGetMiddleware(small)))
+
+
+def _get(client, path, encoding="gzip", **headers):
+    return client.get(path, headers={"Accept-Encoding": encoding, **headers})
+
+
+def test_gzip_when_accepted_identity_otherwise(client):
+    response = _get(client, "/text")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+    for encoding in ["identity", "gzip;q=0", ""]:
+        response = _get(client, "/text", encoding)
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-length"] == str(len(BODY))
+        assert response.text == BODY
+
+
+def test_brotli_is_preferred_when_installed(client, monkeypatch):
+    if compression.brotli is not None:
+        assert _get(client, "/text", "gzip, br").headers["content-encoding"] == "br"
+    monkeypatch.setattr(compression, "brotli", None)
+    response = _get(client, "/text", "gzip, br")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+@pytest.mark.parametrize("path", ["/small", "/streamed", "/ranged"])
+def test_skipped_responses_pass_through(client, path):
+    response = _get(client, path)
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.text == {"/small": "ok", "/streamed": BODY * 2, "/ranged": BODY}[path]
+
+
+def test_already_encoded_responses_are_not_encoded_twice(client):
+    response = _get(client, "/encoded")
+    assert response.headers["content-encoding"] == "gzip"
+    # Decoded once by the client: the original body
+    assert response.text == BODY
+
+
+def test_matching_etag_gets_a_bodyless_304(client):
+    response = _get(client, "/tagged", **{"If-None-Match": 'W/"v0", W/"v1"'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == '"v1"'
+    assert response.headers["cache-control"] == "max-age=60"
+    assert "content-encoding" not in response.headers
+
+    response = _get(client, "/tagged", **{"If-None-Match": '"v2"'})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+def test_head_is_answered_conditionally(client):
+    head = client.head("/tagged", headers={"If-None-Match": '"v1"'})
+    assert (head.status_code, head.content) == (304, b"")
+    head = client.head("/tagged", headers={"If-None-Match": '"v2"'})
+    assert (head.status_code, head.content) == (200, b"")
+    assert head.headers["etag"] == '"v1"'
+
+
+@pytest.fixture(scope="module")
+def api():
+    mock_services.load_portfolio(generate_portfolio(parse_scale("small"), 0))
+    return TestClient(app)
+
+
+def test_api_endpoints_revalidate(api):
+    task_id = next(iter(mock_services.mock_tasks))
+    url = f"/tasks/{task_id}"
+    first = _get(api, url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    assert _get(api, url, **{"If-None-Match": etag}).status_code == 304
+    since = first.headers["last-modified"]
+    assert _get(api, url, **{"If-Modified-Since": since}).status_code == 304
+
+    # A write changes the tag
+    assert api.put(url, json={"title": "Renamed"}).status_code == 200
+    again = _get(api, url, **{"If-None-Match": etag})
+    assert again.status_code == 200
+    assert again.headers["etag"] != etag
+
+    # Lists are compressed when large enough, and revalidate by tag alone
+    listed = _get(api, "/tasks/?limit=200")
+    assert listed.headers["content-encoding"] == "gzip"
+    assert "last-modified" not in listed.headers
+    revalidated = _get(api, "/tasks/?limit=200", **{"If-None-Match": listed.headers["etag"]})
+    assert revalidated.status_code == 304
+    # Campaigns include today's days elapsed, so they also revalidate by tag alone
+    campaign = _get(api, f"/campaigns/{next(iter(mock_services.mock_campaigns))}")
+    assert "last-modified" not in campaign.headers
@@ -0,0 +1,34 @@
+"""
+Monte Carlo ETAs (backend.calc.montecarlo): rig sequencing against explicit dependencies.
+"""
+
+from datetime import date
+
+import pytest
+
+from backend.calc.dag import DependencyCycleError
+from backend.calc.montecarlo import simulate_eta
+
+
+def _project(id, start, end, **fields):
+    return {"id": id, "planned_start": start, "planned_end": end, "rig_id": "r1", **fields}
+
+
+def test_same_day_projects_on_a_rig_follow_their_dependencies():
+    # p0 is listed first but depends on p1; both start the same day on the same rig
+    projects = [
+        _project("p0", date(2025, 1, 1), date(2025, 1, 11), dependencies=["p1"]),
+        _project("p1", date(2025, 1, 1), date(2025, 1, 6)),
+    ]
+    result = simulate_eta(projects, iterations=200, seed=1)
+    # The rig runs p1 then p0, so nothing finishes before both durations have elapsed
+    assert result["rigs"]["r1"]["p10"] >= date(2025, 1, 15)
+
+
+def test_explicit_dependency_cycles_are_still_rejected():
+    projects = [
+        _project("p0", date(2025, 1, 1), date(2025, 1, 11), dependencies=["p1"]),
+        _project("p1", date(2025, 1, 1), date(2025, 1, 6), dependencies=["p0"]),
+    ]
+    with pytest.raises(DependencyCycleError):
+        simulate_eta(projects, iterations=10, seed=1)
@@ -0,0 +1,97 @@
+"""
+Soft-deleted tasks (src.services.purge_service) on SQLite: hidden from every read as soon
+as their campaign is deleted, then removed with their comments and search rows in batches.
+"""
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Task, TaskComment, task_search
+from src.models.aggregate import AggregateRequest
+from src.models.grid import GridRequest
+from src.services import aggregate_service, campaign_service, grid_service, task_service
+from src.services.kpi_service import get_campaign_kpi
+from src.services.purge_service import TaskPurger
+from src.services.seed import generate_portfolio, load_database, parse_scale
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    load_database(generate_portfolio(parse_scale("small"), 0), engine)
+    yield engine
+    engine.dispose()
+
+
+def _count(db, table, *conditions):
+    return db.execute(select(func.count()).select_from(table).where(*conditions)).scalar()
+
+
+def _reads(db):
+    # What each read path reports as the live tasks
+    listed = {task.id for task in task_service.get_tasks(db, limit=100000)}
+    searched, _, facets = task_service.search_tasks(db, limit=0)
+    _, grid = grid_service.get_grid_rows(db, "tasks", GridRequest(endRow=1))
+    aggregated = aggregate_service.aggregate(db, "tasks", AggregateRequest())
+    return listed, {
+        "listed": len(listed),
+        "searched": searched,
+        "facets": sum(facets["status"].values()),
+        "grid": grid,
+        "aggregated": aggregated.totals["count"],
+    }
+
+
+def test_campaign_delete_hides_tasks_at_once_then_purges_them(engine):
+    with Session(bind=engine) as db:
+        campaign_id = campaign_service.get_campaigns(db, limit=1)[0].id
+        task_ids = set(db.execute(select(Task.id).where(Task.campaign_id == campaign_id)).scalars())
+        comments = _count(db, TaskComment, TaskComment.task_id.in_(task_ids))
+        assert task_ids and comments
+        listed, before = _reads(db)
+        assert task_ids <= listed
+        assert set(before.values()) == {len(listed)}
+
+        campaign_service.delete_campaign(db, campaign_id)
+        listed, after = _reads(db)
+        assert not task_ids & listed
+        assert set(after.values()) == {before["listed"] - len(task_ids)}
+        assert all(task_service.get_task(db, task_id) is None for task_id in task_ids)
+        _, hits, _ = task_service.search_tasks(db, "bop", limit=100000)
+        assert hits and not {task.id for task, _ in hits} & task_ids
+        assert get_campaign_kpi(db, campaign_id) is None
+        # Still stored, detached from the deleted campaign, until the purge runs
+        pending = db.execute(select(Task).where(Task.id.in_(task_ids))).scalars().all()
+        assert len(pending) == len(task_ids)
+        assert all(t.deleted_at and t.campaign_id is t.well_id is None for t in pending)
+
+    # A task deleted on its own is purged along with them
+    with Session(bind=engine) as db:
+        single = sorted(listed)[0]
+        comments += _count(db, TaskComment, TaskComment.task_id == single)
+        total_comments = _count(db, TaskComment)
+        task_service.delete_task(db, single)
+        assert task_service.get_task(db, single) is None
+    task_ids.add(single)
+
+    purger = TaskPurger(lambda: Session(bind=engine), batch_size=7, pause=0)
+    # Several batches, each its own transaction
+    assert len(task_ids) > 3 * purger.batch_size
+    assert purger.run_once() == len(task_ids)
+    assert purger.run_once() == 0
+    assert purger.stats() == {"purged": len(task_ids), "passes": 2, "running": False}
+
+    with Session(bind=engine) as db:
+        assert _count(db, Task, Task.id.in_(task_ids)) == 0
+        assert _count(db, Task, Task.deleted_at.isnot(None)) == 0
+        assert _count(db, TaskComment, TaskComment.task_id.in_(task_ids)) == 0
+        assert _count(db, task_search, task_search.c.task_id.in_(task_ids)) == 0
+        assert _count(db, task_search) == _count(db, Task)
+        # Nothing else is touched
+        assert _count(db, TaskComment) == total_comments - comments
+        _, purged = _reads(db)
+        assert set(purged.values()) == {after["listed"] - 1}
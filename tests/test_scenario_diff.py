@@ -0,0 +1,76 @@
+"""
+Scenario diffs (backend.calc.diff and src.services.scenario_diff): field changes, conflicts
+gained and lost, and the version-keyed cache.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+from backend.calc.diff import diff_projects
+from src.models.scenario import ScenarioRecordKind
+from src.services.scenario_diff import build_scenario_diff
+
+
+def _project(start, end, rig="r1", **fields):
+    return {"planned_start": start, "planned_end": end, "rig_id": rig, **fields}
+
+
+A = {
+    "p1": _project("2025-01-01", "2025-01-10", platform_id="pf1"),
+    "p2": _project("2025-01-10", "2025-01-20"),
+    "p3": _project("2025-02-01", "2025-02-05", day_rate=100),
+}
+# p2 moves into p1's slot on the same rig; p3 is dropped
+B = {"p1": A["p1"], "p2": _project("2025-01-05", "2025-01-15")}
+WINDOWS = [
+    {"id": "w1", "platform_id": "pf1", "start_date": date(2025, 1, 3), "end_date": date(2025, 1, 4)}
+]
+
+
+def _stream(rows):
+    return sorted(rows.items())
+
+
+def test_changes_and_conflicts_between_two_sides():
+    diff = diff_projects(_stream(A), _stream(B), WINDOWS)
+    changes = {change["key"]: change for change in diff["changes"]}
+    assert changes["p2"]["change"] == "modified"
+    assert changes["p2"]["shift_days"] == -5
+    assert changes["p2"]["conflicts_gained"] == ["rig_double_booking:p1"]
+    # p1 did not change but gained a conflict through its neighbour
+    assert changes["p1"]["change"] == "conflicts"
+    assert changes["p1"]["conflicts_gained"] == ["rig_double_booking:p2"]
+    assert changes["p3"]["change"] == "removed"
+    assert changes["p3"]["cost_delta"] == -400
+    # The window clash with p1 is on both sides, so it is no change
+    assert diff["metrics"]["a"]["conflicts"] == 1
+    assert diff["metrics"]["delta"] == {
+        "projects": -1,
+        "total_cost": -400,
+        "eta_days": -21,
+        "conflicts": 1,
+    }
+
+
+def test_scenario_diffs_count_rig_conflicts_only_and_are_cached():
+    rows = {"a": A, "b": B}
+    calls = []
+
+    def get_records(scenario_id, kind):
+        calls.append((scenario_id, kind))
+        if kind != ScenarioRecordKind.project.value:
+            return []
+        return [SimpleNamespace(key=k, data=v) for k, v in rows[scenario_id].items()]
+
+    a, b = SimpleNamespace(id="a", version=1), SimpleNamespace(id="b", version=1)
+    diff = build_scenario_diff(a, b, get_records)
+    # Scenarios carry no maintenance windows: p1's platform clash is not reported
+    assert diff["projects"]["metrics"]["a"]["conflicts"] == 0
+    assert diff["projects"]["metrics"]["b"]["conflicts"] == 1
+    assert diff["versions"] == [1, 1]
+
+    assert build_scenario_diff(a, b, get_records) is diff
+    reads = len(calls)
+    b.version = 2
+    assert build_scenario_diff(a, b, get_records) is not diff
+    assert len(calls) > reads
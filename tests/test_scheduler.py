@@ -0,0 +1,167 @@
+"""
+Rig resource leveling (backend.calc.scheduler): schedules that respect rig bookings,
+maintenance windows and dependencies.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from backend.calc.engine import detect_conflicts
+from backend.calc.scheduler import LevelingJob, level_rigs
+
+BASE = date(2025, 1, 1)
+
+
+def _portfolio(seed, projects=40, rigs=4, platforms=5, windows=30):
+    rng = random.Random(seed)
+    rig_list = [{"id": f"r{i}", "day_rate": 100.0 + 10 * i} for i in range(rigs)]
+    project_list = []
+    for i in range(projects):
+        start = BASE + timedelta(days=rng.randrange(120))
+        project = {
+            "id": f"p{i}",
+            "planned_start": start,
+            "planned_end": start + timedelta(days=rng.randrange(0, 25)),
+            "project_type": "Drilling",
+            "platform_id": f"pf{rng.randrange(platforms)}",
+        }
+        if i and rng.random() < 0.2:
+            project["dependencies"] = [f"p{rng.randrange(i)}"]
+        if rng.random() < 0.3:
+            project["eligible_rig_ids"] = rng.sample([r["id"] for r in rig_list], 2)
+        project_list.append(project)
+    window_list = []
+    for i in range(windows):
+        start = BASE + timedelta(days=rng.randrange(150))
+        scope = (
+            {"platform_id": f"pf{rng.randrange(platforms)}"}
+            if rng.random() < 0.6
+            else {"rig_id": f"r{rng.randrange(rigs)}"}
+        )
+        window_list.append(
+            {
+                "id": f"w{i}",
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randrange(10)),
+                **scope,
+            }
+        )
+    return project_list, rig_list, window_list
+
+
+def _days(start, end):
+    # Occupied days [start, end); a zero-length project still holds its start day
+    return {start + timedelta(days=d) for d in range(max((end - start).days, 1))}
+
+
+def _check(projects, rigs, windows, result):
+    """Verify a schedule day by day, independently of the scheduler and detect_conflicts."""
+    assignments = result["assignments"]
+    assert len(assignments) + len(result["unscheduled"]) == len(projects)
+    booked = {}
+    for p in projects:
+        a = assignments.get(p["id"])
+        if a is None:
+            continue
+        assert a["start"] >= p["planned_start"]
+        assert (a["end"] - a["start"]) == (
+            max(p["planned_end"], p["planned_start"]) - p["planned_start"]
+        )
+        assert a["rig_id"] in p.get("eligible_rig_ids", [r["id"] for r in rigs])
+        for dependency in p.get("dependencies", []):
+            if dependency in assignments:
+                assert a["start"] >= assignments[dependency]["end"]
+        days = _days(a["start"], a["end"])
+        for day in days:
+            assert booked.setdefault((a["rig_id"], day), p["id"]) == p["id"]
+        for w in windows:
+            if w.get("platform_id", p["platform_id"]) != p["platform_id"]:
+                continue
+            if w.get("rig_id", a["rig_id"]) != a["rig_id"]:
+                continue
+            assert not days & _days(w["start_date"], w["end_date"] + timedelta(days=1))
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("objective", ["delay", "cost"])
+def test_schedules_have_no_conflicts(seed, objective):
+    projects, rigs, windows = _portfolio(seed)
+    result = level_rigs(
+        projects,
+        rigs,
+        windows,
+        objective=objective,
+        delay_cost_per_day=50.0,
+        max_iterations=30,
+        time_budget_s=10,
+        seed=seed,
+    )
+    assert result["conflicts"] == []
+    assert result["unscheduled"] == []
+    _check(projects, rigs, windows, result)
+
+
+def test_search_never_returns_a_worse_schedule_than_the_first():
+    projects, rigs, windows = _portfolio(7)
+    first = level_rigs(projects, rigs, windows, max_iterations=1, seed=7)
+    searched = level_rigs(projects, rigs, windows, max_iterations=200, time_budget_s=10, seed=7)
+    assert searched["iterations"] == 200
+    assert searched["total_delay_days"] <= first["total_delay_days"]
+    # Seeded runs are reproducible
+    again = level_rigs(projects, rigs, windows, max_iterations=200, time_budget_s=10, seed=7)
+    assert again["assignments"] == searched["assignments"]
+
+
+def test_the_planned_schedule_would_conflict():
+    # The same portfolio as planned, each project on a rig chosen at random, does clash
+    projects, rigs, windows = _portfolio(3)
+    rng = random.Random(3)
+    planned = [{**p, "rig_id": rng.choice(rigs)["id"]} for p in projects]
+    assert detect_conflicts(planned, windows)
+
+
+def test_ineligible_projects_are_reported_unscheduled():
+    projects = [
+        {
+            "id": "p0",
+            "planned_start": BASE,
+            "planned_end": BASE + timedelta(days=5),
+            "project_type": "Drilling",
+            "eligible_rig_ids": ["gone"],
+        },
+        {
+            "id": "p1",
+            "planned_start": BASE,
+            "planned_end": BASE + timedelta(days=5),
+            "dependencies": ["p0"],
+            "project_type": "Drilling",
+        },
+    ]
+    result = level_rigs(projects, [{"id": "r0", "day_rate": 1}], max_iterations=5)
+    assert result["unscheduled"] == ["p0"]
+    # Its successor is still placed, after p0's planned finish
+    assert result["assignments"]["p1"]["start"] == BASE + timedelta(days=5)
+
+
+def test_dependency_cycles_are_rejected():
+    projects = [
+        {"id": "a", "planned_start": BASE, "planned_end": BASE, "dependencies": ["b"]},
+        {"id": "b", "planned_start": BASE, "planned_end": BASE, "dependencies": ["a"]},
+    ]
+    with pytest.raises(ValueError, match="cycle"):
+        level_rigs(projects, [], max_iterations=1)
+
+
+def test_leveling_job_keeps_the_best_result_when_cancelled():
+    projects, rigs, windows = _portfolio(1)
+    job = LevelingJob(projects, rigs, windows, time_budget_s=30, seed=1).start()
+    while job.best is None:
+        time.sleep(0.01)
+    job.cancel()
+    result = job.result(timeout=10)
+    assert job.done
+    assert result["conflicts"] == []
+    _check(projects, rigs, windows, result)
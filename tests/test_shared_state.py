@@ -0,0 +1,102 @@
+"""
+Coordination between API worker processes: the shared write generation that drops
+per-worker caches (src.services.shared_state) and the blob store's cross-process lock.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from src.services.blob_store import LocalBlobStore
+from src.services.entity_cache import EntityCache
+from src.services.shared_state import StateGeneration, fcntl
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="needs flock")
+
+
+def _worker(path):
+    # One worker's view: its own cache, dropped when another worker has written
+    cache = EntityCache("campaigns")
+    state = StateGeneration(str(path), cache.invalidate)
+    # As get_repository does before each request: the first sync takes the baseline
+    state.sync()
+    return cache, state
+
+
+def _cached(cache, key):
+    return cache.get(key, lambda key: f"{key} v1") and cache.stats()["size"] > 0
+
+
+def test_workers_see_each_others_writes(tmp_path):
+    path = tmp_path / "generation"
+    cache_a, state_a = _worker(path)
+    cache_b, state_b = _worker(path)
+    for cache in (cache_a, cache_b):
+        assert _cached(cache, "c1")
+
+    # A's own write keeps A's cache (the write updated it); B drops its copy on next sync
+    state_a.bump()
+    state_a.sync()
+    assert cache_a.stats()["size"] == 1
+    state_b.sync()
+    assert cache_b.stats()["size"] == 0
+    assert (state_a.changes, state_b.changes) == (0, 1)
+    # Nothing new: syncing again keeps the cache
+    assert _cached(cache_b, "c1")
+    state_b.sync()
+    assert cache_b.stats()["size"] == 1
+
+    # B writes after A did, so B's bump sees A's write too; then A sees B's
+    state_a.bump()
+    state_b.bump()
+    assert cache_b.stats()["size"] == 0
+    state_a.sync()
+    assert cache_a.stats()["size"] == 0
+    assert state_a.current() == state_b.current() == 3
+
+
+def _bump(path):
+    StateGeneration(path, lambda: None).bump()
+
+
+def test_write_in_another_process_is_seen(tmp_path):
+    path = str(tmp_path / "generation")
+    cache, state = _worker(path)
+    assert _cached(cache, "c1")
+    process = multiprocessing.get_context("fork").Process(target=_bump, args=(path,))
+    process.start()
+    process.join()
+    state.sync()
+    assert cache.stats()["size"] == 0
+    assert state.current() == 1
+
+
+def test_disabled_without_a_path():
+    cache = EntityCache("campaigns")
+    state = StateGeneration(None, cache.invalidate)
+    assert _cached(cache, "c1")
+    state.bump()
+    state.sync()
+    assert not state.enabled
+    assert cache.stats()["size"] == 1
+
+
+def _hold(directory, acquired, release):
+    with LocalBlobStore(directory).locked():
+        acquired.set()
+        release.wait(5)
+
+
+def test_blob_lock_is_held_across_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    acquired, release = context.Event(), context.Event()
+    process = context.Process(target=_hold, args=(str(tmp_path), acquired, release))
+    process.start()
+    assert acquired.wait(5)
+    started = time.monotonic()
+    context.Process(target=lambda: (time.sleep(0.3), release.set())).start()
+    with LocalBlobStore(str(tmp_path)).locked():
+        waited = time.monotonic() - started
+    process.join()
+    assert waited >= 0.25
@@ -0,0 +1,211 @@
+"""
+The memory backend's write log and snapshots (src.services.store_log), and the records
+recovered lazily from them (src.services.records).
+"""
+
+import os
+import pickle
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.services.records import CommentRecord, RecordCodec, TaskRecord
+from src.services.store_log import StoreLog
+from src.services.task_comments import CommentStore, ThreadCodec
+
+NOW = datetime(2025, 1, 1, 12, 0)
+CODECS = {"tasks": RecordCodec(TaskRecord, ["campaign_id"]), "task_comments": ThreadCodec()}
+
+
+def _task(id, **fields):
+    return TaskRecord(id=id, created_at=NOW, updated_at=NOW, **{"title": id, **fields})
+
+
+def _out(store):
+    return {key: value.to_out() for key, value in store.items()}
+
+
+def _open(directory, stores=None, **options):
+    log = StoreLog(
+        str(directory),
+        lambda: {name: dict(rows) for name, rows in (stores or {}).items()},
+        codecs=CODECS,
+        **options,
+    )
+    return log, log.recover()
+
+
+def test_appends_round_trip(tmp_path):
+    log, recovered = _open(tmp_path)
+    assert recovered is None
+    log.open()
+    log.append("users", "u1", {"name": "Ann"})
+    log.append("users", "u2", {"name": "Bob"})
+    log.append("users", "u1", None)
+    log.append("tasks", "t1", _task("t1", status="done", labels=["a"]))
+    log.close()
+
+    log, recovered = _open(tmp_path)
+    assert recovered["users"] == {"u2": {"name": "Bob"}}
+    assert _out(recovered["tasks"]) == {"t1": _task("t1", status="done", labels=["a"]).to_out()}
+    assert log.stats() == {"lsn": 4, "snapshot_lsn": 0}
+
+
+@pytest.mark.parametrize("damage", ["torn", "corrupt"])
+def test_damaged_tail_is_dropped_and_truncated(tmp_path, damage):
+    log, _ = _open(tmp_path)
+    log.open()
+    for i in range(3):
+        log.append("users", f"u{i}", i)
+    log.close()
+    segments = [name for name in os.listdir(tmp_path) if name.startswith("wal-")]
+    assert len(segments) == 1
+    path = tmp_path / segments[0]
+    data = path.read_bytes()
+    if damage == "torn":
+        path.write_bytes(data[:-3])
+    else:
+        path.write_bytes(data[:-1] + bytes([data[-1] ^ 0xFF]))
+
+    log, recovered = _open(tmp_path)
+    assert recovered["users"] == {"u0": 0, "u1": 1}
+    assert log.stats()["lsn"] == 2
+    # Later appends follow the last whole record
+    assert len(path.read_bytes()) < len(data)
+    log.open()
+    log.append("users", "u3", 3)
+    log.close()
+    _, recovered = _open(tmp_path)
+    assert recovered["users"] == {"u0": 0, "u1": 1, "u3": 3}
+
+
+def test_snapshot_then_log_replay(tmp_path):
+    stores = {"tasks": {}, "users": {}}
+    log, _ = _open(tmp_path, stores)
+    log.open()
+    for i in range(5):
+        stores["tasks"][f"t{i}"] = _task(f"t{i}", campaign_id="c1")
+        log.append("tasks", f"t{i}", stores["tasks"][f"t{i}"])
+    stores["users"]["u1"] = "Ann"
+    log.append("users", "u1", "Ann")
+    log.snapshot()
+    stores["tasks"]["t1"].update(title="renamed")
+    log.append("tasks", "t1", stores["tasks"]["t1"])
+    del stores["tasks"]["t2"]
+    log.append("tasks", "t2", None)
+    log.close()
+
+    log, recovered = _open(tmp_path)
+    assert log.stats() == {"lsn": 8, "snapshot_lsn": 6}
+    assert recovered["users"] == {"u1": "Ann"}
+    assert _out(recovered["tasks"]) == _out(stores["tasks"])
+
+
+def test_recovered_records_load_on_first_read(tmp_path):
+    stores = {"tasks": {"t1": _task("t1", campaign_id="c1", status="blocked", priority="high")}}
+    log, _ = _open(tmp_path, stores)
+    log.open()
+    log.snapshot()
+    log.close()
+
+    _, recovered = _open(tmp_path)
+    record = recovered["tasks"]["t1"]
+    # Only the id and the saved columns are set until another field is read
+    assert record._rows is not None
+    assert (record.id, record.campaign_id) == ("t1", "c1")
+    assert record._rows is not None
+    assert record.priority == "high"
+    assert record._rows is None
+    assert record.to_out() == stores["tasks"]["t1"].to_out()
+
+    # An update decodes the row before writing, so the other fields survive it
+    _, recovered = _open(tmp_path)
+    record = recovered["tasks"]["t1"]
+    record.update(title="changed")
+    assert record._rows is None
+    assert (record.title, record.status.value, record.priority) == ("changed", "blocked", "high")
+    # The log pickles the record's values, not its place in the snapshot
+    assert pickle.loads(pickle.dumps(record)).to_out() == record.to_out()
+
+
+def test_unread_records_are_copied_into_the_next_snapshot(tmp_path):
+    tasks = {f"t{i}": _task(f"t{i}", campaign_id="c1", description="x" * i) for i in range(20)}
+    expected = _out(tasks)
+    log, _ = _open(tmp_path, {"tasks": tasks})
+    log.open()
+    log.snapshot()
+    log.close()
+
+    recovered = {}
+    log, stores = _open(tmp_path, {"tasks": recovered})
+    recovered.update(stores["tasks"])
+    recovered["t3"].update(title="changed")
+    expected["t3"] = recovered["t3"].to_out()
+    log.open()
+    log.snapshot()
+    log.close()
+    assert sum(record._rows is not None for record in recovered.values()) == 19
+
+    _, stores = _open(tmp_path)
+    assert _out(stores["tasks"]) == expected
+
+
+def test_background_snapshots_alongside_appends(tmp_path):
+    stores = {"users": {}}
+    lock = threading.Lock()
+    log = StoreLog(
+        str(tmp_path),
+        lambda: {"users": dict(stores["users"])},
+        snapshot_every=50,
+    )
+    log.recover()
+    log.open()
+
+    def write(worker):
+        for i in range(300):
+            key = f"{worker}-{i % 40}"
+            with lock:
+                # As in the services: the store is written, then logged
+                stores["users"][key] = i
+                log.append("users", key, i)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    stats = log.stats()
+    assert stats["lsn"] == 1200
+    assert stats["snapshot_lsn"] > 0
+    # Segments covered by the last snapshot are gone; the one it rotated to remains
+    firsts = sorted(int(name[4:-4]) for name in os.listdir(tmp_path) if name.startswith("wal-"))
+    assert firsts[0] == stats["snapshot_lsn"] + 1
+
+    log, recovered = _open(tmp_path)
+    assert recovered == stores
+    assert log.stats()["lsn"] == 1200
+
+
+def test_comment_threads_recover_lazily(tmp_path):
+    comments = CommentStore()
+    comments.reset(
+        CommentRecord.create(f"c{i}", f"t{i % 2}", "u1", f"note {i}", datetime(2025, 1, 1, i))
+        for i in range(5)
+    )
+    log = StoreLog(str(tmp_path), lambda: {"task_comments": comments.capture()}, codecs=CODECS)
+    log.recover()
+    log.open()
+    log.snapshot()
+    comments.add(CommentRecord.create("c9", "t1", "u1", "late", datetime(2025, 1, 2)))
+    log.append("task_comments", "t1", comments.get("t1"))
+    log.close()
+
+    restored = CommentStore()
+    restored.restore(StoreLog(str(tmp_path), dict, codecs=CODECS).recover()["task_comments"])
+    for task_id in ("t0", "t1"):
+        assert restored.thread(task_id) == comments.thread(task_id)
+    assert restored.summary("t0") == (3, comments.thread("t0")[-1])
+    assert restored.summary("t1")[1].message == "late"
@@ -0,0 +1,157 @@
+"""
+The memory backend's task search index (src.services.task_search): BM25 ranking, prefix
+matching, facet filters, incremental updates, and searches while it is being built.
+"""
+
+import importlib
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.task_search import TaskSearchIndex
+
+# src.services.task_search is shadowed on the package by the FTS table of the same name
+task_search = importlib.import_module("src.services.task_search")
+
+
+def _task(id, title, description=None, labels=None, status="todo", priority="medium"):
+    return SimpleNamespace(
+        id=id,
+        title=title,
+        description=description,
+        labels=labels,
+        status=status,
+        priority=priority,
+        assigned_to=None,
+        campaign_id="c1",
+    )
+
+
+TASKS = [
+    _task("t1", "Cement casing", "Pump cement behind the 9-5/8in casing", status="done"),
+    _task("t2", "Pressure test BOP", "Test the blowout preventer stack"),
+    _task("t3", "Order casing", "Casing for the next section", labels=["casing"]),
+    _task("t4", "Crew change", "Cement crew arrives on Tuesday", priority="high"),
+]
+
+
+def _index(tasks=TASKS, comments=None):
+    store = {task.id: task for task in tasks}
+    threads = comments if comments is not None else {}
+    index = TaskSearchIndex(
+        lambda: store.values(), lambda task_id: threads.get(task_id, []), store.get
+    )
+    return index, store, threads
+
+
+def _ids(result):
+    _, hits, _ = result
+    return [task_id for task_id, _ in hits]
+
+
+def test_ranking_weights_fields_and_matches_every_term():
+    index, _, _ = _index()
+    # A title and label hit outrank description-only hits
+    assert _ids(index.search("casing", prefix=False)) == ["t3", "t1"]
+    assert _ids(index.search("cement", prefix=False))[0] == "t1"
+    _, hits, _ = index.search("cement", prefix=False)
+    assert hits[0][1] > hits[1][1] > 0
+    # Every term must match
+    assert _ids(index.search("cement crew", prefix=False)) == ["t4"]
+    assert index.search("cement zebra", prefix=False)[0] == 0
+    # Stopwords are ignored; no query lists everything in insertion order
+    assert _ids(index.search("the casing", prefix=False)) == ["t3", "t1"]
+    assert _ids(index.search(None)) == ["t1", "t2", "t3", "t4"]
+
+
+def test_prefix_matching():
+    index, _, _ = _index()
+    # The last term is a prefix while typing, or explicitly with *
+    assert set(_ids(index.search("cas"))) == {"t1", "t3"}
+    assert index.search("cas", prefix=False)[0] == 0
+    assert set(_ids(index.search("cem* crew", prefix=False))) == {"t4"}
+    # Single-letter prefixes would match most of the vocabulary
+    assert index.search("c")[0] == 0
+
+
+def test_filters_narrow_matches_and_facets():
+    index, _, _ = _index()
+    total, hits, facets = index.search("cement", filters={"status": "done"})
+    assert (total, [task_id for task_id, _ in hits]) == (1, ["t1"])
+    assert facets["status"] == {"done": 1}
+    total, _, facets = index.search(None, filters={"priority": "high", "status": None})
+    assert total == 1
+    assert facets["priority"] == {"high": 1}
+    assert index.search(None)[2]["status"] == {"done": 1, "todo": 3}
+
+
+def test_paging():
+    index, _, _ = _index()
+    everything = _ids(index.search("cas"))
+    assert _ids(index.search("cas", skip=1, limit=1)) == everything[1:2]
+
+
+def test_index_follows_writes():
+    index, store, threads = _index()
+    index.search(None)
+
+    store["t2"] = _task("t2", "Pressure test wellhead", "Test the wellhead seals")
+    index.index_task(store["t2"])
+    assert _ids(index.search("wellhead")) == ["t2"]
+    assert index.search("blowout")[0] == 0
+
+    threads["t2"] = ["Found a leaking flange"]
+    index.add_comment("t2", "Found a leaking flange")
+    assert _ids(index.search("flange")) == ["t2"]
+
+    del store["t3"]
+    index.remove_task("t3")
+    assert _ids(index.search("casing")) == ["t1"]
+    assert index.search(None)[0] == 3
+    # Terms no task uses any more are gone from prefix expansion too
+    assert index.search("ord")[0] == 0
+
+    store["t5"] = _task("t5", "Order drill pipe")
+    index.index_task(store["t5"])
+    assert _ids(index.search("ord")) == ["t5"]
+
+
+def test_search_during_a_slow_build_is_bounded(monkeypatch):
+    monkeypatch.setattr(task_search, "BUILD_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(task_search, "SCAN_LIMIT", 3)
+    release = threading.Event()
+
+    def comments(task_id):
+        if threading.current_thread().name == "task-search-index":
+            release.wait(5)
+        return []
+
+    store = {task.id: task for task in TASKS}
+    index = TaskSearchIndex(lambda: store.values(), comments, store.get)
+
+    # Unranked scan of at most SCAN_LIMIT tasks, stopping once the page is full
+    total, hits, _ = index.search("casing", prefix=False)
+    assert (total, hits) == (2, [("t1", 0.0), ("t3", 0.0)])
+    assert index.search("crew", prefix=False)[0] == 0
+    assert _ids(index.search(None, limit=1)) == ["t1"]
+
+    # A write during the build is picked up when the build is swapped in
+    store["t4"] = _task("t4", "Crew change", "Casing crew arrives")
+    index.index_task(store["t4"])
+    release.set()
+    assert index._ready.wait(5)
+    total, hits, _ = index.search("casing", prefix=False)
+    assert total == 3
+    assert all(score > 0 for _, score in hits)
+
+
+@pytest.mark.parametrize("query", ["cement", "cas", "test bop", None])
+def test_scan_and_index_match_the_same_tasks(query):
+    comments = {"t2": ["Cement unit on standby"]}
+    index, _, _ = _index(comments=comments)
+    scanned = index._scan(query, None, 0, 100, True)
+    total, hits, facets = index.search(query)
+    assert scanned[0] == total
+    assert sorted(task_id for task_id, _ in scanned[1]) == sorted(_ids((total, hits, facets)))
+    assert scanned[2] == facets